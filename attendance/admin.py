@@ -1,24 +1,93 @@
-from django.contrib import admin
-from database.models import ClassRoom, Student, AttendanceSummary, AbsentStudent
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from database.models import ClassRoom, Student, AttendanceSummary, AbsentStudent, DaySnapshot, JobLease, JobRun
+from database.signals import recalc_student_counts
+from .signals import roster_changed
+
+
+# Ниже этого числа строк точный COUNT(*) дешёвый — оценка не нужна
+ESTIMATED_COUNT_THRESHOLD = 50_000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Для списка без фильтров на PostgreSQL число строк берётся из статистики планировщика
+    (pg_class.reltuples) вместо COUNT(*) по всей таблице. С фильтрами — обычный подсчёт:
+    он идёт по индексу и по части таблицы.
+    """
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        connection = connections[qs.db]
+        if connection.vendor == 'postgresql' and not qs.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                               [qs.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATED_COUNT_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Списки больших таблиц: оценка общего числа и без второго COUNT(*) при фильтрах."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
 
 
 @admin.register(ClassRoom)
 class ClassRoomAdmin(admin.ModelAdmin):
     list_display = ('name', 'teacher', 'student_count')
+    list_select_related = ('teacher',)
     search_fields = ('name',)
     list_filter = ('teacher',)
+    autocomplete_fields = ('teacher',)
     filter_horizontal = ('staff',)  # чтобы удобно выбирать несколько пользователей
+    actions = ('recount_students',)
+
+    @admin.action(description='Пересчитать численность учеников')
+    def recount_students(self, request, queryset):
+        class_ids = list(queryset.values_list('id', flat=True))
+        recalc_student_counts(class_ids)
+        roster_changed(class_ids, counts=True)
+        self.message_user(request, f'Численность пересчитана: классов {len(class_ids)}.', messages.SUCCESS)
 
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'class_room', 'is_active')
+    list_select_related = ('class_room',)
     list_filter = ('class_room', 'is_active')
     search_fields = ('full_name',)
+    autocomplete_fields = ('class_room',)
+    actions = ('deactivate', 'activate')
+
+    def _set_active(self, request, queryset, is_active):
+        # одним UPDATE вместо save() на каждого ученика; сигналы заменяет явный пересчёт
+        class_ids = set(queryset.values_list('class_room_id', flat=True))
+        updated = queryset.update(is_active=is_active, updated_at=timezone.now())
+        recalc_student_counts(class_ids)
+        roster_changed(class_ids, counts=True)
+        self.message_user(request, f'Обновлено учеников: {updated}.', messages.SUCCESS)
+
+    @admin.action(description='Отчислить (сделать неактивными)')
+    def deactivate(self, request, queryset):
+        self._set_active(request, queryset, False)
+
+    @admin.action(description='Восстановить (сделать активными)')
+    def activate(self, request, queryset):
+        self._set_active(request, queryset, True)
 
 
 @admin.register(AttendanceSummary)
-class AttendanceSummaryAdmin(admin.ModelAdmin):
+class AttendanceSummaryAdmin(LargeTableAdmin):
     list_display = (
         'class_room',
         'date',
@@ -27,12 +96,79 @@ class AttendanceSummaryAdmin(admin.ModelAdmin):
         'unexcused_absent_count',
         'created_by',
     )
-    list_filter = ('date', 'class_room')
+    list_select_related = ('class_room', 'created_by')
+    # дата — через date_hierarchy (MIN/MAX по индексу), а не list_filter с DISTINCT по всей таблице
+    date_hierarchy = 'date'
+    list_filter = ('class_room',)
     search_fields = ('class_room__name',)
+    autocomplete_fields = ('class_room', 'created_by')
 
 
 @admin.register(AbsentStudent)
-class AbsentStudentAdmin(admin.ModelAdmin):
-    list_display = ('attendance', 'student')
-    list_filter = ('attendance__date', 'student__class_room')
+class AbsentStudentAdmin(LargeTableAdmin):
+    # не attendance/student целиком: их __str__ тянут ещё класс и дату сводки на каждую строку
+    list_display = ('student_name', 'class_room', 'date', 'reason')
+    list_select_related = ('student', 'class_room')
+    date_hierarchy = 'date'
+    list_filter = ('reason', 'class_room')
     search_fields = ('student__full_name',)
+    autocomplete_fields = ('attendance', 'student')
+
+    @admin.display(description='Ученик', ordering='student__full_name')
+    def student_name(self, obj):
+        return obj.student.full_name
+
+
+@admin.register(DaySnapshot)
+class DaySnapshotAdmin(admin.ModelAdmin):
+    # снимки пишет только close_days; удалить снимок можно — он пересоберётся
+    list_display = ('date', 'reports_count', 'digest', 'created_at')
+    date_hierarchy = 'date'
+    fields = list_display
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('payload')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    # запуски пишет только run_scheduler
+    list_display = ('job', 'started_at', 'duration_ms', 'status', 'holder')
+    list_filter = ('status', 'job')
+    date_hierarchy = 'started_at'
+    fields = ('job', 'slot', 'holder', 'status', 'started_at', 'finished_at', 'duration_ms', 'output', 'error')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('output', 'error')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(JobLease)
+class JobLeaseAdmin(admin.ModelAdmin):
+    # строки заводит run_scheduler; без строки задача не запустится, поэтому удалять нельзя
+    list_display = ('name', 'schedule', 'last_slot', 'locked_until', 'holder')
+
+    @admin.display(description='Расписание')
+    def schedule(self, obj):
+        conf = settings.SCHEDULER_JOBS.get(obj.name)
+        return (conf and conf.get('schedule')) or '—'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
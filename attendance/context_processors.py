@@ -1,10 +1,12 @@
+from .services import roles
+
+
 def user_roles(request):
     user = request.user
     if not user.is_authenticated:
         return {}
-    is_deputy = user.groups.filter(name='Завуч').exists()
-    is_teacher = user.groups.filter(name='Учитель').exists()
+    names = roles.user_roles(user)
     return {
-        'is_deputy': is_deputy,
-        'is_teacher': is_teacher,
+        'is_deputy': roles.DEPUTY in names,
+        'is_teacher': roles.TEACHER in names,
     }
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import re
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from attendance.views.stats import SECTION_BUILDERS
+from database.models import ClassRoom, Student, AttendanceSummary, SubstituteAccessToken
+
+
+# Кэши отключены: иначе горячие запросы прячутся за кэшем секций, ролей и сессий
+NO_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\?(?:, \?)*\)'), '(...)'),
+]
+
+
+def fingerprint(sql: str) -> str:
+    """SQL без литералов: один и тот же запрос с разными параметрами — одна запись отчёта."""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет горячие страницы (главная, секции статистики, выгрузка дня, ученики, вход и работа '
+        'по токену замены) на текущей БД, снимает EXPLAIN (ANALYZE, BUFFERS) каждого SELECT и отмечает '
+        'последовательное чтение больших таблиц и сортировки на диске. Отчёт стабилен между прогонами '
+        '(без времени и буферов, если не указан --details) — его удобно сравнивать diff-ом до и после '
+        'изменения индексов. Все изменения данных откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teacher', default='bench_teacher_1', help='Логин учителя для главной страницы')
+        parser.add_argument('--deputy', default='bench_deputy', help='Логин завуча для статистики и выгрузок')
+        parser.add_argument('--large-table-rows', type=int, default=10_000,
+                            help='С какого числа строк последовательное чтение таблицы считается проблемой')
+        parser.add_argument('--details', action='store_true',
+                            help='Добавить в план строки, время и буферы (отчёт перестаёт быть стабильным)')
+        parser.add_argument('--output', help='Записать отчёт в файл')
+        parser.add_argument('--fail-on-flags', action='store_true', help='Завершиться с ошибкой, если есть отметки')
+
+    def handle(self, *args, **options):
+        teacher = User.objects.filter(username=options['teacher']).first()
+        deputy = User.objects.filter(username=options['deputy']).first()
+        if not teacher or not deputy:
+            raise CommandError('Пользователи не найдены. Сначала выполните manage.py seed_benchmark.')
+        self.large_rows = options['large_table_rows']
+        self.details = options['details']
+        self._table_rows = {}
+
+        queries = {}  # отпечаток -> {'sql', 'scenarios'}; порядок — первое появление
+        with transaction.atomic():
+            with override_settings(CACHES=NO_CACHES, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for name, captured in self._run_scenarios(teacher, deputy):
+                    for query in captured:
+                        sql = query['sql']
+                        if not sql.lstrip().upper().startswith('SELECT'):
+                            continue
+                        entry = queries.setdefault(fingerprint(sql), {'sql': sql, 'scenarios': []})
+                        if name not in entry['scenarios']:
+                            entry['scenarios'].append(name)
+            blocks = [self._audit(fp, entry) for fp, entry in queries.items()]
+            # планы сняты на данных после POST-сценариев — всё откатываем
+            transaction.set_rollback(True)
+
+        flagged = sum(1 for block in blocks if block['flags'])
+        lines = [
+            f'# audit_queries: {connection.vendor}, запросов {len(blocks)}, с отметками {flagged}',
+            f'# большая таблица: от {self.large_rows} строк',
+        ]
+        for block in blocks:
+            lines.extend(['', f"[{block['id']}] {', '.join(block['scenarios'])}", f"SQL: {block['fingerprint']}"])
+            lines.extend(f'  {line}' for line in block['plan'])
+            lines.extend(f'  !! {flag}' for flag in block['flags'])
+        report = '\n'.join(lines) + '\n'
+
+        if options['output']:
+            Path(options['output']).write_text(report, encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Отчёт сохранён: {options["output"]}'))
+        else:
+            self.stdout.write(report, ending='')
+        if options['fail_on_flags'] and flagged:
+            raise CommandError(f'Запросов с отметками: {flagged}')
+
+    # ---- сценарии ----
+
+    def _scenarios(self, teacher, deputy):
+        day = AttendanceSummary.objects.aggregate(d=Max('date'))['d'] or timezone.localdate()
+        month = {'month': day.month, 'year': day.year}
+        teacher_class = ClassRoom.objects.filter(staff=teacher).order_by('id').first()
+        post_data = {'row_count': '0'}
+        if teacher_class:
+            ids = ','.join(str(sid) for sid in Student.objects.filter(
+                class_room=teacher_class, is_active=True).order_by('id').values_list('id', flat=True)[:3])
+            post_data = {
+                'row_count': '1', 'class_0': str(teacher_class.id),
+                f'absent_students_{teacher_class.id}': ids, f'all_absent_students_{teacher_class.id}': ids,
+            }
+
+        export_url = reverse('daily_statistics_export')
+        scenarios = [
+            ('index_get', teacher, 'get', reverse('index'), None),
+            ('index_post', teacher, 'post', reverse('index'), post_data),
+            *(
+                (f'statistics:{name}', deputy, 'get', reverse('statistics_section', args=[name]), month)
+                for name in SECTION_BUILDERS
+            ),
+            ('export_excel', deputy, 'get', export_url, {'date': day.isoformat(), 'format': 'excel'}),
+            ('manage_students', deputy, 'get', reverse('manage_students'), None),
+            ('substitute_tokens', deputy, 'get', reverse('substitute_tokens'), None),
+        ]
+        return scenarios, teacher_class
+
+    def _run_scenarios(self, teacher, deputy):
+        scenarios, teacher_class = self._scenarios(teacher, deputy)
+        for name, user, method, url, data in scenarios:
+            client = Client()
+            client.force_login(user)
+            yield name, self._capture(lambda: getattr(client, method)(url, data))
+
+        if teacher_class:
+            # вход по токену и страница замены: запросы SubstituteTokenMiddleware на каждом шаге
+            raw = SubstituteAccessToken.generate_raw_token()
+            SubstituteAccessToken.objects.create(
+                class_room=teacher_class, token_hash=SubstituteAccessToken.hash_token(raw),
+                expires_at=timezone.now() + timedelta(hours=1),
+            )
+            client = Client()
+            yield 'substitute_login', self._capture(lambda: client.post(reverse('substitute_login'), {'token': raw}))
+            yield 'substitute_index', self._capture(lambda: client.get(reverse('index')))
+
+    @staticmethod
+    def _capture(request):
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            request()
+        return ctx.captured_queries
+
+    # ---- планы ----
+
+    def _audit(self, fp, entry):
+        if connection.vendor == 'postgresql':
+            plan, flags = self._explain_postgres(entry['sql'])
+        else:
+            plan, flags = self._explain_generic(entry['sql'])
+        return {
+            'id': hashlib.sha1(fp.encode()).hexdigest()[:8],
+            'fingerprint': fp,
+            'scenarios': entry['scenarios'],
+            'plan': plan,
+            'flags': flags,
+        }
+
+    def _tables(self):
+        if not hasattr(self, '_table_names'):
+            self._table_names = set(connection.introspection.table_names())
+        return self._table_names
+
+    def _rows(self, table):
+        if table not in self._table_rows:
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                else:
+                    cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+                row = cursor.fetchone()
+            self._table_rows[table] = max(0, row[0]) if row else 0
+        return self._table_rows[table]
+
+    def _explain_postgres(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}')
+            raw = cursor.fetchone()[0]
+        root = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+        lines, flags = [], []
+
+        def walk(node, depth):
+            label = node['Node Type']
+            if node.get('Join Type'):
+                label = f"{node['Join Type']} {label}"
+            if node.get('Index Name'):
+                label += f" using {node['Index Name']}"
+            if node.get('Relation Name'):
+                label += f" on {node['Relation Name']}"
+            if node.get('Sort Method'):
+                label += f" ({node['Sort Method']}, {node.get('Sort Space Type', '').lower()})"
+            if self.details:
+                label += (
+                    f" [rows={node.get('Actual Rows')} loops={node.get('Actual Loops')} "
+                    f"time={node.get('Actual Total Time')} мс hit={node.get('Shared Hit Blocks')} "
+                    f"read={node.get('Shared Read Blocks')}]"
+                )
+            lines.append('  ' * depth + label)
+
+            relation = node.get('Relation Name')
+            if node['Node Type'] == 'Seq Scan' and relation and self._rows(relation) >= self.large_rows:
+                flags.append(f'SEQ SCAN {relation} (~{self._rows(relation)} строк)')
+            if node.get('Sort Space Type') == 'Disk':
+                flags.append(f"SORT ON DISK ({node.get('Sort Space Used')} kB)")
+            if (node.get('Hash Batches') or 1) > 1:
+                flags.append(f"HASH ON DISK (batches={node['Hash Batches']})")
+            for child in node.get('Plans', []):
+                walk(child, depth + 1)
+
+        walk(root['Plan'], 0)
+        if self.details:
+            lines.append(f"planning={root.get('Planning Time')} мс execution={root.get('Execution Time')} мс")
+        return lines, flags
+
+    def _explain_generic(self, sql):
+        """SQLite (локальная разработка): EXPLAIN QUERY PLAN, без ANALYZE и буферов."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            rows = cursor.fetchall()
+        depth = {0: -1}
+        lines, flags = [], []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+            # «SCAN таблица» без индекса; псевдонимы подзапросов (U0) — не таблицы
+            match = re.match(r'SCAN (\w+)$', detail)
+            if match and match.group(1) in self._tables() and self._rows(match.group(1)) >= self.large_rows:
+                flags.append(f'SEQ SCAN {match.group(1)} ({self._rows(match.group(1))} строк)')
+        return lines, flags
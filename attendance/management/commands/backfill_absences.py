@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Now
+
+from database.models import AttendanceSummary, AbsentStudent
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет дату и класс в отсутствиях, записанных до их денормализации '
+        '(и исправляет строки, разошедшиеся со сводкой). Безопасно запускать повторно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Сколько строк обновлять за один запрос')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        stale = AbsentStudent.objects.filter(
+            Q(date__isnull=True)
+            | Q(class_room__isnull=True)
+            | ~Q(date=F('attendance__date'))
+            | ~Q(class_room_id=F('attendance__class_room_id'))
+        )
+        summary = AttendanceSummary.objects.filter(id=OuterRef('attendance_id'))
+
+        # пачками по первичному ключу: не держим длинную блокировку на таблице отсутствий
+        updated = 0
+        last_id = 0
+        while True:
+            ids = list(stale.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            updated += AbsentStudent.objects.filter(id__in=ids).update(
+                date=Subquery(summary.values('date')[:1]),
+                class_room_id=Subquery(summary.values('class_room_id')[:1]),
+                updated_at=Now(),
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Обновлено отсутствий: {updated}'))
@@ -0,0 +1,161 @@
+import json
+import platform
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from attendance.services import school_calendar
+from attendance.services.benchmark_data import latency_summary
+from attendance.views.stats import SECTION_BUILDERS
+from database.models import ClassRoom, Student, AttendanceSummary
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку и число SQL-запросов основных страниц через Django test client. '
+        'Результат можно сохранить в JSON и сравнить с предыдущим релизом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Замеров на сценарий')
+        parser.add_argument('--warmup', type=int, default=2, help='Прогревочных запросов (не учитываются)')
+        parser.add_argument('--teacher', default='bench_teacher_1', help='Логин учителя для главной страницы')
+        parser.add_argument('--deputy', default='bench_deputy', help='Логин завуча для статистики и выгрузок')
+        parser.add_argument('--only', action='append', default=[], help='Запустить только указанные сценарии')
+        parser.add_argument('--output', help='Путь к JSON-файлу с результатами')
+        parser.add_argument('--compare', help='JSON предыдущего прогона для сравнения p50 и числа запросов')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должно быть не меньше 1')
+        teacher = User.objects.filter(username=options['teacher']).first()
+        deputy = User.objects.filter(username=options['deputy']).first()
+        if not teacher or not deputy:
+            raise CommandError('Пользователи не найдены. Сначала выполните manage.py seed_benchmark.')
+
+        latest_day = AttendanceSummary.objects.aggregate(d=Max('date'))['d'] or timezone.localdate()
+        teacher_class = ClassRoom.objects.filter(staff=teacher).order_by('id').first()
+
+        scenarios = self._scenarios(teacher, deputy, teacher_class, latest_day)
+        if options['only']:
+            scenarios = [s for s in scenarios if s[0] in options['only']]
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, user, method, url, data in scenarios:
+                results[name] = self._run(user, method, url, data, options['iterations'], options['warmup'])
+                row = results[name]
+                self.stdout.write(
+                    f'{name:<28} p50={row["latency_ms"]["p50"]:>8} мс  '
+                    f'p95={row["latency_ms"]["p95"]:>8} мс  запросов={row["queries"]["max"]}'
+                )
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'db_vendor': connection.vendor,
+            },
+            'dataset': {
+                'classes': ClassRoom.objects.count(),
+                'students': Student.objects.filter(is_active=True).count(),
+                'summaries': AttendanceSummary.objects.count(),
+                'latest_day': latest_day.isoformat(),
+                'today_is_school_day': school_calendar.is_school_day(timezone.localdate()),
+            },
+            'iterations': options['iterations'],
+            'scenarios': results,
+        }
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Результаты сохранены: {options["output"]}'))
+
+        if options['compare']:
+            self._compare(json.loads(Path(options['compare']).read_text(encoding='utf-8')), report)
+
+    def _scenarios(self, teacher, deputy, teacher_class, day):
+        post_data = {'row_count': '0'}
+        if teacher_class:
+            student_ids = list(
+                Student.objects.filter(class_room=teacher_class, is_active=True)
+                .order_by('id').values_list('id', flat=True)[:3]
+            )
+            ids = ','.join(str(sid) for sid in student_ids)
+            post_data = {
+                'row_count': '1',
+                'class_0': str(teacher_class.id),
+                f'absent_students_{teacher_class.id}': ids,
+                f'all_absent_students_{teacher_class.id}': ids,
+            }
+
+        export_url = reverse('daily_statistics_export')
+        month = {'month': day.month, 'year': day.year}
+        return [
+            ('index_get', teacher, 'get', reverse('index'), None),
+            ('index_post', teacher, 'post', reverse('index'), post_data),
+            ('statistics', deputy, 'get', reverse('statistics'), month),
+            # страница статистики — оболочка, данные приходят из разделов
+            *(
+                (f'statistics:{name}', deputy, 'get', reverse('statistics_section', args=[name]), month)
+                for name in SECTION_BUILDERS
+            ),
+            ('export_excel', deputy, 'get', export_url, {'date': day.isoformat(), 'format': 'excel'}),
+            ('export_word', deputy, 'get', export_url, {'date': day.isoformat(), 'format': 'word'}),
+            ('manage_students', deputy, 'get', reverse('manage_students'), None),
+        ]
+
+    def _run(self, user, method, url, data, iterations, warmup):
+        client = Client()
+        client.force_login(user)
+        timings, query_counts, statuses = [], [], {}
+
+        for i in range(warmup + iterations):
+            # лог запросов соединения ограничен 9000 записями — очищаем, чтобы счётчик не «упирался» в потолок
+            connection.queries_log.clear()
+            # POST выполняем в транзакции с откатом, чтобы замеры не меняли данные
+            with transaction.atomic(), CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                elapsed = (time.perf_counter() - started) * 1000
+                if method == 'post':
+                    transaction.set_rollback(True)
+
+            if i < warmup:
+                continue
+            timings.append(elapsed)
+            query_counts.append(len(ctx.captured_queries))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        return {
+            'url': url,
+            'method': method.upper(),
+            'latency_ms': latency_summary(timings),
+            'queries': {'min': min(query_counts), 'max': max(query_counts)},
+            'statuses': {str(k): v for k, v in statuses.items()},
+        }
+
+    def _compare(self, baseline, current):
+        self.stdout.write('\nСравнение с базовым прогоном (p50, запросы):')
+        for name, row in current['scenarios'].items():
+            old = baseline.get('scenarios', {}).get(name)
+            if not old:
+                self.stdout.write(f'{name:<28} нет в базовом прогоне')
+                continue
+            old_p50, new_p50 = old['latency_ms']['p50'], row['latency_ms']['p50']
+            delta = (new_p50 - old_p50) / old_p50 * 100 if old_p50 else 0.0
+            self.stdout.write(
+                f'{name:<28} {old_p50:>8} → {new_p50:>8} мс ({delta:+.1f}%)  '
+                f'запросов {old["queries"]["max"]} → {row["queries"]["max"]}'
+            )
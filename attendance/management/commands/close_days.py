@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from attendance.services import day_snapshots
+from database.models import DaySnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Закрывает прошедшие дни: для каждого дня, где окно редактирования истекло у всех сводок, '
+        'записывает неизменяемый снимок (сжатый JSON), из которого читают статистика и выгрузки. '
+        'Запускать по расписанию, например ночью; повторный запуск закрывает только новые дни.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Удалить все снимки и собрать их заново')
+        parser.add_argument('--dry-run', action='store_true', help='Только показать, какие дни будут закрыты')
+
+    def handle(self, *args, **options):
+        if options['rebuild'] and not options['dry_run']:
+            deleted = DaySnapshot.objects.all().delete()[0]
+            self.stdout.write(f'Удалено снимков: {deleted}')
+
+        days = day_snapshots.closable_days()
+        if options['dry_run']:
+            period = f' ({days[0]:%d.%m.%Y} — {days[-1]:%d.%m.%Y})' if days else ''
+            self.stdout.write(f'К закрытию дней: {len(days)}{period}')
+            return
+
+        closed = day_snapshots.close_days(days)
+        self.stdout.write(self.style.SUCCESS(f'Закрыто дней: {len(closed)}'))
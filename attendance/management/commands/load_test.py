@@ -0,0 +1,289 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPException
+from http.cookiejar import CookieJar
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from attendance.services import school_calendar
+from attendance.services.benchmark_data import BENCH_PASSWORD, latency_summary
+from attendance.views.stats import SECTION_BUILDERS
+from database.models import ClassRoom, Student, AttendanceSummary
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    """Редиректы не выполняем: 302 после POST — это и есть успешный ответ."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+        self.failed_posts = []  # (class_id, status) — кандидаты в коллизии unique_together
+
+    def record(self, label, status, elapsed_ms, ok):
+        with self.lock:
+            self.latencies[label].append(elapsed_ms)
+            self.statuses[label][status] += 1
+            if not ok:
+                self.errors[label] += 1
+
+
+class VirtualUser:
+    """Отдельная «вкладка браузера»: свои cookies, сессия и CSRF-токен."""
+
+    def __init__(self, base_url, stats, timeout):
+        self.base_url = base_url
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirect)
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, label, path, data=None, ok_statuses=(200,)):
+        url = urljoin(self.base_url, path)
+        body = None
+        if data is not None:
+            data = {**data, 'csrfmiddlewaretoken': self.csrf_token()}
+            body = urlencode(data, doseq=True).encode('utf-8')
+        req = Request(url, data=body, headers={'Referer': url})
+
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                resp.read()
+                status = resp.status
+        except HTTPError as exc:
+            status = exc.code
+        except (URLError, HTTPException, TimeoutError, ConnectionError):
+            # HTTPException: оборванный ответ (IncompleteRead) и прочие ошибки протокола
+            status = 0
+        elapsed = (time.perf_counter() - started) * 1000
+
+        ok = status in ok_statuses
+        self.stats.record(label, status, elapsed, ok)
+        return status
+
+    def login(self, username, password):
+        self.request('login_page', '/login/')
+        status = self.request(
+            'login', '/login/', {'username': username, 'password': password}, ok_statuses=(302,)
+        )
+        return status == 302
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест «утреннего пика»: N учителей одновременно сдают посещаемость через главную страницу, '
+        'завучи параллельно открывают статистику и выгрузки. Работает против запущенного сервера '
+        'с базой, заполненной manage.py seed_benchmark.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Адрес запущенного сервера')
+        parser.add_argument('--teachers', type=int, default=40, help='Сколько учителей сдают отчёт')
+        parser.add_argument('--deputies', type=int, default=2, help='Сколько завучей смотрят статистику')
+        parser.add_argument('--ramp', type=float, default=30.0,
+                            help='За сколько секунд стартуют все учителя («сжатое» окно 7:50–8:05)')
+        parser.add_argument('--edit-rate', type=float, default=0.3,
+                            help='Доля учителей, которые правят отчёт в 30-минутное окно')
+        parser.add_argument('--collide-rate', type=float, default=0.05,
+                            help='Доля классов, которые одновременно отправляют два сотрудника')
+        parser.add_argument('--password', default=BENCH_PASSWORD, help='Пароль bench-пользователей')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Таймаут одного запроса, сек')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Путь к JSON-файлу с результатами')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        today = timezone.localdate()
+        if not school_calendar.is_school_day(today):
+            self.stdout.write(self.style.WARNING(
+                'Сегодня не учебный день: сервер отклонит сохранение, замер POST будет нерепрезентативным.'
+            ))
+
+        plan = self._build_plan(options['teachers'])
+        if not plan:
+            raise CommandError('Нет bench-учителей с классами. Сначала выполните manage.py seed_benchmark.')
+        deputies = list(User.objects.filter(username__startswith='bench_deputy')[:1]) * options['deputies']
+
+        already_reported = set(
+            AttendanceSummary.objects.filter(date=today).values_list('class_room_id', flat=True)
+        )
+        if already_reported:
+            self.stdout.write(self.style.WARNING(
+                f'За сегодня уже есть {len(already_reported)} сводок — эти классы пойдут через окно правки.'
+            ))
+
+        stats = Stats()
+        done = threading.Event()
+        base_url = options['base_url']
+
+        def teacher_flow(item, job_rng):
+            time.sleep(item['delay'])
+            user = VirtualUser(base_url, stats, options['timeout'])
+            if not user.login(item['username'], options['password']):
+                return
+            user.request('index_get', '/')
+            status = user.request('index_post', '/', self._absence_form(item, job_rng), ok_statuses=(302,))
+            if status != 302:
+                with stats.lock:
+                    stats.failed_posts.append((item['class_id'], status))
+            if job_rng.random() < options['edit_rate']:
+                time.sleep(job_rng.uniform(0.5, 3.0))
+                user.request('index_edit_get', f'/?edit_class={item["class_id"]}')
+                form = self._absence_form(item, job_rng, edit=True)
+                user.request('index_edit_post', '/', form, ok_statuses=(302,))
+
+        month = urlencode({'month': today.month, 'year': today.year})
+        # страница статистики — оболочка, данные браузер догружает по разделам
+        sections = {name: reverse('statistics_section', args=[name]) for name in SECTION_BUILDERS}
+
+        def deputy_flow(deputy):
+            user = VirtualUser(base_url, stats, options['timeout'])
+            if not user.login(deputy.username, options['password']):
+                return
+            n = 0
+            while not done.is_set():
+                user.request('statistics', f'/statistics/?{month}')
+                for name, path in sections.items():
+                    user.request(f'statistics:{name}', f'{path}?{month}')
+                fmt = ('excel', 'word')[n % 2]
+                user.request(f'export_{fmt}', f'/statistics/export-day/?date={today.isoformat()}&format={fmt}')
+                n += 1
+
+        for item in plan:
+            item['delay'] = rng.uniform(0, options['ramp'])
+        # коллизии: тот же класс почти одновременно отправляет второй сотрудник
+        colliders = [dict(item) for item in plan if rng.random() < options['collide_rate']]
+        jobs = plan + colliders
+
+        self.stdout.write(
+            f'Учителей: {len(plan)}, дублирующих отправок: {len(colliders)}, завучей: {len(deputies)}, '
+            f'разгон {options["ramp"]} с, сервер {base_url}'
+        )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(len(deputies), 1)) as deputy_pool:
+            for deputy in deputies:
+                deputy_pool.submit(deputy_flow, deputy)
+            try:
+                with ThreadPoolExecutor(max_workers=len(jobs)) as teacher_pool:
+                    # у каждого потока свой генератор: random.Random между потоками не делим
+                    futures = [
+                        teacher_pool.submit(teacher_flow, item, random.Random(rng.random()))
+                        for item in jobs
+                    ]
+                    for future in futures:
+                        future.result()
+            finally:
+                # иначе при ошибке или Ctrl-C потоки завучей крутятся вечно, а выход из пула их ждёт
+                done.set()
+        wall = time.perf_counter() - started
+
+        report = self._report(stats, wall, today)
+        self._print(report)
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Результаты сохранены: {options["output"]}'))
+
+    def _build_plan(self, count):
+        teachers = {
+            u.id: u.username
+            for u in User.objects.filter(username__startswith='bench_teacher_', is_active=True)
+        }
+        classes = list(
+            ClassRoom.objects.filter(teacher_id__in=teachers).order_by('id').values('id', 'teacher_id')[:count]
+        )
+        students = defaultdict(list)
+        for sid, cid in Student.objects.filter(
+            class_room_id__in=[c['id'] for c in classes], is_active=True
+        ).values_list('id', 'class_room_id'):
+            students[cid].append(sid)
+
+        return [
+            {'username': teachers[c['teacher_id']], 'class_id': c['id'], 'students': students[c['id']]}
+            for c in classes
+        ]
+
+    @staticmethod
+    def _absence_form(item, rng, edit=False):
+        """Форма главной страницы для одного класса: случайные отсутствующие по причинам."""
+        absent = rng.sample(item['students'], k=min(len(item['students']), rng.randint(0, 4)))
+        split = rng.randint(0, len(absent))
+        unexcused, orvi = absent[:split], absent[split:]
+        cid = item['class_id']
+        form = {
+            'row_count': '1',
+            'class_0': str(cid),
+            f'absent_students_{cid}': ','.join(map(str, unexcused)),
+            f'orvi_students_{cid}': ','.join(map(str, orvi)),
+            f'all_absent_students_{cid}': ','.join(map(str, absent)),
+            'reported_present_0': str(len(item['students']) - len(absent)),
+        }
+        if edit:
+            form['edit_class'] = str(cid)
+        return form
+
+    @staticmethod
+    def _report(stats, wall, today):
+        # POST, упавший с ошибкой, хотя сводка класса за сегодня в итоге есть, —
+        # это проигранная гонка за unique_together (class_room, date)
+        reported = set(
+            AttendanceSummary.objects.filter(date=today).values_list('class_room_id', flat=True)
+        )
+        collisions = sum(1 for cid, status in stats.failed_posts if status >= 500 and cid in reported)
+
+        total = sum(len(v) for v in stats.latencies.values())
+        errors = sum(stats.errors.values())
+        return {
+            'created_at': timezone.now().isoformat(),
+            'wall_seconds': round(wall, 2),
+            'requests': total,
+            'throughput_rps': round(total / wall, 2) if wall else None,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0.0,
+            'unique_together_collisions': collisions,
+            'endpoints': {
+                label: {
+                    'latency_ms': latency_summary(samples),
+                    'errors': stats.errors.get(label, 0),
+                    'statuses': {str(k): v for k, v in stats.statuses[label].items()},
+                }
+                for label, samples in sorted(stats.latencies.items())
+            },
+        }
+
+    def _print(self, report):
+        self.stdout.write(
+            f'\nЗапросов: {report["requests"]} за {report["wall_seconds"]} с '
+            f'({report["throughput_rps"]} rps), ошибок: {report["errors"]} ({report["error_rate"]:.2%}), '
+            f'коллизий unique_together: {report["unique_together_collisions"]}'
+        )
+        for label, row in report['endpoints'].items():
+            lat = row['latency_ms']
+            self.stdout.write(
+                f'{label:<28} n={lat["count"]:<5} p50={lat["p50"]:>8} p95={lat["p95"]:>8} '
+                f'p99={lat["p99"]:>8} мс  ошибок={row["errors"]}  {row["statuses"]}'
+            )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.services import file_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет просроченные файлы из файловых кэшей (по умолчанию — из всех): готовые выгрузки '
+        'закрытых дней, секции статистики, сессии. Запускать по расписанию, например ночью.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alias', action='append', help='Кэш из CACHES (можно несколько раз)')
+
+    def handle(self, *args, **options):
+        aliases = options['alias'] or file_cache.file_cache_aliases()
+        unknown = set(aliases) - set(file_cache.file_cache_aliases())
+        if unknown:
+            raise CommandError(f'Не файловые или неизвестные кэши: {", ".join(sorted(unknown))}')
+        for alias in aliases:
+            self.stdout.write(f'{alias}: удалено файлов {file_cache.sweep_expired(alias)}')
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from attendance.services import absence_history
+from database.models import StudentMonthlyAbsence
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает месячные счётчики пропусков учеников (история ученика) по всем отсутствиям. '
+        'Нужен после первого развёртывания и после ручных правок отсутствий в админке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-empty', action='store_true', help='Пересчитать, только если счётчиков ещё нет')
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and StudentMonthlyAbsence.objects.exists():
+            self.stdout.write('Счётчики уже построены, пропускаю.')
+            return
+        created = absence_history.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Счётчиков создано: {created}'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from attendance.services import absence_state
+from database.models import StudentAbsenceState
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает состояния пропусков учеников (серии и доля пропусков за месяц) по всей истории. '
+        'Нужен после первого развёртывания и после правок прошлых дней в админке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-empty', action='store_true', help='Пересчитать, только если состояний ещё нет')
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and StudentAbsenceState.objects.exists():
+            self.stdout.write('Состояния уже построены, пропускаю.')
+            return
+        count = absence_state.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Состояний учеников: {count}'))
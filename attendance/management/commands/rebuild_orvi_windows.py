@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from attendance.services import orvi_watch
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает скользящие окна ОРВИ по классам и параллелям на последний день с отчётами'
+
+    def handle(self, *args, **options):
+        count = orvi_watch.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Окон ОРВИ: {count}'))
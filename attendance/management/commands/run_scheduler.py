@@ -0,0 +1,114 @@
+import logging
+import signal
+import threading
+import time
+from datetime import timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from attendance.services import scheduler
+from database.models import JobLease, JobRun
+
+logger = logging.getLogger(__name__)
+
+
+def _seconds_to_next_minute() -> float:
+    return 60 - time.time() % 60 + 0.1
+
+
+def _moment(value) -> str:
+    return f'{timezone.localtime(value):%d.%m.%Y %H:%M}' if value else '—'
+
+
+class Command(BaseCommand):
+    help = (
+        'Планировщик периодических задач (SCHEDULER_JOBS в настройках): раз в минуту запускает '
+        'задачи, чьё время пришло. Можно запускать в нескольких экземплярах — каждый запуск '
+        'выполнит один из них (аренда в БД). Длительность и ошибки запусков — в админке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list', action='store_true', help='Показать задачи и ближайшие запуски')
+        parser.add_argument('--run', metavar='JOB', help='Выполнить задачу сейчас, вне расписания')
+        parser.add_argument('--once', action='store_true', help='Проверить расписание один раз и выйти')
+
+    def handle(self, *args, **options):
+        try:
+            jobs = scheduler.jobs()
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+        if options['list']:
+            self._list(jobs)
+            return
+
+        holder = scheduler.holder()
+        scheduler.ensure_leases(jobs)
+        if options['run']:
+            self._run_now(jobs, options['run'], holder)
+            return
+
+        self.stop = threading.Event()
+        if not options['once']:
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                # текущая задача доработает, следующие не начнутся
+                signal.signal(signum, lambda *_: self.stop.set())
+        self.stdout.write(f'Планировщик {holder}: задач {len(jobs)}')
+
+        checked = timezone.now() - timedelta(minutes=1)
+        while True:
+            tick = timezone.now()
+            try:
+                self._tick(jobs, checked, tick, holder)
+            except DatabaseError:
+                # БД недоступна или ещё не мигрирована — пробуем в следующую минуту
+                logger.exception('Планировщик: ошибка БД')
+            finally:
+                close_old_connections()
+            checked = tick
+            if options['once'] or self.stop.wait(_seconds_to_next_minute()):
+                break
+
+    def _tick(self, jobs, checked, tick, holder):
+        """Запуски, чьё время наступило после прошлой проверки (checked, tick]."""
+        for job in jobs.values():
+            if self.stop.is_set():
+                return
+            slot = job.schedule.next_after(checked)
+            if slot is None or slot > tick:
+                continue
+            record = scheduler.run_due(job, slot, holder)
+            if record is not None:
+                self._report(record)
+
+    def _run_now(self, jobs, name, holder):
+        job = jobs.get(name)
+        if job is None:
+            raise CommandError(f'Нет задачи {name}. Задачи: {", ".join(jobs)}')
+        if not scheduler.acquire(job, holder):
+            raise CommandError(f'Задача {name} уже выполняется')
+        try:
+            record = scheduler.run(job, holder)
+        finally:
+            scheduler.release(job, holder)
+        self._report(record)
+        if record.output:
+            self.stdout.write(record.output, ending='')
+        if record.status == JobRun.Status.FAILED:
+            raise CommandError(record.error.strip().splitlines()[-1])
+
+    def _report(self, record):
+        line = f'{_moment(record.started_at)} {record.job}: {record.get_status_display()} за {record.duration_ms} мс'
+        failed = record.status == JobRun.Status.FAILED
+        self.stdout.write(self.style.ERROR(line) if failed else line)
+
+    def _list(self, jobs):
+        now = timezone.now()
+        last_slots = dict(JobLease.objects.filter(name__in=jobs).values_list('name', 'last_slot'))
+        for job in jobs.values():
+            self.stdout.write(
+                f'{job.name:<26} {str(job.schedule):<14} следующий: {_moment(job.schedule.next_after(now)):<16}  '
+                f'последний: {_moment(last_slots.get(job.name))}'
+            )
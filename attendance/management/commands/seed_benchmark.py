@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.services import benchmark_data
+
+
+class Command(BaseCommand):
+    help = 'Генерирует данные «большой школы» для замеров производительности (классы, ученики, сводки)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=44, help='Количество классов')
+        parser.add_argument('--students-per-class', type=int, default=28, help='Учеников в каждом классе')
+        parser.add_argument('--days', type=int, default=60, help='Сколько последних учебных дней заполнить')
+        parser.add_argument('--seed', type=int, default=0, help='Seed генератора случайных чисел')
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help='Предварительно удалить ВСЕ классы, учеников и посещаемость (только для стенда!)',
+        )
+
+    def handle(self, *args, **options):
+        if options['classes'] <= 0 or options['students_per_class'] <= 0 or options['days'] < 0:
+            raise CommandError('--classes и --students-per-class должны быть > 0, --days >= 0')
+
+        if options['flush']:
+            benchmark_data.flush_school_data()
+            self.stdout.write('Старые данные удалены.')
+
+        result = benchmark_data.seed_school(
+            classes=options['classes'],
+            students_per_class=options['students_per_class'],
+            days=options['days'],
+            seed=options['seed'],
+            stdout=self.stdout,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: классов {result.classes}, учеников {result.students}, '
+            f'сводок {result.summaries}, отсутствий {result.absences}. '
+            f'Пароль пользователей bench_*: {benchmark_data.BENCH_PASSWORD}'
+        ))
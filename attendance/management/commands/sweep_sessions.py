@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from attendance.services import file_cache
+
+
+class Command(BaseCommand):
+    help = 'Удаляет истёкшие сессии из БД (пачками) и просроченные файлы кэша сессий'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Сколько строк удалять за один запрос')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        now = timezone.now()
+
+        # пачками по первичному ключу: не держим длинную блокировку на django_session
+        deleted_rows = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                break
+            deleted_rows += Session.objects.filter(session_key__in=keys).delete()[0]
+
+        deleted_files = file_cache.sweep_expired(getattr(settings, 'SESSION_CACHE_ALIAS', 'default'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено сессий из БД: {deleted_rows}, файлов кэша: {deleted_files}'
+        ))
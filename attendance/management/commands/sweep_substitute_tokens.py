@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from database.models import SubstituteAccessToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет (пачками) токены замены, истёкшие или отозванные раньше, чем '
+        'SUBSTITUTE_TOKEN_RETENTION_DAYS дней назад. Запускать по расписанию, например раз в сутки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Сколько строк удалять за один запрос')
+        parser.add_argument('--days', type=int, help='Сколько дней хранить (по умолчанию из настроек)')
+        parser.add_argument('--dry-run', action='store_true', help='Только посчитать, ничего не удалять')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        days = options['days'] if options['days'] is not None else settings.SUBSTITUTE_TOKEN_RETENTION_DAYS
+        cutoff = timezone.now() - timedelta(days=max(0, days))
+
+        # два условия — два прохода, каждый по своему частичному индексу
+        # (OR в одном запросе планировщик по этим индексам не соберёт)
+        stale = [
+            SubstituteAccessToken.objects.filter(revoked_at__isnull=True, expires_at__lt=cutoff),
+            SubstituteAccessToken.objects.filter(revoked_at__lt=cutoff),
+        ]
+        if options['dry_run']:
+            total = sum(qs.count() for qs in stale)
+            self.stdout.write(f'К удалению токенов: {total} (старше {cutoff:%d.%m.%Y %H:%M})')
+            return
+
+        deleted = 0
+        for qs in stale:
+            while True:
+                ids = list(qs.order_by().values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                deleted += SubstituteAccessToken.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'Удалено токенов замены: {deleted}'))
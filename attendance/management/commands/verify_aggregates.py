@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+from attendance.services import absence_history
+from attendance.signals import roster_changed
+from database.models import ClassRoom, AbsentStudent, StudentMonthlyAbsence
+from database.signals import recalc_student_counts
+
+
+def _student_count_mismatches() -> list:
+    """Классы, у которых student_count расходится с числом активных учеников."""
+    rows = ClassRoom.objects.annotate(actual=Count('students', filter=Q(students__is_active=True))).values_list(
+        'id', 'name', 'student_count', 'actual')
+    return [(class_id, name, stored, actual) for class_id, name, stored, actual in rows if stored != actual]
+
+
+def _monthly_counter_mismatches() -> int:
+    """Сколько месячных счётчиков пропусков расходится с таблицей отсутствий (лишние и недостающие тоже)."""
+    expected = {
+        (r['student_id'], r['month'], r['reason']): r['cnt']
+        for r in AbsentStudent.objects.filter(date__isnull=False).annotate(month=TruncMonth('date')).values(
+            'student_id', 'month', 'reason').annotate(cnt=Count('id')).order_by().iterator()
+    }
+    stored = {
+        (student_id, month, reason): count
+        for student_id, month, reason, count in StudentMonthlyAbsence.objects.filter(absence_count__gt=0).values_list(
+            'student_id', 'month', 'reason', 'absence_count').iterator()
+    }
+    return sum(1 for key in expected.keys() | stored.keys() if expected.get(key) != stored.get(key))
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет денормализованные итоги с исходными таблицами: численность классов и месячные '
+        'счётчики пропусков учеников. При расхождениях завершается с ошибкой (в планировщике запуск '
+        'отмечается как неудачный); --fix пересчитывает разошедшиеся итоги.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Пересчитать итоги, которые разошлись')
+
+    def handle(self, *args, **options):
+        problems = []
+
+        counts = _student_count_mismatches()
+        for _, name, stored, actual in counts:
+            self.stdout.write(f'Класс {name}: численность {stored}, активных учеников {actual}')
+        if counts:
+            problems.append(f'численность классов: {len(counts)}')
+
+        counters = _monthly_counter_mismatches()
+        if counters:
+            self.stdout.write(f'Месячных счётчиков пропусков с расхождением: {counters}')
+            problems.append(f'счётчики пропусков: {counters}')
+
+        if not problems:
+            self.stdout.write(self.style.SUCCESS('Итоги сходятся'))
+            return
+        if not options['fix']:
+            raise CommandError(f'Расхождения — {"; ".join(problems)}. Исправить: verify_aggregates --fix')
+
+        if counts:
+            class_ids = [class_id for class_id, *_ in counts]
+            recalc_student_counts(class_ids)
+            roster_changed(class_ids, counts=True)
+        if counters:
+            absence_history.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Пересчитано — {"; ".join(problems)}'))
@@ -0,0 +1,60 @@
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from attendance.services import class_directory, class_rosters, data_version, missing_reports, roles, warmup
+from attendance.views.stats import SECTION_BUILDERS, cached_section
+
+
+def _warm_roles() -> int:
+    users = get_user_model().objects.filter(Q(groups__isnull=False) | Q(is_staff=True), is_active=True).distinct()
+    return roles.warm(users)
+
+
+def _warm_rosters() -> int:
+    return class_rosters.warm([c.id for c in class_directory.classes()])
+
+
+def _warm_missing_board() -> str:
+    board = missing_reports.board(timezone.localdate())
+    return f"сдали {board['reported']} из {board['total']}"
+
+
+async def _warm_statistics(year, month) -> int:
+    version = await data_version.month_version(year, month)
+    for name in SECTION_BUILDERS:
+        await cached_section(name, year, month, version)
+    return len(SECTION_BUILDERS)
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кэши перед утренним пиком: роли сотрудников, составы классов для главной, '
+        'табло несданных отчётов и секции статистики текущего месяца. Печатает время каждого этапа.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-statistics', action='store_true', help='Не строить секции статистики')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        stages = [
+            *warmup.PROCESS_STAGES,
+            ('Роли сотрудников', _warm_roles),
+            ('Составы классов', _warm_rosters),
+            ('Табло «кто не сдал»', _warm_missing_board),
+        ]
+        if not options['skip_statistics']:
+            stages.append(
+                (f'Статистика {today.month:02d}.{today.year}',
+                 lambda: async_to_sync(_warm_statistics)(today.year, today.month))
+            )
+
+        total = 0.0
+        for label, func in stages:
+            result, seconds = warmup.timed(func)
+            total += seconds
+            self.stdout.write(f'{label:<24} {seconds * 1000:>9.1f} мс  {result}')
+        self.stdout.write(self.style.SUCCESS(f'Кэши прогреты за {total * 1000:.0f} мс'))
@@ -1,9 +1,46 @@
+import cProfile
+import time
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.contrib import messages
-from django.contrib.auth import logout
+from django.contrib.auth import alogout, logout
+from django.db import connection
 from django.shortcuts import redirect
 from django.urls import reverse
+from whitenoise.middleware import WhiteNoiseMiddleware
 
 from database.models import SubstituteAccessToken
+from .services import profiling
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, который умеет работать в async-цепочке middleware.
+    Штатный WhiteNoiseMiddleware только синхронный: под ASGI из-за него Django
+    выполнял бы каждый запрос (включая async views) через поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
 
 
 class SubstituteTokenMiddleware:
@@ -12,18 +49,35 @@ class SubstituteTokenMiddleware:
     - проверяем, что токен ещё активен (не истёк и не отозван)
     - если не активен -> разлогиниваем и кидаем на вход по токену
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
-    def __call__(self, request):
-        token_id = request.session.get('substitute_token_id')
-
+    @staticmethod
+    def _token_login_path():
         # не мешаем обычному логину/странице ввода токена
-        token_login_path = None
         try:
-            token_login_path = reverse('substitute_login')
+            return reverse('substitute_login')
         except Exception:
-            token_login_path = None
+            return None
+
+    def _expired_response(self, request, token_login_path):
+        messages.error(request, 'Срок действия токена замены истёк или токен отозван. Войдите снова.')
+        if token_login_path:
+            return redirect('substitute_login')
+        return None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        token_id = request.session.get('substitute_token_id')
+        token_login_path = self._token_login_path()
 
         if (
             token_id
@@ -34,8 +88,87 @@ class SubstituteTokenMiddleware:
             if not tok or not tok.is_active:
                 logout(request)
                 request.session.flush()
-                messages.error(request, 'Срок действия токена замены истёк или токен отозван. Войдите снова.')
-                if token_login_path:
-                    return redirect('substitute_login')
+                response = self._expired_response(request, token_login_path)
+                if response:
+                    return response
 
         return self.get_response(request)
+
+    async def __acall__(self, request):
+        token_id = await request.session.aget('substitute_token_id')
+        token_login_path = self._token_login_path()
+
+        if token_id and (not token_login_path or request.path != token_login_path):
+            user = await request.auser()
+            if user.is_authenticated:
+                tok = await SubstituteAccessToken.objects.filter(id=token_id).afirst()
+                if not tok or not tok.is_active:
+                    await alogout(request)
+                    await request.session.aflush()
+                    response = self._expired_response(request, token_login_path)
+                    if response:
+                        return response
+
+        return await self.get_response(request)
+
+
+class RequestProfilerMiddleware:
+    """
+    Профилирование одного запроса по требованию сотрудника (is_staff):
+    добавьте к адресу ?_profile=1 — запрос выполнится под cProfile с записью SQL,
+    отчёт сохранится в PROFILING_DIR и будет доступен на странице /admin/profiles/.
+    Имя отчёта возвращается в заголовке X-Profile-Id.
+
+    Под ASGI профилируемый запрос выполняется в отдельном потоке: туда же попадают
+    ORM-запросы async views (sync_to_async), поэтому SQL и основная работа видны в профиле.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if request.GET.get('_profile') != '1' or not getattr(request.user, 'is_staff', False):
+            return self.get_response(request)
+        return self._profile(request, self.get_response)
+
+    async def __acall__(self, request):
+        if request.GET.get('_profile') != '1':
+            return await self.get_response(request)
+        user = await request.auser()
+        if not user.is_staff:
+            return await self.get_response(request)
+        return await sync_to_async(self._profile)(request, async_to_sync(self.get_response))
+
+    def _profile(self, request, get_response):
+        profiler = cProfile.Profile()
+        recorder = profiling.QueryRecorder()
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # уже работает другой профилировщик — просто выполняем запрос
+            return get_response(request)
+        try:
+            with connection.execute_wrapper(recorder):
+                response = get_response(request)
+        finally:
+            profiler.disable()
+
+        match = getattr(request, 'resolver_match', None)
+        name = profiling.save_profile(profiler, recorder.queries, {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': match.view_name if match else '',
+            'status': response.status_code,
+            'user': request.user.get_username(),
+            'total_ms': round((time.perf_counter() - started) * 1000, 3),
+        })
+        response['X-Profile-Id'] = name
+        return response
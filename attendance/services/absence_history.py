@@ -0,0 +1,146 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+from database.models import AbsentStudent, StudentMonthlyAbsence
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def school_year_start(today: date) -> date:
+    """1 сентября текущего учебного года."""
+    return date(today.year if today.month >= 9 else today.year - 1, 9, 1)
+
+
+def iter_months(first: date, last: date):
+    month = month_start(first)
+    while month <= last:
+        yield month
+        month = next_month(month)
+
+
+@transaction.atomic
+def recount_month(student_ids, day: date) -> None:
+    """
+    Пересчитывает месячные счётчики указанных учеников за месяц дня `day`.
+    Вызывается после сохранения посещаемости класса: учеников немного, строки
+    выбираются по индексу (student, date).
+    """
+    student_ids = set(student_ids)
+    if not student_ids:
+        return
+    month = month_start(day)
+    rows = AbsentStudent.objects.filter(
+        student_id__in=student_ids, date__gte=month, date__lt=next_month(month)
+    ).values('student_id', 'reason').annotate(cnt=Count('id'))
+    counters = [
+        StudentMonthlyAbsence(student_id=r['student_id'], month=month, reason=r['reason'], absence_count=r['cnt'])
+        for r in rows
+    ]
+    # удаляем и старые счётчики причин, которых у ученика больше нет
+    StudentMonthlyAbsence.objects.filter(student_id__in=student_ids, month=month).delete()
+    # upsert: параллельное сохранение того же класса не упадёт на unique_together
+    StudentMonthlyAbsence.objects.bulk_create(
+        counters,
+        update_conflicts=True,
+        unique_fields=['student', 'month', 'reason'],
+        update_fields=['absence_count'],
+    )
+
+
+@transaction.atomic
+def rebuild_all(batch_size=5000) -> int:
+    """Полный пересчёт счётчиков по всем отсутствиям (стенд, восстановление после ручных правок)."""
+    StudentMonthlyAbsence.objects.all().delete()
+    rows = AbsentStudent.objects.filter(date__isnull=False).annotate(month=TruncMonth('date')).values(
+        'student_id', 'month', 'reason'
+    ).annotate(cnt=Count('id')).order_by()
+    counters = [
+        StudentMonthlyAbsence(student_id=r['student_id'], month=r['month'], reason=r['reason'], absence_count=r['cnt'])
+        for r in rows.iterator()
+    ]
+    StudentMonthlyAbsence.objects.bulk_create(counters, batch_size=batch_size)
+    return len(counters)
+
+
+def parse_cursor(raw):
+    """Курсор вида «2026-03-16.123» (дата и id последней строки страницы) или None."""
+    try:
+        day, pk = (raw or '').split('.', 1)
+        return date.fromisoformat(day), int(pk)
+    except ValueError:
+        return None
+
+
+def history_page(student, first_month: date, last_month: date, reason=None, cursor=None, limit=50) -> dict:
+    """
+    Страница истории пропусков ученика по возрастанию даты с курсорной пагинацией.
+    running_count — номер пропуска с начала периода: для первой строки страницы он
+    складывается из месячных счётчиков и короткого подсчёта внутри месяца курсора.
+    """
+    first_day = month_start(first_month)
+    last_day = next_month(last_month) - timedelta(days=1)
+
+    counters_qs = StudentMonthlyAbsence.objects.filter(student=student, month__range=(first_day, last_day))
+    absences = AbsentStudent.objects.filter(student=student, date__range=(first_day, last_day))
+    if reason:
+        counters_qs = counters_qs.filter(reason=reason)
+        absences = absences.filter(reason=reason)
+
+    by_month = defaultdict(dict)
+    for month, month_reason, cnt in counters_qs.values_list('month', 'reason', 'absence_count'):
+        by_month[month][month_reason] = cnt
+
+    running = 0
+    if cursor:
+        cur_date, cur_id = cursor
+        cur_month = month_start(cur_date)
+        running = sum(sum(counts.values()) for month, counts in by_month.items() if month < cur_month)
+        running += absences.filter(date__gte=cur_month).filter(
+            Q(date__lt=cur_date) | Q(date=cur_date, id__lte=cur_id)
+        ).count()
+        absences = absences.filter(Q(date__gt=cur_date) | Q(date=cur_date, id__gt=cur_id))
+
+    rows = list(absences.order_by('date', 'id').values('id', 'date', 'reason', 'class_room__name')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    reason_labels = dict(AbsentStudent.Reason.choices)
+    items = []
+    for row in rows:
+        running += 1
+        items.append({
+            'date': row['date'],
+            'reason': row['reason'],
+            'reason_display': reason_labels.get(row['reason'], row['reason']),
+            'class_name': row['class_room__name'],
+            'running_count': running,
+        })
+
+    months = []
+    totals = defaultdict(int)
+    for month in iter_months(first_day, last_day):
+        counts = by_month.get(month, {})
+        for key, value in counts.items():
+            totals[key] += value
+        months.append({'month': month, 'counts': counts, 'total': sum(counts.values())})
+
+    next_cursor = f'{rows[-1]["date"].isoformat()}.{rows[-1]["id"]}' if has_more else None
+    return {
+        'period': {'from': first_day, 'to': last_day},
+        'reason': reason,
+        'months': months,
+        'totals': dict(totals),
+        'total': sum(totals.values()),
+        'items': items,
+        'next_cursor': next_cursor,
+    }
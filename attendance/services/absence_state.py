@@ -0,0 +1,162 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from database.models import Student, AttendanceSummary, AbsentStudent, StudentAbsenceState
+from . import school_calendar
+
+
+# Доля пропусков за месяц не считается, пока у класса меньше стольких отчётов:
+# в начале месяца один пропуск из одного дня — это ещё не 100% пропусков
+MIN_MONTH_DAYS = 5
+
+STATE_FIELDS = [
+    'as_of', 'day_reason',
+    'streak_reason', 'streak_days', 'streak_start',
+    'prev_streak_reason', 'prev_streak_days', 'prev_streak_start',
+    'last_absent_date', 'prev_last_absent_date',
+    'month', 'month_days', 'month_missed', 'month_missed_ratio',
+]
+
+
+def advance(state: StudentAbsenceState, day: date, reason) -> bool:
+    """
+    Применяет к состоянию ученика один учебный день (reason=None — присутствовал).
+    Повторное применение того же дня сначала откатывает его прошлый вклад.
+    Возвращает False, если день старше состояния (такое чинит только полный пересчёт).
+    """
+    reason = reason or ''
+    month = day.replace(day=1)
+
+    if state.as_of == day:
+        base = (state.prev_streak_reason, state.prev_streak_days, state.prev_streak_start)
+        base_last_absent = state.prev_last_absent_date
+        state.month_days -= 1
+        if state.day_reason:
+            state.month_missed -= 1
+    elif state.as_of and state.as_of > day:
+        return False
+    else:
+        # серия продолжается, только если предыдущий учебный день тоже был учтён;
+        # день без отчёта класса серию обрывает
+        continues = state.as_of is not None and state.as_of == school_calendar.previous_school_day(day)
+        base = (state.streak_reason, state.streak_days, state.streak_start) if continues else ('', 0, None)
+        base_last_absent = state.last_absent_date
+        if state.month != month:
+            state.month = month
+            state.month_days = 0
+            state.month_missed = 0
+
+    state.prev_streak_reason, state.prev_streak_days, state.prev_streak_start = base
+    state.prev_last_absent_date = base_last_absent
+
+    if reason:
+        if base[0] == reason and base[1]:
+            state.streak_reason, state.streak_days, state.streak_start = reason, base[1] + 1, base[2]
+        else:
+            state.streak_reason, state.streak_days, state.streak_start = reason, 1, day
+        state.last_absent_date = day
+        state.month_missed += 1
+    else:
+        state.streak_reason, state.streak_days, state.streak_start = '', 0, None
+        state.last_absent_date = base_last_absent
+
+    state.month_days += 1
+    state.month_missed_ratio = state.month_missed / state.month_days
+    state.as_of = day
+    state.day_reason = reason
+    return True
+
+
+def _new_state(student_id, day):
+    return StudentAbsenceState(student_id=student_id, as_of=None, month=day.replace(day=1))
+
+
+def _save(states):
+    StudentAbsenceState.objects.bulk_create(
+        states,
+        update_conflicts=True,
+        unique_fields=['student'],
+        update_fields=STATE_FIELDS,
+        batch_size=1000,
+    )
+
+
+@transaction.atomic
+def apply_day(class_room_id: int, day: date, reasons_by_student: dict) -> None:
+    """
+    Инкрементальное обновление после сохранения посещаемости класса за день:
+    активные ученики без отсутствия прерывают серию, отсутствующие её продолжают.
+    Три запроса на класс независимо от истории.
+    """
+    student_ids = set(
+        Student.objects.filter(class_room_id=class_room_id, is_active=True).values_list('id', flat=True)
+    ) | set(reasons_by_student)
+    existing = {
+        s.student_id: s
+        for s in StudentAbsenceState.objects.select_for_update().filter(student_id__in=student_ids)
+    }
+    changed = []
+    for sid in student_ids:
+        state = existing.get(sid) or _new_state(sid, day)
+        if advance(state, day, reasons_by_student.get(sid)):
+            changed.append(state)
+    if changed:
+        _save(changed)
+
+
+@transaction.atomic
+def rebuild_all() -> int:
+    """
+    Полный пересчёт: все сводки проигрываются по порядку дат.
+    Нужен после первого развёртывания и после правок прошлых дней в админке.
+    """
+    StudentAbsenceState.objects.all().delete()
+
+    students_by_class = defaultdict(list)
+    for sid, cid in Student.objects.filter(is_active=True).values_list('id', 'class_room_id'):
+        students_by_class[cid].append(sid)
+
+    reasons_by_summary = defaultdict(dict)
+    for attendance_id, sid, reason in AbsentStudent.objects.values_list('attendance_id', 'student_id', 'reason'):
+        reasons_by_summary[attendance_id][sid] = reason
+
+    states = {}
+    summaries = AttendanceSummary.objects.order_by('date', 'id').values_list('id', 'class_room_id', 'date')
+    for summary_id, class_id, day in summaries.iterator():
+        reasons = reasons_by_summary.get(summary_id, {})
+        for sid in set(students_by_class.get(class_id, ())) | set(reasons):
+            state = states.get(sid)
+            if state is None:
+                state = states[sid] = _new_state(sid, day)
+            advance(state, day, reasons.get(sid))
+
+    _save(list(states.values()))
+    return len(states)
+
+
+def chronic_absences(today: date, streak_days: int, month_percent: int):
+    """
+    Ученики, пересёкшие пороги: не меньше streak_days учебных дней подряд без
+    уважительной причины или больше month_percent% пропущенных дней в текущем месяце.
+    Серия учитывается, только если последний пропуск не старше CHRONIC_ABSENCE_GRACE_DAYS:
+    состояние сбрасывается лишь следующим отчётом класса, и без него закончившаяся
+    серия висела бы в отчёте неделями.
+    Читает только таблицу состояний (плюс имена ученика и класса).
+    """
+    grace = timedelta(days=getattr(settings, 'CHRONIC_ABSENCE_GRACE_DAYS', 7))
+    return StudentAbsenceState.objects.filter(student__is_active=True).filter(
+        Q(streak_reason=AbsentStudent.Reason.UNEXCUSED, streak_days__gte=streak_days,
+          last_absent_date__gte=today - grace)
+        | Q(month=today.replace(day=1), month_days__gte=MIN_MONTH_DAYS, month_missed_ratio__gt=month_percent / 100)
+    ).select_related('student__class_room')
+
+
+def thresholds():
+    return (
+        getattr(settings, 'CHRONIC_ABSENCE_STREAK_DAYS', 3),
+        getattr(settings, 'CHRONIC_ABSENCE_MONTH_PERCENT', 30),
+    )
@@ -0,0 +1,271 @@
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.utils import timezone
+
+from database.models import (
+    ClassRoom,
+    Student,
+    PrivilegeType,
+    AttendanceSummary,
+    AbsentStudent,
+    StudentMonthlyAbsence,
+    StudentAbsenceState,
+    OrviWindowStat,
+)
+from . import absence_history, absence_state, orvi_watch, school_calendar
+
+
+CLASS_LETTERS = ['А', 'Б', 'В', 'Г', 'Д', 'Е', 'Ж', 'И', 'К', 'Л']
+
+LAST_NAMES = [
+    'Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов',
+    'Михайлов', 'Новиков', 'Фёдоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев', 'Семёнов',
+    'Егоров', 'Павлов', 'Козлов', 'Степанов', 'Николаев', 'Орлов', 'Андреев', 'Макаров',
+]
+FIRST_NAMES = [
+    'Александр', 'Максим', 'Артём', 'Михаил', 'Даниил', 'Иван', 'Дмитрий', 'Кирилл',
+    'Анна', 'Мария', 'София', 'Алиса', 'Виктория', 'Полина', 'Елизавета', 'Дарья',
+]
+
+# Доля отсутствующих по ОРВИ в зависимости от месяца (сезонность: пик в январе–феврале)
+ORVI_RATE_BY_MONTH = {
+    1: 0.11, 2: 0.12, 3: 0.08, 4: 0.05, 5: 0.03, 6: 0.01,
+    7: 0.01, 8: 0.01, 9: 0.03, 10: 0.06, 11: 0.08, 12: 0.09,
+}
+UNEXCUSED_RATE = 0.01
+OTHER_DISEASE_RATE = 0.02
+FAMILY_RATE = 0.01
+PRIVILEGED_RATE = 0.15
+MISSING_REPORT_RATE = 0.03
+
+BENCH_PASSWORD = 'bench'
+
+
+@dataclass
+class SeedResult:
+    classes: int = 0
+    students: int = 0
+    summaries: int = 0
+    absences: int = 0
+
+
+def bench_class_name(index: int) -> str:
+    """
+    Имя класса для стенда: 1А..11А, 1Б..11Б, ...
+    Если букв не хватает — добавляем номер параллели (1А2).
+    """
+    grade = index % 11 + 1
+    parallel = index // 11
+    letter = CLASS_LETTERS[parallel % len(CLASS_LETTERS)]
+    suffix = str(parallel // len(CLASS_LETTERS)) if parallel >= len(CLASS_LETTERS) else ''
+    return f'{grade}{letter}{suffix}'
+
+
+def recent_school_days(count: int, before: date) -> list[date]:
+    """Последние `count` учебных дней строго до `before` (по возрастанию)."""
+    days = []
+    day = before - timedelta(days=1)
+    while len(days) < count:
+        if school_calendar.is_school_day(day):
+            days.append(day)
+        day -= timedelta(days=1)
+    days.reverse()
+    return days
+
+
+def flush_school_data() -> None:
+    """Удаляет классы, учеников и посещаемость. Только для стенда!"""
+    StudentMonthlyAbsence.objects.all().delete()
+    StudentAbsenceState.objects.all().delete()
+    OrviWindowStat.objects.all().delete()
+    AbsentStudent.objects.all().delete()
+    AttendanceSummary.objects.all().delete()
+    Student.objects.all().delete()
+    ClassRoom.objects.all().delete()
+    User.objects.filter(username__startswith='bench_').delete()
+
+
+def _ensure_user(username, first_name, last_name, group):
+    user, created = User.objects.get_or_create(
+        username=username,
+        defaults={'first_name': first_name, 'last_name': last_name},
+    )
+    if created:
+        user.set_password(BENCH_PASSWORD)
+        user.save(update_fields=['password'])
+    user.groups.add(group)
+    return user
+
+
+def _absent_reasons(rng, students, month, outbreak):
+    """Случайно раскладывает учеников класса по причинам отсутствия."""
+    orvi_rate = ORVI_RATE_BY_MONTH.get(month, 0.05) * outbreak
+    by_student = {}
+    for student_id in students:
+        roll = rng.random()
+        if roll < orvi_rate:
+            by_student[student_id] = AbsentStudent.Reason.ORVI
+        elif roll < orvi_rate + OTHER_DISEASE_RATE:
+            by_student[student_id] = AbsentStudent.Reason.OTHER_DISEASE
+        elif roll < orvi_rate + OTHER_DISEASE_RATE + FAMILY_RATE:
+            by_student[student_id] = AbsentStudent.Reason.FAMILY
+        elif roll < orvi_rate + OTHER_DISEASE_RATE + FAMILY_RATE + UNEXCUSED_RATE:
+            by_student[student_id] = AbsentStudent.Reason.UNEXCUSED
+    return by_student
+
+
+@transaction.atomic
+def seed_school(classes, students_per_class, days, seed=0, today=None, stdout=None) -> SeedResult:
+    """
+    Генерирует данные «большой школы» одним набором bulk_create:
+    - классы с классными руководителями (bench_teacher_N) и завуч bench_deputy
+    - ученики, часть из них — льготники разных типов
+    - сводки за `days` последних учебных дней с сезонностью ОРВИ
+    Пароль всех bench_* пользователей — BENCH_PASSWORD.
+    """
+    rng = random.Random(seed)
+    today = today or timezone.localdate()
+    result = SeedResult()
+
+    def log(msg):
+        if stdout is not None:
+            stdout.write(msg)
+
+    teacher_group, _ = Group.objects.get_or_create(name='Учитель')
+    deputy_group, _ = Group.objects.get_or_create(name='Завуч')
+
+    deputy = _ensure_user('bench_deputy', 'Завуч', 'Стендовый', deputy_group)
+
+    ptypes = []
+    for code in Student.PrivilegeType.values:
+        ptype, _ = PrivilegeType.objects.get_or_create(code=code)
+        ptypes.append(ptype)
+
+    existing_names = set(ClassRoom.objects.values_list('name', flat=True))
+    class_rooms = []
+    index = 0
+    while len(class_rooms) < classes:
+        name = bench_class_name(index)
+        index += 1
+        if name in existing_names:
+            continue
+        # номер учителя совпадает с позицией имени класса, поэтому повторный запуск не переиспользует учителей
+        teacher = _ensure_user(f'bench_teacher_{index}', 'Учитель', f'Стендовый {name}', teacher_group)
+        class_rooms.append(ClassRoom(name=name, teacher=teacher, student_count=students_per_class))
+
+    class_rooms = ClassRoom.objects.bulk_create(class_rooms)
+    staff_through = ClassRoom.staff.through
+    staff_through.objects.bulk_create(
+        [staff_through(classroom_id=c.id, user_id=c.teacher_id) for c in class_rooms]
+        + [staff_through(classroom_id=c.id, user_id=deputy.id) for c in class_rooms]
+    )
+    result.classes = len(class_rooms)
+    log(f'Классов: {result.classes}')
+
+    new_students = []
+    for class_room in class_rooms:
+        used = set()
+        for i in range(students_per_class):
+            name = f'{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}'
+            if name in used:
+                name = f'{name} {i + 1}'
+            used.add(name)
+            new_students.append(Student(
+                full_name=name,
+                class_room=class_room,
+                is_privileged=rng.random() < PRIVILEGED_RATE,
+            ))
+    new_students = Student.objects.bulk_create(new_students, batch_size=2000)
+    result.students = len(new_students)
+    log(f'Учеников: {result.students}')
+
+    priv_through = Student.privilege_types.through
+    priv_links = []
+    for student in new_students:
+        if student.is_privileged:
+            for ptype in rng.sample(ptypes, k=rng.choice((1, 1, 1, 2))):
+                priv_links.append(priv_through(student_id=student.id, privilegetype_id=ptype.id))
+    priv_through.objects.bulk_create(priv_links, batch_size=2000)
+
+    students_by_class = {c.id: [] for c in class_rooms}
+    for student in new_students:
+        students_by_class[student.class_room_id].append(student.id)
+
+    tz = timezone.get_current_timezone()
+    for day in recent_school_days(days, before=today):
+        created_at = timezone.make_aware(datetime.combine(day, time(8, 0)), tz)
+        pending = []
+        for class_room in class_rooms:
+            if rng.random() < MISSING_REPORT_RATE:
+                continue
+            # локальная вспышка: в отдельных классах ОРВИ в 2–3 раза выше
+            outbreak = rng.choice((1.0, 1.0, 1.0, 1.0, 2.0, 3.0))
+            reasons = _absent_reasons(rng, students_by_class[class_room.id], day.month, outbreak)
+            counts = {reason: 0 for reason in AbsentStudent.Reason.values}
+            for reason in reasons.values():
+                counts[reason] += 1
+            summary = AttendanceSummary(
+                class_room=class_room,
+                date=day,
+                present_count_auto=students_per_class,
+                present_count_reported=students_per_class - len(reasons),
+                unexcused_absent_count=counts[AbsentStudent.Reason.UNEXCUSED],
+                orvi_count=counts[AbsentStudent.Reason.ORVI],
+                other_disease_count=counts[AbsentStudent.Reason.OTHER_DISEASE],
+                family_reason_count=counts[AbsentStudent.Reason.FAMILY],
+                created_by_id=class_room.teacher_id,
+                created_at=created_at,
+            )
+            pending.append((summary, reasons))
+
+        summaries = AttendanceSummary.objects.bulk_create([s for s, _ in pending])
+        absences = [
+            AbsentStudent(
+                attendance_id=summary.id, student_id=student_id, reason=reason,
+                date=day, class_room_id=summary.class_room_id,
+            )
+            for summary, (_, reasons) in zip(summaries, pending)
+            for student_id, reason in reasons.items()
+        ]
+        AbsentStudent.objects.bulk_create(absences, batch_size=5000)
+        result.summaries += len(summaries)
+        result.absences += len(absences)
+
+    log(f'Сводок: {result.summaries}, отсутствий: {result.absences}')
+    absence_history.rebuild_all()
+    absence_state.rebuild_all()
+    orvi_watch.rebuild_all()
+
+    # bulk_create не вызывает сигналы, поэтому student_count выставлен сразу при создании классов
+    return result
+
+
+def percentile(samples, pct):
+    """Перцентиль с линейной интерполяцией (samples не обязаны быть отсортированы)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    pos = (len(ordered) - 1) * pct / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def latency_summary(samples_ms):
+    """Сводка по задержкам (мс) для отчётов bench / load_test."""
+    if not samples_ms:
+        return {'count': 0}
+    return {
+        'count': len(samples_ms),
+        'min': round(min(samples_ms), 2),
+        'p50': round(percentile(samples_ms, 50), 2),
+        'p90': round(percentile(samples_ms, 90), 2),
+        'p95': round(percentile(samples_ms, 95), 2),
+        'p99': round(percentile(samples_ms, 99), 2),
+        'max': round(max(samples_ms), 2),
+        'mean': round(sum(samples_ms) / len(samples_ms), 2),
+    }
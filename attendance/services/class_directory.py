@@ -0,0 +1,99 @@
+import uuid
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from database.models import ClassRoom
+from ..utils import class_sort_key
+
+
+# Справочник классов на процесс: список меняется пару раз в год, а нужен почти каждой
+# странице (статистика, выгрузка, ученики, токены замены). Записи — неизменяемые кортежи
+# в порядке class_sort_key. Между воркерами согласуется версия в общем кэше: сигналы
+# ClassRoom/Student/User меняют её, и каждый процесс при следующем обращении видит
+# чужую версию и перечитывает классы одним запросом.
+# roster_version — updated_at класса: меняется при правке класса и пересчёте состава.
+ClassRecord = namedtuple(
+    'ClassRecord', 'id name sort_key teacher_id teacher_name teacher_active student_count roster_version'
+)
+
+VERSION_KEY = 'class_directory:version'
+
+_FIELDS = (
+    'id', 'name', 'student_count', 'updated_at',
+    'teacher_id', 'teacher__first_name', 'teacher__last_name', 'teacher__username', 'teacher__is_active',
+)
+
+# (версия, записи) — присваивается целиком, поэтому читать можно без блокировок
+_loaded = (None, ())
+
+
+def invalidate() -> None:
+    """Новая версия справочника для всех процессов."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _teacher_name(row) -> str:
+    if row['teacher_id'] is None:
+        return ''
+    full_name = f"{row['teacher__first_name']} {row['teacher__last_name']}".strip()
+    return full_name or row['teacher__username']
+
+
+def _records(rows) -> tuple:
+    records = [
+        ClassRecord(
+            id=row['id'],
+            name=row['name'],
+            sort_key=class_sort_key(row['name']),
+            teacher_id=row['teacher_id'],
+            teacher_name=_teacher_name(row),
+            teacher_active=bool(row['teacher__is_active']),
+            student_count=row['student_count'],
+            roster_version=row['updated_at'],
+        )
+        for row in rows
+    ]
+    records.sort(key=lambda r: r.sort_key)
+    return tuple(records)
+
+
+def _current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # add, а не set: процессы, стартовавшие одновременно, сойдутся на одной версии
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def _acurrent_version():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, uuid.uuid4().hex, None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def classes() -> tuple:
+    """Все классы в порядке class_sort_key (кортеж ClassRecord)."""
+    global _loaded
+    version = _current_version()
+    if _loaded[0] != version or version is None:
+        _loaded = (version, _records(ClassRoom.objects.values(*_FIELDS)))
+    return _loaded[1]
+
+
+async def aclasses() -> tuple:
+    """То же, что classes(), для async-views."""
+    global _loaded
+    version = await _acurrent_version()
+    if _loaded[0] != version or version is None:
+        _loaded = (version, _records([row async for row in ClassRoom.objects.values(*_FIELDS)]))
+    return _loaded[1]
+
+
+def subset(ids) -> tuple:
+    """Записи справочника для набора id (порядок — общий)."""
+    ids = set(ids)
+    return tuple(record for record in classes() if record.id in ids)
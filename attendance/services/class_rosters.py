@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from database.models import Student
+
+
+# Состав классов для главной страницы: активные ученики и льготники по классу.
+# От дня не зависит, поэтому лежит в общем кэше по классу и сбрасывается сигналами
+# учеников и льгот; массовые действия страницы учеников сбрасывают его явно.
+RosterEntry = namedtuple('RosterEntry', 'id full_name')
+
+ROSTER_CACHE_SECONDS = 24 * 3600
+
+
+def cache_key(class_id: int) -> str:
+    return f'class_roster:{class_id}'
+
+
+def invalidate(class_ids) -> None:
+    cache.delete_many([cache_key(cid) for cid in class_ids if cid])
+
+
+def _build_qs(class_ids):
+    students = Student.objects.filter(class_room_id__in=class_ids, is_active=True).order_by('full_name')
+    privileged = students.filter(Q(privilege_types__isnull=False) | Q(is_privileged=True)).distinct()
+    return students.values_list('class_room_id', 'id', 'full_name'), privileged.values_list('class_room_id', 'id')
+
+
+def _assemble(class_ids, student_rows, privileged_rows) -> dict:
+    rosters = {cid: {'students': [], 'privileged': []} for cid in class_ids}
+    by_id = {}
+    for cid, sid, full_name in student_rows:
+        entry = RosterEntry(sid, full_name)
+        rosters[cid]['students'].append(entry)
+        by_id[sid] = entry
+    for cid, sid in privileged_rows:
+        rosters[cid]['privileged'].append(by_id[sid])
+    return {
+        cid: {'students': tuple(r['students']), 'privileged': tuple(r['privileged'])}
+        for cid, r in rosters.items()
+    }
+
+
+def build(class_ids) -> dict:
+    """Составы классов из БД (два запроса на любой набор классов)."""
+    class_ids = list(class_ids)
+    students_qs, privileged_qs = _build_qs(class_ids)
+    return _assemble(class_ids, list(students_qs), list(privileged_qs))
+
+
+def warm(class_ids) -> int:
+    rosters = build(class_ids)
+    cache.set_many({cache_key(cid): roster for cid, roster in rosters.items()}, ROSTER_CACHE_SECONDS)
+    return len(rosters)
+
+
+async def arosters(class_ids) -> dict:
+    """
+    {id класса: {'students': (RosterEntry, ...), 'privileged': (...)}} — из кэша;
+    недостающие классы достраиваются одной выборкой и кладутся обратно.
+    """
+    class_ids = list(class_ids)
+    found = await cache.aget_many([cache_key(cid) for cid in class_ids])
+    rosters = {cid: found[cache_key(cid)] for cid in class_ids if cache_key(cid) in found}
+    missing = [cid for cid in class_ids if cid not in rosters]
+    if missing:
+        students_qs, privileged_qs = _build_qs(missing)
+        built = _assemble(
+            missing, [row async for row in students_qs], [row async for row in privileged_qs]
+        )
+        await cache.aset_many({cache_key(cid): roster for cid, roster in built.items()}, ROSTER_CACHE_SECONDS)
+        rosters.update(built)
+    return rosters
@@ -0,0 +1,79 @@
+import calendar
+import hashlib
+from collections import namedtuple
+from datetime import date
+
+from django.db.models import Count, DateTimeField, F, Func, IntegerField, Max, Subquery
+
+from database.models import ClassRoom, Student, AttendanceSummary, AbsentStudent
+
+
+# tag — хэш всех составляющих; last_modified — самое позднее изменение;
+# values — сырые значения (например, MAX(created_at) сводок для окна редактирования)
+DataVersion = namedtuple('DataVersion', 'tag last_modified values')
+
+
+def month_bounds(year: int, month: int) -> tuple[date, date]:
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _scalar(qs, function, field, output_field):
+    """Скалярный подзапрос без GROUP BY: SELECT MAX(field) FROM ... WHERE ..."""
+    return Subquery(
+        qs.order_by().annotate(v=Func(F(field), function=function, output_field=output_field)).values('v')[:1]
+    )
+
+
+def _count(qs):
+    return Max(_scalar(qs, 'COUNT', 'id', IntegerField()))
+
+
+def _latest(qs, field='updated_at'):
+    return Max(_scalar(qs, 'MAX', field, DateTimeField()))
+
+
+async def scope_version(first_day: date, last_day: date, class_ids=None, extra=None) -> DataVersion:
+    """
+    Версия данных для набора классов (None — вся школа) за период — одним запросом:
+    сводки и отсутствия периода (число и последний updated_at по индексам (date, updated_at)),
+    классы и состав (число и последний updated_at), льготы (число и последний id связи).
+    extra: {имя: (queryset, поле)} — ещё MAX(поле) по произвольным таблицам.
+    """
+    classes = ClassRoom.objects.all()
+    summaries = AttendanceSummary.objects.filter(date__range=(first_day, last_day))
+    absents = AbsentStudent.objects.filter(date__range=(first_day, last_day))
+    students = Student.objects.all()
+    privileges = Student.privilege_types.through.objects.all()
+    if class_ids is not None:
+        classes = classes.filter(id__in=class_ids)
+        summaries = summaries.filter(class_room_id__in=class_ids)
+        absents = absents.filter(class_room_id__in=class_ids)
+        students = students.filter(class_room_id__in=class_ids)
+        privileges = privileges.filter(student__class_room_id__in=class_ids)
+
+    values = await classes.aaggregate(
+        classes=Count('id'),
+        classes_changed=Max('updated_at'),
+        summaries=_count(summaries),
+        summaries_changed=_latest(summaries),
+        # отсутствия правят и без сводки (админка, backfill_absences); удаление видно по числу
+        absents=_count(absents),
+        absents_changed=_latest(absents),
+        students=_count(students.filter(is_active=True)),
+        students_changed=_latest(students),
+        privileges=_count(privileges),
+        privileges_last=Max(_scalar(privileges, 'MAX', 'id', IntegerField())),
+        **{name: _latest(qs, field) for name, (qs, field) in (extra or {}).items()},
+    )
+    parts = [first_day, last_day, class_ids, *(values[key] for key in sorted(values))]
+    tag = hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()[:16]
+    changed = [
+        value for key, value in values.items()
+        if value is not None and (key.endswith('_changed') or key in (extra or {}))
+    ]
+    return DataVersion(tag, max(changed, default=None), values)
+
+
+async def month_version(year: int, month: int) -> DataVersion:
+    """Версия статистики за месяц по всей школе."""
+    return await scope_version(*month_bounds(year, month))
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import zlib
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.db.models import Max
+from django.utils import timezone
+
+from database.models import AttendanceSummary, AbsentStudent, DaySnapshot
+from ..utils import class_sort_key
+from . import class_directory
+
+
+# Снимки закрытых дней. Сводку можно править 30 минут после создания, и только в день
+# отчёта; после этого день уже не меняется, и отчёты за прошлое (статистика, выгрузки)
+# читают один сжатый JSON на день вместо сводок и отсутствий. Данные дня:
+#   {'classes': [[id, имя], ...]          — все классы на момент закрытия (порядок class_sort_key),
+#    'reports': [{'class_id', 'class_name', <счётчики сводки>,
+#                 'absent': [[id ученика, ФИО, причина], ...]}, ...]}
+# Тот же формат собирается и из живых таблиц для незакрытых дней, поэтому читатели
+# не различают снимок и текущие данные.
+EDIT_WINDOW = timedelta(minutes=30)
+
+COUNT_FIELDS = (
+    'present_count_auto', 'present_count_reported', 'unexcused_absent_count',
+    'orvi_count', 'other_disease_count', 'family_reason_count',
+)
+
+# дней в одной выборке при закрытии (ограничивает память при первом закрытии всей истории)
+CLOSE_BATCH_DAYS = 31
+
+
+def encode(data: dict) -> bytes:
+    return zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 9)
+
+
+def decode(payload) -> dict:
+    return json.loads(zlib.decompress(payload))
+
+
+def names_by_reason(report: dict) -> dict:
+    """{причина: [ФИО, ...]} в порядке внесения."""
+    names = defaultdict(list)
+    for _, full_name, reason in report['absent']:
+        names[reason].append(full_name)
+    return names
+
+
+def _live_qs(first_day: date, last_day: date, closed=()):
+    summaries = AttendanceSummary.objects.filter(date__range=(first_day, last_day)).exclude(date__in=closed)
+    absents = AbsentStudent.objects.filter(date__range=(first_day, last_day)).exclude(date__in=closed)
+    return (
+        summaries.order_by().values('id', 'date', 'class_room_id', 'class_room__name', *COUNT_FIELDS),
+        absents.order_by('id').values_list('attendance_id', 'student_id', 'student__full_name', 'reason'),
+    )
+
+
+def _assemble(classes, summary_rows, absent_rows) -> dict:
+    """{день: данные дня} из строк сводок и отсутствий (формат — в комментарии выше)."""
+    absent_by_summary = defaultdict(list)
+    for attendance_id, student_id, full_name, reason in absent_rows:
+        absent_by_summary[attendance_id].append([student_id, full_name, reason])
+
+    class_list = [[c.id, c.name] for c in classes]
+    days = defaultdict(lambda: {'classes': class_list, 'reports': []})
+    for row in summary_rows:
+        days[row['date']]['reports'].append({
+            'class_id': row['class_room_id'],
+            'class_name': row['class_room__name'],
+            **{field: row[field] for field in COUNT_FIELDS},
+            'absent': absent_by_summary.get(row['id'], []),
+        })
+    for data in days.values():
+        data['reports'].sort(key=lambda r: class_sort_key(r['class_name']))
+    return dict(days)
+
+
+def build(first_day: date, last_day: date) -> dict:
+    """Данные дней периода из живых таблиц (два запроса на любой период)."""
+    summaries_qs, absents_qs = _live_qs(first_day, last_day)
+    return _assemble(class_directory.classes(), list(summaries_qs), list(absents_qs))
+
+
+async def adays(first_day: date, last_day: date) -> dict:
+    """
+    {день: данные дня} за период — только дни, по которым есть сводки.
+    Закрытые дни берутся из снимков (один запрос), остальные собираются
+    из сводок и отсутствий (ещё два) — число запросов не зависит от периода.
+    """
+    days = {}
+    async for day, payload in DaySnapshot.objects.filter(
+        date__range=(first_day, last_day)
+    ).values_list('date', 'payload'):
+        days[day] = decode(payload)
+
+    days.update(await alive(first_day, last_day, closed=list(days)))
+    return days
+
+
+async def alive(first_day: date, last_day: date, closed=()) -> dict:
+    """То же, что build, через async ORM; дни closed пропускаются."""
+    summaries_qs, absents_qs = _live_qs(first_day, last_day, closed)
+    return _assemble(
+        await class_directory.aclasses(), [row async for row in summaries_qs], [row async for row in absents_qs]
+    )
+
+
+def closable_days(now=None) -> list:
+    """
+    Дни со сводками, которые уже нельзя править и ещё не закрыты: день прошёл
+    и окно редактирования истекло у всех сводок дня.
+    """
+    now = now or timezone.now()
+    return list(
+        AttendanceSummary.objects.filter(date__lt=timezone.localdate(now))
+        .exclude(date__in=DaySnapshot.objects.values('date'))
+        .values('date').annotate(last_created=Max('created_at'))
+        .filter(last_created__lte=now - EDIT_WINDOW)
+        .order_by('date').values_list('date', flat=True)
+    )
+
+
+def close_days(days=None, now=None) -> list:
+    """Записывает снимки закрытых дней (по умолчанию — всех closable_days). Возвращает даты."""
+    days = sorted(days if days is not None else closable_days(now))
+    closed = []
+    for start in range(0, len(days), CLOSE_BATCH_DAYS):
+        batch = days[start:start + CLOSE_BATCH_DAYS]
+        built = build(batch[0], batch[-1])
+        snapshots = []
+        for day in batch:
+            data = built.get(day)
+            if data is None:
+                continue
+            payload = encode(data)
+            snapshots.append(DaySnapshot(
+                date=day, payload=payload, digest=hashlib.sha1(payload).hexdigest()[:16],
+                reports_count=len(data['reports']),
+            ))
+        # параллельный запуск не упадёт на unique(date): снимок дня одинаков
+        DaySnapshot.objects.bulk_create(snapshots, ignore_conflicts=True)
+        closed.extend(s.date for s in snapshots)
+    return closed
+
+
+def invalidate(day: date) -> None:
+    """
+    Данные закрытого дня всё же поменялись (правка в админке) — снимок удаляется,
+    следующий close_days соберёт его заново. Сегодняшний день не закрывается, поэтому
+    обычное сохранение посещаемости обходится без запроса.
+    """
+    if day and day < timezone.localdate():
+        DaySnapshot.objects.filter(date=day).delete()
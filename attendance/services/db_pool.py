@@ -0,0 +1,40 @@
+import os
+
+from django.db import connections
+
+
+def pool_stats(alias: str = 'default') -> dict:
+    """
+    Статистика пула соединений текущего процесса (у каждого воркера свой пул).
+    checkouts — сколько раз соединение выдавалось из пула,
+    wait_ms_* — сколько запросы ждали свободного соединения.
+    """
+    conn = connections[alias]
+    info = {
+        'alias': alias,
+        'vendor': conn.vendor,
+        'pid': os.getpid(),
+        'pooled': False,
+    }
+
+    pool = getattr(conn, 'pool', None) if conn.vendor == 'postgresql' else None
+    if pool is None:
+        info['conn_max_age'] = conn.settings_dict.get('CONN_MAX_AGE')
+        info['conn_health_checks'] = conn.settings_dict.get('CONN_HEALTH_CHECKS')
+        return info
+
+    stats = pool.get_stats()
+    checkouts = stats.get('requests_num', 0)
+    wait_ms = stats.get('requests_wait_ms', 0)
+    info.update({
+        'pooled': True,
+        'min_size': pool.min_size,
+        'max_size': pool.max_size,
+        'checkouts': checkouts,
+        'waiting_now': stats.get('requests_waiting', 0),
+        'wait_ms_total': wait_ms,
+        'wait_ms_avg': round(wait_ms / checkouts, 3) if checkouts else 0.0,
+        'timeouts': stats.get('requests_errors', 0),
+        'stats': stats,
+    })
+    return info
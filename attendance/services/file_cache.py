@@ -0,0 +1,30 @@
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+# Очистка файловых кэшей. FileBasedCache удаляет просроченный файл только при чтении,
+# поэтому записи, которые больше никто не читает (сессии после выхода, выгрузки
+# давно закрытых дней), лежат на диске до MAX_ENTRIES. Штатного API для полной
+# очистки просроченных записей нет — используем внутренние методы бэкенда.
+
+
+def file_cache_aliases() -> list:
+    return [alias for alias in caches if isinstance(caches[alias], FileBasedCache)]
+
+
+def sweep_expired(alias: str) -> int:
+    """Удаляет просроченные файлы кэша alias; для не файлового кэша — 0."""
+    cache = caches[alias]
+    if not isinstance(cache, FileBasedCache):
+        return 0
+    deleted = 0
+    for fname in cache._list_cache_files():
+        try:
+            with open(fname, 'rb') as f:
+                # _is_expired сам удаляет просроченный файл
+                if cache._is_expired(f):
+                    deleted += 1
+        except FileNotFoundError:
+            # файл уже удалил параллельный запрос
+            continue
+    return deleted
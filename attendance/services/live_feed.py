@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+import os
+import weakref
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from . import class_directory
+
+logger = logging.getLogger(__name__)
+
+# Живая лента сохранений посещаемости (SSE) без внешнего брокера.
+# Между процессами — файл событий за день в общем каталоге (JSON на строку; дозапись
+# одним write с O_APPEND атомарна). Внутри воркера файл опрашивает одна задача на
+# event loop и раздаёт новые строки очередям клиентов: число клиентов не увеличивает
+# обращений к диску. id события — «ГГГГММДД-смещение конца строки», по Last-Event-ID
+# переподключившийся клиент дочитывает пропущенное.
+
+POLL_SECONDS = 0.5
+HEARTBEAT_SECONDS = 15
+KEEP_DAYS = 2
+
+
+def feed_dir() -> Path:
+    return Path(getattr(settings, 'LIVE_FEED_DIR', None) or Path(settings.CACHE_DIR) / 'live')
+
+
+def _path(day: date) -> Path:
+    return feed_dir() / f'events-{day:%Y%m%d}.jsonl'
+
+
+def _size(day: date) -> int:
+    try:
+        return _path(day).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _sweep(today: date) -> None:
+    keep = {_path(today - timedelta(days=i)).name for i in range(KEEP_DAYS)}
+    for path in feed_dir().glob('events-*.jsonl'):
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
+
+
+def publish(event: dict) -> None:
+    """Дописывает событие в файл дня. Ошибка записи не должна ронять сохранение отчёта."""
+    day = timezone.localdate()
+    data = (json.dumps(event, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode()
+    try:
+        feed_dir().mkdir(parents=True, exist_ok=True)
+        new_file = not _path(day).exists()
+        fd = os.open(_path(day), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        if new_file:
+            _sweep(day)
+    except OSError:
+        logger.exception('Не удалось записать событие живой ленты')
+
+
+def _loaded(instance, field_name):
+    """Связанный объект, если он уже загружен в экземпляр, иначе None (без запроса)."""
+    field = instance._meta.get_field(field_name)
+    return field.get_cached_value(instance) if field.is_cached(instance) else None
+
+
+def summary_event(summary, created: bool) -> dict:
+    """
+    Событие по сохранённой сводке: класс, числа и кто сохранил. Собирается внутри
+    транзакции сохранения, поэтому связи не догружаем: класс — из загруженной связи
+    или справочника классов процесса, автор — только если он уже в экземпляре.
+    """
+    class_room = _loaded(summary, 'class_room')
+    if class_room is not None:
+        class_name = class_room.name
+    else:
+        class_name = next((r.name for r in class_directory.subset([summary.class_room_id])), '')
+    user = _loaded(summary, 'created_by')
+    return {
+        'type': 'created' if created else 'updated',
+        'summary_id': summary.id,
+        'date': summary.date,
+        'class_id': summary.class_room_id,
+        'class_name': class_name,
+        'counts': {
+            'present_auto': summary.present_count_auto,
+            'present': summary.present_count_reported,
+            'unexcused': summary.unexcused_absent_count,
+            'orvi': summary.orvi_count,
+            'other_disease': summary.other_disease_count,
+            'family': summary.family_reason_count,
+        },
+        'saved_by': (user.get_full_name() or user.get_username()) if user else '',
+        'saved_at': timezone.now(),
+    }
+
+
+def event_id(day: date, offset: int) -> str:
+    return f'{day:%Y%m%d}-{offset}'
+
+
+def parse_event_id(raw):
+    """(день, смещение) из Last-Event-ID или None."""
+    try:
+        day, offset = (raw or '').split('-', 1)
+        return date(int(day[:4]), int(day[4:6]), int(day[6:8])), int(offset)
+    except ValueError:
+        return None
+
+
+def read_events(day: date, position: int):
+    """События файла дня после position: ([(смещение конца строки, событие)], новая позиция)."""
+    try:
+        with open(_path(day), 'rb') as fh:
+            fh.seek(position)
+            chunk = fh.read()
+    except FileNotFoundError:
+        return [], position
+    events = []
+    for line in chunk.split(b'\n')[:-1]:  # недописанный хвост без \n дочитаем в следующий раз
+        position += len(line) + 1
+        try:
+            events.append((position, json.loads(line)))
+        except ValueError:
+            continue
+    return events, position
+
+
+class _Hub:
+    """Раздача событий подписчикам одного event loop: один опрос файла на всех."""
+
+    def __init__(self):
+        self.queues = set()
+        self.task = None
+        self.day = None
+        self.position = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=100)
+        self.queues.add(queue)
+        if self.task is None or self.task.done():
+            # позиция фиксируется сразу, а не при первом шаге задачи: дочитка по
+            # Last-Event-ID, идущая следом, гарантированно перекрывает этот момент
+            self.day = timezone.localdate()
+            self.position = _size(self.day)
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue) -> None:
+        self.queues.discard(queue)
+        if not self.queues and self.task is not None:
+            self.task.cancel()
+
+    def _broadcast(self, day, events) -> None:
+        for queue in list(self.queues):
+            for offset, event in events:
+                try:
+                    queue.put_nowait((day, offset, event))
+                except asyncio.QueueFull:
+                    # отставший клиент пропустит события и дочитает их при переподключении
+                    break
+
+    async def _run(self):
+        while self.queues:
+            await asyncio.sleep(POLL_SECONDS)
+            if _size(self.day) > self.position:
+                events, self.position = read_events(self.day, self.position)
+                self._broadcast(self.day, events)
+            today = timezone.localdate()
+            if today != self.day:
+                self.day, self.position = today, 0
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def hub() -> _Hub:
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = _Hub()
+    return _hubs[loop]
+
+
+def _format(day, offset, event) -> str:
+    return f'id: {event_id(day, offset)}\nevent: attendance\ndata: {json.dumps(event, ensure_ascii=False)}\n\n'
+
+
+async def stream(last_event_id=None, max_seconds=600):
+    """
+    Поток SSE для одного клиента. Соединение закрывается через max_seconds —
+    браузер переподключается сам (с Last-Event-ID), а сервер заново проверяет вход.
+    """
+    channel = hub()
+    queue = channel.subscribe()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    seen = parse_event_id(last_event_id)
+    try:
+        yield 'retry: 3000\n\n'
+        if seen:
+            # подписка уже оформлена, поэтому между дочиткой и очередью ничего не теряется
+            events, _ = read_events(*seen)
+            for offset, event in events:
+                yield _format(seen[0], offset, event)
+                seen = (seen[0], offset)
+        while (timeout := deadline - loop.time()) > 0:
+            try:
+                day, offset, event = await asyncio.wait_for(queue.get(), min(timeout, HEARTBEAT_SECONDS))
+            except TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if seen and (day, offset) <= seen:
+                continue
+            yield _format(day, offset, event)
+    finally:
+        channel.unsubscribe(queue)
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef
+
+from database.models import ClassRoom, AttendanceSummary
+from ..utils import class_sort_key
+from . import class_directory, school_calendar
+
+
+# Страхующий таймаут: сохранения сводок и правки классов сбрасывают кэш сразу,
+# таймаут лишь подбирает то, что меняется мимо сигналов (например, ФИО учителя)
+BOARD_CACHE_SECONDS = 300
+
+# за сколько прошлых дней можно открыть табло: дата из запроса прижимается к этому
+# диапазону, поэтому клиенты не заполняют кэш записями на произвольные даты
+HISTORY_DAYS = 31
+
+
+def clamp_day(day: date, today: date) -> date:
+    return min(max(day, today - timedelta(days=HISTORY_DAYS)), today)
+
+
+def cache_key(day: date) -> str:
+    return f'missing_reports:{day.isoformat()}'
+
+
+def invalidate(day: date) -> None:
+    cache.delete(cache_key(day))
+
+
+def _teacher_name(row) -> str:
+    full_name = f"{row['teacher__last_name']} {row['teacher__first_name']}".strip()
+    return full_name or row['teacher__username'] or ''
+
+
+def build_board(day: date) -> dict:
+    """
+    Классы без сводки за день — один запрос: NOT EXISTS по (class_room, date),
+    то есть по уникальному индексу сводок; учитель подтягивается тем же запросом.
+    """
+    missing = list(ClassRoom.objects.filter(
+        ~Exists(AttendanceSummary.objects.filter(class_room=OuterRef('pk'), date=day))
+    ).values('id', 'name', 'student_count', 'teacher__first_name', 'teacher__last_name', 'teacher__username'))
+    missing.sort(key=lambda r: class_sort_key(r['name']))
+    # число классов — из справочника в памяти процесса, без второго запроса
+    total = len(class_directory.classes())
+    return {
+        'date': day,
+        'is_school_day': school_calendar.is_school_day(day),
+        'total': total,
+        'reported': total - len(missing),
+        'missing': [
+            {'id': r['id'], 'name': r['name'], 'teacher': _teacher_name(r), 'student_count': r['student_count']}
+            for r in missing
+        ],
+    }
+
+
+def board(day: date) -> dict:
+    """Табло «кто не сдал» из общего кэша: опрос раз в несколько секунд не доходит до БД."""
+    key = cache_key(day)
+    result = cache.get(key)
+    if result is None:
+        result = build_board(day)
+        cache.set(key, result, BOARD_CACHE_SECONDS)
+    return result
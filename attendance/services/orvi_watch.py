@@ -0,0 +1,131 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from database.models import ClassRoom, AttendanceSummary, OrviWindowStat
+from ..utils import class_grade
+from . import class_directory, school_calendar
+
+
+def window_sizes() -> list[int]:
+    return sorted(getattr(settings, 'ORVI_WINDOW_DAYS', [3, 5]))
+
+
+def threshold() -> float:
+    """Порог карантина: доля отсутствующих по ОРВИ от списочного состава."""
+    return getattr(settings, 'ORVI_QUARANTINE_PERCENT', 20) / 100
+
+
+def last_window(days: list[date], per_day: dict, window: int) -> dict:
+    """
+    Окно ОРВИ на последний день ряда `days` (учебные дни по возрастанию).
+    per_day: {дата: (orvi, по списку)}; дни без отчёта дают нули и не считаются в days_reported.
+    """
+    tail = days[-window:]
+    orvi = sum(per_day[d][0] for d in tail if d in per_day)
+    enrolled = sum(per_day[d][1] for d in tail if d in per_day)
+    return {
+        'as_of': tail[-1],
+        'first_day': tail[0],
+        'days_reported': sum(1 for d in tail if d in per_day),
+        'orvi_count': orvi,
+        'enrolled_count': enrolled,
+        'ratio': orvi / enrolled if enrolled else 0.0,
+    }
+
+
+def _stats_for(scope, key, label, days, per_day):
+    return [
+        OrviWindowStat(scope=scope, key=key, label=label, window_days=size, **last_window(days, per_day, size))
+        for size in window_sizes()
+    ]
+
+
+def _save(stats):
+    OrviWindowStat.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=['key', 'window_days'],
+        update_fields=['scope', 'label', 'as_of', 'first_day', 'days_reported', 'orvi_count', 'enrolled_count',
+                       'ratio', 'updated_at'],
+    )
+
+
+def _grade_totals(rows, class_ids):
+    per_day = defaultdict(lambda: [0, 0])
+    for class_id, day, orvi, enrolled in rows:
+        if class_id in class_ids:
+            per_day[day][0] += orvi
+            per_day[day][1] += enrolled
+    return {day: tuple(v) for day, v in per_day.items()}
+
+
+@transaction.atomic
+def update_for_class(class_room: ClassRoom, day: date) -> None:
+    """
+    Инкрементальное обновление после сохранения класса: читаются только сводки
+    последних max(окно) учебных дней этого класса и его параллели.
+    """
+    days = school_calendar.last_school_days(day, max(window_sizes()))
+    if not days:
+        return
+    grade = class_grade(class_room.name)
+    # классы параллели — из справочника в памяти процесса, без запроса к ClassRoom
+    grade_class_ids = {
+        record.id for record in class_directory.classes() if class_grade(record.name) == grade
+    } if grade is not None else {class_room.id}
+
+    rows = list(AttendanceSummary.objects.filter(class_room_id__in=grade_class_ids, date__in=days).values_list(
+        'class_room_id', 'date', 'orvi_count', 'present_count_auto'
+    ))
+    stats = _stats_for(
+        OrviWindowStat.Scope.CLASS, f'class:{class_room.id}', class_room.name, days,
+        _grade_totals(rows, {class_room.id}),
+    )
+    if grade is not None:
+        stats += _stats_for(
+            OrviWindowStat.Scope.GRADE, f'grade:{grade}', f'{grade} параллель', days,
+            _grade_totals(rows, grade_class_ids),
+        )
+    _save(stats)
+
+
+@transaction.atomic
+def rebuild_all(day: date | None = None) -> int:
+    """Пересчёт окон всех классов и параллелей на последний день с отчётами (или на `day`)."""
+    OrviWindowStat.objects.all().delete()
+    day = day or AttendanceSummary.objects.order_by('-date').values_list('date', flat=True).first()
+    if day is None:
+        return 0
+    days = school_calendar.last_school_days(day, max(window_sizes()))
+    if not days:
+        return 0
+
+    rows = list(AttendanceSummary.objects.filter(date__in=days).values_list(
+        'class_room_id', 'date', 'orvi_count', 'present_count_auto'
+    ))
+    classes = list(ClassRoom.objects.values_list('id', 'name'))
+    by_grade = defaultdict(set)
+    stats = []
+    for class_id, name in classes:
+        stats += _stats_for(
+            OrviWindowStat.Scope.CLASS, f'class:{class_id}', name, days, _grade_totals(rows, {class_id})
+        )
+        grade = class_grade(name)
+        if grade is not None:
+            by_grade[grade].add(class_id)
+    for grade, class_ids in sorted(by_grade.items()):
+        stats += _stats_for(
+            OrviWindowStat.Scope.GRADE, f'grade:{grade}', f'{grade} параллель', days, _grade_totals(rows, class_ids)
+        )
+    _save(stats)
+    return len(stats)
+
+
+def alerts(today: date, stale_days: int = 7):
+    """Окна выше порога карантина, обновлённые за последнюю неделю (из таблицы, без пересчёта)."""
+    return OrviWindowStat.objects.filter(
+        as_of__gte=today - timedelta(days=stale_days), ratio__gte=threshold()
+    ).order_by('-ratio', 'label', 'window_days')
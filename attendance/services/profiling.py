@@ -0,0 +1,106 @@
+import io
+import json
+import pstats
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+
+PROFILE_NAME_RE = re.compile(r'^[\w\-]+$')
+
+
+def profile_dir() -> Path:
+    path = Path(settings.PROFILING_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class QueryRecorder:
+    """
+    execute_wrapper для connection: пишет SQL, параметры и длительность каждого запроса.
+    В отличие от CaptureQueriesContext не требует DEBUG и не трогает queries_log.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'params': repr(params)[:500],
+                'many': many,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+def save_profile(profiler, queries, meta) -> str:
+    """
+    Сохраняет .prof (pstats, открывается в snakeviz / flameprof) и .json с метаданными и SQL.
+    Возвращает имя отчёта. Старые отчёты сверх PROFILING_MAX_REPORTS удаляются.
+    """
+    directory = profile_dir()
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S-%f')
+    view = re.sub(r'[^\w\-]+', '-', meta.get('view') or 'request').strip('-') or 'request'
+    name = f'{stamp}_{view}'
+
+    profiler.dump_stats(directory / f'{name}.prof')
+    payload = {
+        **meta,
+        'name': name,
+        'created_at': timezone.now().isoformat(),
+        'query_count': len(queries),
+        'query_ms': round(sum(q['ms'] for q in queries), 3),
+        'queries': queries,
+    }
+    (directory / f'{name}.json').write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    prune(settings.PROFILING_MAX_REPORTS)
+    return name
+
+
+def prune(max_reports: int) -> None:
+    reports = sorted(profile_dir().glob('*.json'))
+    for meta_path in reports[:max(0, len(reports) - max_reports)]:
+        meta_path.unlink(missing_ok=True)
+        meta_path.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def list_profiles() -> list[dict]:
+    """Отчёты от новых к старым (без списка SQL)."""
+    result = []
+    for meta_path in sorted(profile_dir().glob('*.json'), reverse=True):
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        meta.pop('queries', None)
+        result.append(meta)
+    return result
+
+
+def report_path(name: str, suffix: str) -> Path | None:
+    if not PROFILE_NAME_RE.match(name or ''):
+        return None
+    path = profile_dir() / f'{name}{suffix}'
+    return path if path.exists() else None
+
+
+def load_report(name: str, sort: str = 'cumulative', limit: int = 40) -> dict | None:
+    meta_path = report_path(name, '.json')
+    prof_path = report_path(name, '.prof')
+    if not meta_path or not prof_path:
+        return None
+
+    meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    out = io.StringIO()
+    stats = pstats.Stats(str(prof_path), stream=out)
+    stats.sort_stats(sort).print_stats(limit)
+    meta['top_functions'] = out.getvalue()
+    return meta
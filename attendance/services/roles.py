@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+
+DEPUTY = 'Завуч'
+TEACHER = 'Учитель'
+
+# Роли (имена групп) пользователя из общего кэша: проверка «завуч ли» нужна каждой
+# странице, а меняются группы редко. Сбрасывается сигналами на изменение групп;
+# таймаут страхует правки мимо сигналов.
+ROLES_CACHE_SECONDS = 6 * 3600
+
+
+def cache_key(user) -> str:
+    # date_joined в ключе: после пересоздания БД тот же id принадлежит другому человеку
+    joined = int(user.date_joined.timestamp()) if user.date_joined else 0
+    return f'roles:{user.pk}:{joined}'
+
+
+def invalidate(users) -> None:
+    cache.delete_many([cache_key(user) for user in users])
+
+
+def user_roles(user) -> frozenset:
+    """Имена групп пользователя; для анонима — пустое множество."""
+    if not user.is_authenticated:
+        return frozenset()
+    key = cache_key(user)
+    roles = cache.get(key)
+    if roles is None:
+        roles = frozenset(user.groups.values_list('name', flat=True))
+        cache.set(key, roles, ROLES_CACHE_SECONDS)
+    return roles
+
+
+async def auser_roles(user) -> frozenset:
+    """То же, что user_roles, для async-views."""
+    if not user.is_authenticated:
+        return frozenset()
+    key = cache_key(user)
+    roles = await cache.aget(key)
+    if roles is None:
+        roles = frozenset([name async for name in user.groups.values_list('name', flat=True)])
+        await cache.aset(key, roles, ROLES_CACHE_SECONDS)
+    return roles
+
+
+def warm(users) -> int:
+    """Роли всех переданных пользователей одним запросом к группам."""
+    users = list(users)
+    by_user = {user.pk: set() for user in users}
+    memberships = get_user_model().groups.through.objects.filter(user_id__in=by_user)
+    for user_id, name in memberships.values_list('user_id', 'group__name'):
+        by_user[user_id].add(name)
+    cache.set_many({cache_key(user): frozenset(by_user[user.pk]) for user in users}, ROLES_CACHE_SECONDS)
+    return len(users)
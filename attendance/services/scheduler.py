@@ -0,0 +1,187 @@
+import io
+import logging
+import os
+import socket
+import time
+import traceback
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db.models import Q
+from django.utils import timezone
+
+from database.models import JobLease, JobRun
+
+logger = logging.getLogger(__name__)
+
+# Периодические задачи без брокера и системного cron: процесс manage.py run_scheduler
+# раз в минуту сверяется с расписаниями settings.SCHEDULER_JOBS и запускает команды
+# manage.py. Расписание — пять полей cron по TIME_ZONE: минута, час, день месяца, месяц,
+# день недели (0–7, воскресенье — 0 или 7); поддерживаются *, списки, диапазоны и шаг.
+# Процессов может быть несколько (по одному на реплику): запуск забирает аренду в БД
+# (JobLease), поэтому каждый запуск выполняет ровно один процесс. Итог — в JobRun.
+
+Job = namedtuple('Job', 'name schedule command args lease_seconds')
+
+# сколько последних символов вывода команды хранить в JobRun
+OUTPUT_LIMIT = 4000
+
+ABANDONED_ERROR = 'Процесс завершился, не записав итог (аренда истекла)'
+
+# допустимые значения полей cron: минута, час, день месяца, месяц, день недели
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+# next_after не ищет дальше (расписание «31 2 *» не наступит никогда)
+_SEARCH_LIMIT = timedelta(days=5 * 366)
+
+
+def _parse_field(field: str, low: int, high: int) -> set:
+    values = set()
+    for item in field.split(','):
+        body, _, step = item.partition('/')
+        try:
+            step = int(step) if step else 1
+            if body == '*':
+                start, end = low, high
+            elif '-' in body:
+                start, end = (int(part) for part in body.split('-', 1))
+            else:
+                # «5/15» — как в cron: с 5 до конца диапазона с шагом 15
+                start = int(body)
+                end = high if step > 1 else start
+        except ValueError:
+            raise ValueError(f'некорректное поле расписания «{item}»') from None
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f'поле расписания «{item}» вне диапазона {low}–{high}')
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f'в расписании «{expr}» должно быть 5 полей')
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, _FIELD_RANGES)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        # как в cron: если заданы и день месяца, и день недели — подходит любой из них
+        self.days_restricted = not fields[2].startswith('*')
+        self.weekdays_restricted = not fields[4].startswith('*')
+
+    def __str__(self):
+        return self.expr
+
+    def day_matches(self, day) -> bool:
+        by_day = day.day in self.days
+        by_weekday = day.isoweekday() % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return by_day or by_weekday
+        return by_day and by_weekday
+
+    def next_after(self, moment):
+        """Первая минута расписания строго после moment (местное время) или None."""
+        moment = timezone.localtime(moment).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + _SEARCH_LIMIT
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self.day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        return None
+
+
+def jobs() -> dict:
+    """{имя: Job} из settings.SCHEDULER_JOBS; задачи с пустым расписанием отключены."""
+    result = {}
+    for name, conf in settings.SCHEDULER_JOBS.items():
+        if not conf.get('schedule'):
+            continue
+        try:
+            schedule = CronSchedule(conf['schedule'])
+        except ValueError as exc:
+            raise ImproperlyConfigured(f'SCHEDULER_JOBS[{name!r}]: {exc}') from None
+        command, *args = conf['command']
+        lease_seconds = conf.get('lease_seconds', settings.SCHEDULER_LEASE_SECONDS)
+        result[name] = Job(name, schedule, command, args, lease_seconds)
+    return result
+
+
+def holder() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def ensure_leases(names) -> None:
+    JobLease.objects.bulk_create([JobLease(name=name) for name in names], ignore_conflicts=True)
+
+
+def acquire(job: Job, holder: str, slot=None, now=None) -> bool:
+    """
+    Забирает аренду задачи одним UPDATE: аренда свободна и (для запуска по расписанию)
+    запуск slot ещё никем не взят. Из нескольких процессов условие выполнится у одного.
+    """
+    now = now or timezone.now()
+    free = JobLease.objects.filter(name=job.name).filter(Q(locked_until__isnull=True) | Q(locked_until__lte=now))
+    changes = {'holder': holder, 'locked_until': now + timedelta(seconds=job.lease_seconds)}
+    if slot is not None:
+        free = free.filter(Q(last_slot__isnull=True) | Q(last_slot__lt=slot))
+        changes['last_slot'] = slot
+    if free.update(**changes) != 1:
+        return False
+    # аренда была свободна — значит, задачу никто не выполняет: запуски, оставшиеся
+    # «выполняется», принадлежат упавшему процессу и итога уже не запишут
+    JobRun.objects.filter(job=job.name, status=JobRun.Status.RUNNING).update(
+        status=JobRun.Status.FAILED, finished_at=now, error=ABANDONED_ERROR,
+    )
+    return True
+
+
+def release(job: Job, holder: str) -> None:
+    JobLease.objects.filter(name=job.name, holder=holder).update(locked_until=None)
+
+
+def run(job: Job, holder: str, slot=None) -> JobRun:
+    """Выполняет команду задачи (аренда уже взята) и записывает итог в JobRun."""
+    record = JobRun.objects.create(job=job.name, slot=slot, holder=holder)
+    output = io.StringIO()
+    started = time.perf_counter()
+    try:
+        call_command(job.command, *job.args, stdout=output, stderr=output)
+        record.status = JobRun.Status.OK
+    except Exception:
+        logger.exception('Задача %s завершилась с ошибкой', job.name)
+        record.status = JobRun.Status.FAILED
+        record.error = traceback.format_exc()[-OUTPUT_LIMIT:]
+    record.duration_ms = round((time.perf_counter() - started) * 1000)
+    record.finished_at = timezone.now()
+    record.output = output.getvalue()[-OUTPUT_LIMIT:]
+    record.save(update_fields=['status', 'error', 'duration_ms', 'finished_at', 'output'])
+    return record
+
+
+def prune_runs(job: Job, now=None) -> int:
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SCHEDULER_RUNS_KEEP_DAYS)
+    return JobRun.objects.filter(job=job.name, started_at__lt=cutoff).delete()[0]
+
+
+def run_due(job: Job, slot, holder: str):
+    """Запуск slot по расписанию; None — его уже выполняет или выполнил другой процесс."""
+    if not acquire(job, holder, slot):
+        return None
+    try:
+        record = run(job, holder, slot)
+    finally:
+        release(job, holder)
+    prune_runs(job)
+    return record
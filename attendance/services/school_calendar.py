@@ -1,5 +1,5 @@
 import calendar
-from datetime import date
+from datetime import date, timedelta
 from django.conf import settings
 
 
@@ -70,3 +70,28 @@ def get_working_days_in_month(year: int, month: int) -> list[date]:
 def count_working_days(year: int, month: int) -> int:
     """Возвращает количество учебных дней в месяце."""
     return len(get_working_days_in_month(year, month))
+
+
+def previous_school_day(day: date, max_back: int = 31):
+    """Ближайший учебный день до `day` (выходные и праздники пропускаются)."""
+    for offset in range(1, max_back + 1):
+        candidate = day - timedelta(days=offset)
+        if is_school_day(candidate):
+            return candidate
+    return None
+
+
+def last_school_days(day: date, count: int) -> list[date]:
+    """
+    `count` последних учебных дней, заканчивая `day` (сам `day` входит, если он учебный).
+    Возвращает по возрастанию.
+    """
+    days = [day] if is_school_day(day) else []
+    current = day
+    while len(days) < count:
+        current = previous_school_day(current)
+        if current is None:
+            break
+        days.append(current)
+    days.reverse()
+    return days
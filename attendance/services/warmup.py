@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from pathlib import Path
+
+from django.db import connection
+from django.template.loader import get_template
+
+from . import class_directory
+
+logger = logging.getLogger(__name__)
+
+# Прогрев перед утренним пиком. Общие кэши (роли, составы классов, табло, секции
+# статистики) считает команда warm_caches — один раз на все воркеры. То, что живёт
+# в памяти процесса (соединение с БД, скомпилированные шаблоны, справочник классов),
+# каждый воркер прогревает сам при старте: warm_process_in_background из asgi.py.
+
+# сколько ждать, пока пул откроет min_size соединений
+POOL_WAIT_SECONDS = 10
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates'
+
+
+def timed(func, *args):
+    """(результат, секунды) вызова func."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def warm_connection() -> str:
+    """
+    Открывает пул соединений (OPTIONS['pool']) и ждёт его min_size соединений: пул общий
+    для всех потоков воркера. Без пула соединение принадлежит потоку прогрева и после
+    него закрывается — греть нечего, этап пропускается.
+    """
+    if not connection.settings_dict.get('OPTIONS', {}).get('pool'):
+        return 'без пула — пропущено'
+    connection.ensure_connection()
+    connection.pool.wait(timeout=POOL_WAIT_SECONDS)
+    return f'пул {connection.pool.get_stats().get("pool_size", 0)}'
+
+
+def warm_templates() -> int:
+    """Компилирует все шаблоны приложения (в кэширующем загрузчике они остаются в памяти)."""
+    names = [path.relative_to(TEMPLATES_DIR).as_posix() for path in TEMPLATES_DIR.rglob('*.html')]
+    for name in names:
+        get_template(name)
+    return len(names)
+
+
+def warm_class_directory() -> int:
+    return len(class_directory.classes())
+
+
+PROCESS_STAGES = [
+    ('Соединение с БД', warm_connection),
+    ('Шаблоны', warm_templates),
+    ('Справочник классов', warm_class_directory),
+]
+
+
+def warm_process() -> list:
+    """Прогрев памяти текущего процесса: [(этап, результат, секунды)]."""
+    report = []
+    for label, func in PROCESS_STAGES:
+        result, seconds = timed(func)
+        report.append((label, result, seconds))
+    return report
+
+
+def _warm_process_logged():
+    try:
+        report = warm_process()
+    except Exception:
+        logger.exception('Прогрев воркера не удался')
+        return
+    finally:
+        # соединение этого потока возвращается в пул (без пула — просто закрывается)
+        connection.close()
+    logger.info('Воркер прогрет: %s', ', '.join(f'{label} {seconds * 1000:.0f} мс' for label, _, seconds in report))
+
+
+def warm_process_in_background() -> None:
+    """
+    Хук старта воркера. uvicorn импортирует приложение уже внутри event loop, где
+    синхронный ORM запрещён, поэтому прогрев идёт в отдельном потоке и старт не задерживает.
+    """
+    threading.Thread(target=_warm_process_logged, name='warm-caches', daemon=True).start()
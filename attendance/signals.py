@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from database.models import ClassRoom, Student, AttendanceSummary, AbsentStudent
+from .services import class_directory, class_rosters, day_snapshots, live_feed, missing_reports, roles
+
+# поля ученика, от которых зависит справочник классов (численность состава)
+ROSTER_FIELDS = {'is_active', 'class_room'}
+
+
+def _invalidate_class_directory():
+    # сразу — чтобы этот же запрос увидел изменения; после коммита — чтобы процесс,
+    # успевший перечитать классы до коммита, не оставил себе старый список
+    class_directory.invalidate()
+    transaction.on_commit(class_directory.invalidate)
+
+
+def invalidate_rosters(class_ids):
+    # так же дважды: сразу и после коммита
+    class_ids = set(class_ids)
+    class_rosters.invalidate(class_ids)
+    transaction.on_commit(lambda: class_rosters.invalidate(class_ids))
+
+
+def roster_changed(class_ids, counts=False):
+    """
+    Для массовых update() учеников, которые идут мимо сигналов: сбрасывает составы
+    классов, а при смене численности (counts) — и справочник классов.
+    """
+    invalidate_rosters(class_ids)
+    if counts:
+        _invalidate_class_directory()
+
+
+@receiver(post_save, sender=AttendanceSummary)
+def attendance_summary_saved(sender, instance: AttendanceSummary, created=False, **kwargs):
+    # событие собираем сейчас (данные экземпляра), публикуем после коммита и после сброса
+    # табло: клиент, получив событие, сразу перечитывает счётчики и видит уже новые
+    day = instance.date
+    event = live_feed.summary_event(instance, created)
+
+    def after_commit():
+        missing_reports.invalidate(day)
+        live_feed.publish(event)
+
+    day_snapshots.invalidate(day)
+    transaction.on_commit(after_commit)
+
+
+@receiver(post_delete, sender=AttendanceSummary)
+def attendance_summary_deleted(sender, instance: AttendanceSummary, **kwargs):
+    # после коммита: иначе параллельный запрос успеет закэшировать табло без этой сводки
+    day = instance.date
+    day_snapshots.invalidate(day)
+    transaction.on_commit(lambda: missing_reports.invalidate(day))
+
+
+@receiver(post_save, sender=AbsentStudent)
+@receiver(post_delete, sender=AbsentStudent)
+def absent_student_changed(sender, instance: AbsentStudent, **kwargs):
+    # правка отсутствия закрытого дня (в админке) — снимок дня пересоберётся
+    day_snapshots.invalidate(instance.date)
+
+
+@receiver(post_save, sender=ClassRoom)
+@receiver(post_delete, sender=ClassRoom)
+def class_room_changed(sender, instance: ClassRoom, **kwargs):
+    today = timezone.localdate()
+    transaction.on_commit(lambda: missing_reports.invalidate(today))
+    _invalidate_class_directory()
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def student_changed(sender, instance: Student, update_fields=None, **kwargs):
+    invalidate_rosters([instance.class_room_id, getattr(instance, '_old_class_room_id', None)])
+    # отметки льгот и правки ФИО на численность класса не влияют
+    if update_fields is not None and not ROSTER_FIELDS & set(update_fields):
+        return
+    _invalidate_class_directory()
+
+
+@receiver(m2m_changed, sender=Student.privilege_types.through)
+def student_privileges_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_rosters([instance.class_room_id])
+    elif action == 'pre_clear':
+        invalidate_rosters(instance.students.values_list('class_room_id', flat=True))
+    elif pk_set:
+        invalidate_rosters(Student.objects.filter(pk__in=pk_set).values_list('class_room_id', flat=True))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # ФИО и активность классного руководителя; вход (last_login) справочник не трогает
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    _invalidate_class_directory()
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+    if not reverse:
+        roles.invalidate([instance])
+    elif action == 'pre_clear':
+        # после clear() состав группы уже не узнать — сбрасываем заранее
+        roles.invalidate(instance.user_set.all())
+    elif pk_set:
+        roles.invalidate(get_user_model().objects.filter(pk__in=pk_set))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance: Group, **kwargs):
+    # переименование или удаление группы меняет роли всех её участников
+    roles.invalidate(instance.user_set.all())
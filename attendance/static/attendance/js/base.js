@@ -0,0 +1,830 @@
+// base.js — общие скрипты всех страниц (base.html) одним файлом: один запрос вместо пяти.
+// Разделы изолированы (IIFE) и общаются через window.ClassSort / AppTable / TableModal;
+// порядок сохранён прежним: ClassSort объявляется раньше таблиц.
+
+// ===== class_sort =====
+
+(() => {
+  const CLASS_RE = /^\s*(\d+)\s*(.*)$/;
+  const collator = new Intl.Collator("ru", { sensitivity: "base" });
+
+  function classSortKey(value) {
+    const raw = value == null ? "" : String(value);
+    const trimmed = raw.trim();
+    if (!trimmed) return { num: Number.POSITIVE_INFINITY, suffix: "" };
+
+    const match = trimmed.match(CLASS_RE);
+    if (!match) {
+      return { num: Number.POSITIVE_INFINITY, suffix: trimmed.toLowerCase() };
+    }
+
+    const num = parseInt(match[1], 10);
+    const suffix = (match[2] || "").trim().toLowerCase();
+    return { num: Number.isFinite(num) ? num : Number.POSITIVE_INFINITY, suffix };
+  }
+
+  function compareClassNames(a, b) {
+    const ka = classSortKey(a);
+    const kb = classSortKey(b);
+    if (ka.num !== kb.num) return ka.num - kb.num;
+    if (ka.suffix === kb.suffix) return 0;
+    return collator.compare(ka.suffix, kb.suffix);
+  }
+
+  function sortByClassName(list, accessor) {
+    const getValue = typeof accessor === "function" ? accessor : (item) => item;
+    return [...list].sort((a, b) => compareClassNames(getValue(a), getValue(b)));
+  }
+
+  window.ClassSort = {
+    classSortKey,
+    compareClassNames,
+    sortByClassName,
+  };
+})();
+
+// ===== app_table =====
+
+(() => {
+  const TABLE_CONTAINER_SEL = "[data-app-table]";
+  const TABLE_SEL = "[data-app-table-target]";
+  const COPY_BTN_SEL = "[data-table-copy]";
+  const COPY_STATUS_SEL = "[data-copy-status]";
+
+  const collator = new Intl.Collator("ru", { numeric: true, sensitivity: "base" });
+
+  const SORT_TYPES = new Set(["text", "number", "class", "date"]);
+
+  function normalizeWhitespace(text) {
+    return String(text || "").replace(/\s+/g, " ").trim();
+  }
+
+  function normalizeCellText(text) {
+    return String(text || "")
+      .replace(/\s*\n\s*/g, ", ")
+      .replace(/\s+/g, " ")
+      .trim();
+  }
+
+  function extractControlValues(cell) {
+    const controls = Array.from(cell.querySelectorAll("input, select, textarea"));
+    const values = [];
+
+    controls.forEach((ctrl) => {
+      if (ctrl.hasAttribute("data-copy-ignore")) return;
+
+      if (ctrl.tagName === "SELECT") {
+        const selected = Array.from(ctrl.selectedOptions || [])
+          .map((opt) => normalizeWhitespace(opt.textContent))
+          .filter(Boolean);
+        if (selected.length) values.push(selected.join(", "));
+        return;
+      }
+
+      const type = (ctrl.getAttribute("type") || "").toLowerCase();
+      if (type === "checkbox" || type === "radio" || type === "hidden") return;
+
+      const val = normalizeWhitespace(ctrl.value);
+      if (val) values.push(val);
+    });
+
+    return values;
+  }
+
+  function getCellText(cell, { forSort = false } = {}) {
+    if (!cell) return "";
+
+    if (forSort && cell.dataset.sortValue) {
+      return normalizeWhitespace(cell.dataset.sortValue);
+    }
+
+    if (!forSort && cell.dataset.copyValue) {
+      return normalizeWhitespace(cell.dataset.copyValue);
+    }
+
+    const controlValues = extractControlValues(cell);
+    if (controlValues.length) return controlValues.join(", ");
+
+    const clone = cell.cloneNode(true);
+    clone
+      .querySelectorAll("[data-copy-ignore], button, .btn, form, svg, i, input, select, textarea")
+      .forEach((el) => el.remove());
+
+    const text = clone.innerText || clone.textContent || "";
+    return normalizeCellText(text);
+  }
+
+  function parseNumber(value) {
+    const raw = String(value || "").replace(/\s+/g, "").replace(",", ".");
+    const match = raw.match(/-?\d+(?:\.\d+)?/);
+    if (!match) return null;
+    const num = parseFloat(match[0]);
+    return Number.isFinite(num) ? num : null;
+  }
+
+  function parseRuDate(value) {
+    const raw = String(value || "").trim();
+    if (!raw) return null;
+
+    const match = raw.match(/(\d{1,2})\.(\d{1,2})\.(\d{4})(?:\s+(\d{1,2}):(\d{2}))?/);
+    if (!match) return null;
+
+    const day = parseInt(match[1], 10);
+    const month = parseInt(match[2], 10);
+    const year = parseInt(match[3], 10);
+    const hour = match[4] ? parseInt(match[4], 10) : 0;
+    const minute = match[5] ? parseInt(match[5], 10) : 0;
+
+    if (!Number.isFinite(day) || !Number.isFinite(month) || !Number.isFinite(year)) return null;
+    return new Date(year, month - 1, day, hour, minute).getTime();
+  }
+
+  function compareValues(a, b, type) {
+    if (type === "number") {
+      const na = parseNumber(a);
+      const nb = parseNumber(b);
+      if (na === null && nb === null) return collator.compare(String(a), String(b));
+      if (na === null) return 1;
+      if (nb === null) return -1;
+      return na - nb;
+    }
+
+    if (type === "date") {
+      const da = parseRuDate(a);
+      const db = parseRuDate(b);
+      if (da === null && db === null) return collator.compare(String(a), String(b));
+      if (da === null) return 1;
+      if (db === null) return -1;
+      return da - db;
+    }
+
+    if (type === "class" && window.ClassSort && typeof window.ClassSort.compareClassNames === "function") {
+      return window.ClassSort.compareClassNames(a, b);
+    }
+
+    return collator.compare(String(a), String(b));
+  }
+
+  function isEmptyRow(row) {
+    if (!row) return true;
+    if (row.dataset.tableEmpty === "1") return true;
+    if (row.cells.length === 1 && row.cells[0] && row.cells[0].hasAttribute("colspan")) return true;
+    return false;
+  }
+
+  function sortTableByColumn(table, columnIndex, sortType, direction) {
+    if (!table || !table.tBodies || !table.tBodies.length) return;
+
+    const tbody = table.tBodies[0];
+    const rows = Array.from(tbody.rows);
+    if (rows.length < 2) return;
+
+    const sortable = rows.filter((row) => !isEmptyRow(row));
+    if (sortable.length < 2) return;
+
+    const otherRows = rows.filter((row) => !sortable.includes(row));
+
+    const withIndex = sortable.map((row, idx) => {
+      const cell = row.cells[columnIndex];
+      return {
+        row,
+        idx,
+        value: getCellText(cell, { forSort: true }),
+      };
+    });
+
+    withIndex.sort((a, b) => {
+      const cmp = compareValues(a.value, b.value, sortType);
+      if (cmp !== 0) return direction === "desc" ? -cmp : cmp;
+      return a.idx - b.idx;
+    });
+
+    withIndex.forEach((item) => tbody.appendChild(item.row));
+    otherRows.forEach((row) => tbody.appendChild(row));
+  }
+
+  function setSortState(th, direction) {
+    const headerRow = th.closest("thead");
+    if (!headerRow) return;
+
+    const all = headerRow.querySelectorAll("th[data-sort]");
+    all.forEach((cell) => {
+      if (cell === th) return;
+      cell.removeAttribute("data-sort-dir");
+      cell.removeAttribute("aria-sort");
+    });
+
+    if (direction) {
+      th.setAttribute("data-sort-dir", direction);
+      th.setAttribute("aria-sort", direction === "asc" ? "ascending" : "descending");
+    } else {
+      th.removeAttribute("data-sort-dir");
+      th.removeAttribute("aria-sort");
+    }
+  }
+
+  function handleSortClick(th, index) {
+    const sortType = SORT_TYPES.has(th.dataset.sort) ? th.dataset.sort : "text";
+    const current = th.getAttribute("data-sort-dir");
+    const next = current === "asc" ? "desc" : "asc";
+
+    const table = th.closest("table");
+    if (!table) return;
+
+    sortTableByColumn(table, index, sortType, next);
+    setSortState(th, next);
+  }
+
+  function applySortColumns(table) {
+    const raw = (table.dataset.sortColumns || "").trim();
+    if (!raw) return;
+
+    const types = raw.split(",").map((item) => item.trim());
+    if (!types.length) return;
+
+    const headers = Array.from(table.querySelectorAll("thead th"));
+    types.forEach((type, idx) => {
+      if (!headers[idx]) return;
+      const normalized = String(type || "").toLowerCase();
+      if (!normalized || normalized === "none" || normalized === "-") return;
+      if (!headers[idx].dataset.sort) headers[idx].dataset.sort = normalized;
+    });
+  }
+
+  function initSorting(table) {
+    applySortColumns(table);
+    const headers = Array.from(table.querySelectorAll("thead th[data-sort]"));
+    if (!headers.length) return;
+
+    headers.forEach((th, index) => {
+      th.setAttribute("role", "button");
+      if (!th.hasAttribute("tabindex")) th.setAttribute("tabindex", "0");
+
+      th.addEventListener("click", () => handleSortClick(th, index));
+      th.addEventListener("keydown", (e) => {
+        if (e.key === "Enter" || e.key === " ") {
+          e.preventDefault();
+          handleSortClick(th, index);
+        }
+      });
+    });
+  }
+
+  function isRowVisible(row) {
+    if (!row) return false;
+    if (row.hidden) return false;
+    if (row.style.display === "none") return false;
+    return true;
+  }
+
+  function buildRowsFromSection(section, { includeHidden }) {
+    const out = [];
+    if (!section) return out;
+
+    Array.from(section.rows).forEach((row) => {
+      if (!includeHidden && !isRowVisible(row)) return;
+      const cells = Array.from(row.cells || []);
+      if (!cells.length) return;
+      out.push(cells);
+    });
+
+    return out;
+  }
+
+  function buildTableText(table, { includeHidden = true } = {}) {
+    if (!table) return "";
+
+    const rows = [];
+    rows.push(...buildRowsFromSection(table.tHead, { includeHidden }));
+    Array.from(table.tBodies || []).forEach((body) => {
+      rows.push(...buildRowsFromSection(body, { includeHidden }));
+    });
+    rows.push(...buildRowsFromSection(table.tFoot, { includeHidden }));
+
+    return rows
+      .map((cells) => cells.map((cell) => getCellText(cell)).join("\t"))
+      .join("\n")
+      .trim();
+  }
+
+  function collectSelectedCells(table, range) {
+    if (!range) return [];
+    const sections = [table.tHead, ...Array.from(table.tBodies || []), table.tFoot].filter(Boolean);
+    const selectedRows = [];
+
+    sections.forEach((section) => {
+      Array.from(section.rows).forEach((row) => {
+        const cells = Array.from(row.cells).filter((cell) => {
+          try {
+            return range.intersectsNode(cell);
+          } catch {
+            return false;
+          }
+        });
+        if (cells.length) selectedRows.push(cells);
+      });
+    });
+
+    return selectedRows;
+  }
+
+  async function writeClipboard(text) {
+    if (!text) return false;
+
+    if (navigator.clipboard && navigator.clipboard.writeText) {
+      try {
+        await navigator.clipboard.writeText(text);
+        return true;
+      } catch {
+        // fallback below
+      }
+    }
+
+    try {
+      const ta = document.createElement("textarea");
+      ta.value = text;
+      ta.setAttribute("readonly", "readonly");
+      ta.style.position = "absolute";
+      ta.style.left = "-9999px";
+      document.body.appendChild(ta);
+      ta.select();
+      const ok = document.execCommand("copy");
+      document.body.removeChild(ta);
+      return ok;
+    } catch {
+      return false;
+    }
+  }
+
+  function setCopyStatus(container, button, message, ok = true) {
+    const statusEl = container ? container.querySelector(COPY_STATUS_SEL) : null;
+    if (statusEl) {
+      statusEl.textContent = message;
+      statusEl.classList.toggle("text-success", ok);
+      statusEl.classList.toggle("text-danger", !ok);
+      return;
+    }
+
+    if (!button) return;
+    const prev = button.dataset.copyLabel || button.textContent;
+    button.dataset.copyLabel = prev;
+    button.textContent = message;
+    button.classList.toggle("btn-outline-light", ok);
+    button.classList.toggle("btn-outline-danger", !ok);
+
+    setTimeout(() => {
+      button.textContent = button.dataset.copyLabel || prev;
+      button.classList.toggle("btn-outline-danger", false);
+      button.classList.toggle("btn-outline-light", true);
+    }, 1600);
+  }
+
+  async function handleCopyButtonClick(btn) {
+    const container = btn.closest(TABLE_CONTAINER_SEL);
+    const table = container ? container.querySelector(TABLE_SEL) : btn.closest("table");
+    if (!table) return;
+
+    const includeHidden = !(container && container.dataset.copyVisible === "true");
+    const text = buildTableText(table, { includeHidden });
+    const ok = await writeClipboard(text);
+
+    if (ok) {
+      setCopyStatus(container, btn, "Скопировано", true);
+    } else {
+      setCopyStatus(container, btn, "Не удалось скопировать", false);
+    }
+  }
+
+  function initCopyButtons(root = document) {
+    root.querySelectorAll(COPY_BTN_SEL).forEach((btn) => {
+      if (btn.dataset.copyBound === "1") return;
+      btn.dataset.copyBound = "1";
+      btn.addEventListener("click", () => handleCopyButtonClick(btn));
+    });
+  }
+
+  function handleSelectionCopy(e) {
+    const selection = window.getSelection ? window.getSelection() : null;
+    if (!selection || selection.isCollapsed || selection.rangeCount === 0) return;
+
+    const active = document.activeElement;
+    if (active && (active.tagName === "INPUT" || active.tagName === "TEXTAREA")) return;
+
+    const range = selection.getRangeAt(0);
+    const node = range.commonAncestorContainer;
+    const element = node.nodeType === 1 ? node : node.parentElement;
+    if (!element) return;
+
+    const table = element.closest(TABLE_SEL);
+    if (!table) return;
+
+    const selectedRows = collectSelectedCells(table, range);
+    if (!selectedRows.length) return;
+
+    const text = selectedRows
+      .map((cells) => cells.map((cell) => getCellText(cell)).join("\t"))
+      .join("\n")
+      .trim();
+
+    if (!text) return;
+
+    e.preventDefault();
+    e.clipboardData.setData("text/plain", text);
+  }
+
+  function initTables(root = document) {
+    root.querySelectorAll(TABLE_SEL).forEach((table) => initSorting(table));
+    initCopyButtons(root);
+  }
+
+  // для таблиц, которые страница подгружает позже (секции статистики)
+  window.AppTable = { initTables };
+
+  function init() {
+    initTables();
+    document.addEventListener("copy", handleSelectionCopy);
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", init);
+  } else {
+    init();
+  }
+})();
+
+// ===== table_modal =====
+
+(() => {
+  const modalEl = document.getElementById("table-modal");
+  if (!modalEl || !window.bootstrap || !window.bootstrap.Modal) return;
+
+  const dialogEl = modalEl.querySelector(".modal-dialog");
+  const titleEl = document.getElementById("table-modal-title");
+  const subtitleEl = document.getElementById("table-modal-subtitle");
+  const searchWrap = document.getElementById("table-modal-search-wrap");
+  const searchInput = document.getElementById("table-modal-search");
+  const sortWrap = document.getElementById("table-modal-sort-wrap");
+  const sortSelect = document.getElementById("table-modal-sort");
+  const listEl = document.getElementById("table-modal-list");
+  const hintEl = document.getElementById("table-modal-hint");
+  const emptyEl = document.getElementById("table-modal-empty");
+  const applyBtn = document.getElementById("table-modal-apply");
+  const cancelBtn = document.getElementById("table-modal-cancel");
+  const secondaryBtn = document.getElementById("table-modal-secondary");
+
+  if (!dialogEl || !titleEl || !searchInput || !sortSelect || !listEl || !applyBtn || !cancelBtn) {
+    console.warn("Table modal: required elements not found.");
+    return;
+  }
+
+  const SIZE_CLASSES = ["modal-sm", "modal-lg", "modal-xl"];
+  const DEFAULT_SORTS = [
+    { value: "default", label: "По порядку" },
+    { value: "name_asc", label: "ФИО А-Я" },
+    { value: "name_desc", label: "ФИО Я-А" },
+  ];
+
+  const bsModal = window.bootstrap.Modal.getOrCreateInstance(modalEl, {
+    backdrop: false,
+    keyboard: true,
+    focus: true,
+  });
+
+  let state = {};
+
+  function compareRu(a, b) {
+    return a.localeCompare(b, "ru", { sensitivity: "base" });
+  }
+
+  function getCompare() {
+    if (state.sortCompare) return state.sortCompare;
+    if (
+      state.sortMode === "class" &&
+      window.ClassSort &&
+      typeof window.ClassSort.compareClassNames === "function"
+    ) {
+      return window.ClassSort.compareClassNames;
+    }
+    return compareRu;
+  }
+
+  function normalizeItems(items) {
+    return (items || []).map((item, idx) => {
+      const label = String(item.label || "").trim();
+      const id = item.id != null ? String(item.id) : String(idx);
+      return {
+        id,
+        label,
+        labelLower: label.toLowerCase(),
+        disabled: !!item.disabled,
+        __index: idx,
+      };
+    });
+  }
+
+  function setDialogSize(size) {
+    if (!dialogEl) return;
+    SIZE_CLASSES.forEach((cls) => dialogEl.classList.remove(cls));
+    dialogEl.classList.remove("app-modal-sheet-lg");
+
+    if (size === "sm") dialogEl.classList.add("modal-sm");
+    else if (size === "lg") dialogEl.classList.add("modal-lg");
+    else if (size === "xl") dialogEl.classList.add("modal-xl");
+
+    if (size === "lg" || size === "xl") {
+      dialogEl.classList.add("app-modal-sheet-lg");
+    }
+  }
+
+  function setSortOptions(options, defaultValue) {
+    const opts = (options && options.length) ? options : DEFAULT_SORTS;
+    sortSelect.innerHTML = "";
+    opts.forEach((opt) => {
+      const o = document.createElement("option");
+      o.value = opt.value;
+      o.textContent = opt.label;
+      sortSelect.appendChild(o);
+    });
+
+    const value = defaultValue && opts.some((o) => o.value === defaultValue)
+      ? defaultValue
+      : opts[0].value;
+    sortSelect.value = value;
+  }
+
+  function getSorted(items, sortValue) {
+    const list = [...items];
+    const compare = getCompare();
+    if (sortValue === "name_asc") {
+      list.sort((a, b) => compare(a.label, b.label));
+    } else if (sortValue === "name_desc") {
+      list.sort((a, b) => compare(b.label, a.label));
+    } else {
+      list.sort((a, b) => a.__index - b.__index);
+    }
+    return list;
+  }
+
+  function renderList() {
+    const term = (searchInput.value || "").trim().toLowerCase();
+    const sortValue = sortSelect.value || state.defaultSort;
+
+    let items = state.items;
+    if (term) {
+      items = items.filter((i) => i.labelLower.includes(term));
+    }
+
+    const view = getSorted(items, sortValue);
+    listEl.innerHTML = "";
+
+    if (emptyEl) {
+      emptyEl.classList.toggle("d-none", view.length > 0);
+      if (view.length === 0) emptyEl.textContent = state.emptyText || "Нет данных.";
+    }
+
+    view.forEach((item) => {
+      if (!state.selectable) {
+        const row = document.createElement("div");
+        row.className = "table-modal-item table-modal-item--readonly";
+        row.textContent = item.label || "—";
+        listEl.appendChild(row);
+        return;
+      }
+
+      const row = document.createElement("label");
+      row.className = "table-modal-item";
+      if (item.disabled) row.classList.add("table-modal-item--disabled");
+      row.dataset.name = item.labelLower;
+
+      const checkbox = document.createElement("input");
+      checkbox.type = "checkbox";
+      checkbox.value = item.id;
+      checkbox.checked = state.selected.has(item.id);
+      checkbox.disabled = item.disabled;
+
+      const span = document.createElement("span");
+      span.textContent = item.label || "—";
+
+      row.appendChild(checkbox);
+      row.appendChild(span);
+      listEl.appendChild(row);
+    });
+
+    if (typeof state.subtitleBuilder === "function") {
+      const text = state.subtitleBuilder({ shown: view.length, total: state.items.length }) || "";
+      if (subtitleEl) subtitleEl.textContent = text;
+    }
+  }
+
+  listEl.addEventListener("change", (e) => {
+    const cb = e.target.closest('input[type="checkbox"]');
+    if (!cb) return;
+    const id = String(cb.value);
+    if (cb.checked) state.selected.add(id);
+    else state.selected.delete(id);
+  });
+
+  searchInput.addEventListener("input", renderList);
+  sortSelect.addEventListener("change", renderList);
+
+  applyBtn.addEventListener("click", () => {
+    if (!state.onApply) {
+      bsModal.hide();
+      return;
+    }
+    const result = state.onApply(Array.from(state.selected));
+    if (result !== false) bsModal.hide();
+  });
+
+  if (secondaryBtn) {
+    secondaryBtn.addEventListener("click", () => {
+      if (!state.onSecondary) {
+        bsModal.hide();
+        return;
+      }
+      const result = state.onSecondary(Array.from(state.selected));
+      if (result !== false) bsModal.hide();
+    });
+  }
+
+  modalEl.addEventListener("hidden.bs.modal", () => {
+    if (state.onClose) state.onClose();
+    searchInput.value = "";
+    listEl.innerHTML = "";
+    if (hintEl) hintEl.classList.add("d-none");
+    if (emptyEl) emptyEl.classList.add("d-none");
+    state = {};
+  });
+
+  function open(config) {
+    const cfg = config || {};
+    const selectable = cfg.selectable !== false;
+    const selectedIds = new Set((cfg.selectedIds || []).map(String));
+
+    state = {
+      title: cfg.title || "",
+      subtitle: cfg.subtitle || "",
+      subtitleBuilder: cfg.subtitleBuilder || null,
+      items: normalizeItems(cfg.items || []),
+      selectable,
+      selected: selectedIds,
+      onApply: cfg.onApply || null,
+      onSecondary: cfg.onSecondary || null,
+      onClose: cfg.onClose || null,
+      sortMode: cfg.sortMode || "label",
+      sortCompare: typeof cfg.sortCompare === "function" ? cfg.sortCompare : null,
+      defaultSort: cfg.defaultSort || "default",
+      emptyText: cfg.emptyText || "Нет данных.",
+    };
+
+    titleEl.textContent = state.title;
+    if (subtitleEl) subtitleEl.textContent = state.subtitle || "";
+    searchInput.placeholder = cfg.searchPlaceholder || "Поиск...";
+
+    if (searchWrap) {
+      searchWrap.classList.toggle("d-none", cfg.allowSearch === false);
+    }
+    if (sortWrap) {
+      sortWrap.classList.toggle("d-none", cfg.allowSort === false);
+    }
+
+    setSortOptions(cfg.sortOptions, state.defaultSort);
+    setDialogSize(cfg.size || "lg");
+
+    if (hintEl) {
+      const hintText = cfg.hintText || "";
+      hintEl.textContent = hintText;
+      hintEl.classList.toggle("d-none", !hintText);
+    }
+
+    if (secondaryBtn) {
+      const showSecondary = !!cfg.secondaryLabel;
+      secondaryBtn.textContent = cfg.secondaryLabel || "";
+      secondaryBtn.classList.toggle("d-none", !showSecondary);
+    }
+
+    const showApply = cfg.showApply !== false && selectable;
+    applyBtn.textContent = cfg.applyLabel || "Применить";
+    applyBtn.classList.toggle("d-none", !showApply);
+
+    cancelBtn.textContent = cfg.cancelLabel || "Отмена";
+
+    renderList();
+    bsModal.show();
+    setTimeout(() => searchInput.focus(), 50);
+  }
+
+  window.TableModal = { open };
+})();
+
+// ===== data_toggle_password =====
+
+document.addEventListener('click', (e) => {
+  const btn = e.target.closest('[data-toggle-password]');
+  if (!btn) return;
+
+  const sel = btn.getAttribute('data-toggle-password');
+  const input = document.querySelector(sel);
+  if (!input) return;
+
+  const show = input.type === 'password';
+  input.type = show ? 'text' : 'password';
+
+  const icon = btn.querySelector('i');
+  if (icon) {
+    icon.classList.toggle('bi-eye', !show);
+    icon.classList.toggle('bi-eye-slash', show);
+  }
+
+  btn.setAttribute('aria-pressed', String(show));
+  btn.setAttribute('aria-label', show ? 'Скрыть пароль' : 'Показать пароль');
+  input.focus({ preventScroll: true });
+});
+
+// ===== theme_toggle =====
+
+(() => {
+  const root = document.documentElement;
+  const toggle = document.getElementById("theme-toggle");
+  const icon = toggle ? toggle.querySelector(".theme-toggle__icon") : null;
+  const label = toggle ? toggle.querySelector(".theme-toggle__text") : null;
+  const mql = window.matchMedia ? window.matchMedia("(prefers-color-scheme: light)") : null;
+  const modes = ["auto", "light", "dark"];
+
+  const readCookie = (name) => {
+    const parts = document.cookie.split(";").map(part => part.trim());
+    const match = parts.find(part => part.startsWith(`${name}=`));
+    return match ? decodeURIComponent(match.split("=").slice(1).join("=")) : "";
+  };
+
+  const writeCookie = (name, value) => {
+    const maxAge = 60 * 60 * 24 * 365;
+    document.cookie = `${name}=${encodeURIComponent(value)}; Max-Age=${maxAge}; Path=/; SameSite=Lax`;
+  };
+
+  const getPreferredTheme = () => (mql && mql.matches ? "light" : "dark");
+
+  const normalizeMode = (value) =>
+    modes.includes(value) ? value : "auto";
+
+  const resolveTheme = (mode) =>
+    mode === "auto" ? getPreferredTheme() : mode;
+
+  const applyTheme = (mode) => {
+    const theme = resolveTheme(mode);
+    root.setAttribute("data-theme", theme);
+    root.setAttribute("data-bs-theme", theme);
+    root.setAttribute("data-theme-mode", mode);
+  };
+
+  const syncToggle = (mode) => {
+    if (!toggle) return;
+    const actual = resolveTheme(mode);
+    const isDark = actual === "dark";
+    const isAuto = mode === "auto";
+
+    toggle.setAttribute("aria-pressed", isDark ? "true" : "false");
+    toggle.setAttribute(
+      "aria-label",
+      isAuto ? "Тема: система" : `Тема: ${isDark ? "тёмная" : "светлая"}`
+    );
+
+    if (icon) {
+      icon.classList.toggle("bi-circle-half", isAuto);
+      icon.classList.toggle("bi-moon-stars-fill", !isAuto && isDark);
+      icon.classList.toggle("bi-sun-fill", !isAuto && !isDark);
+    }
+
+    if (label) {
+      label.textContent = isAuto ? "Система" : (isDark ? "Тёмная" : "Светлая");
+    }
+  };
+
+  let mode = normalizeMode(readCookie("theme"));
+  applyTheme(mode);
+  syncToggle(mode);
+
+  if (toggle) {
+    toggle.addEventListener("click", () => {
+      const currentIndex = modes.indexOf(mode);
+      mode = modes[(currentIndex + 1) % modes.length];
+      writeCookie("theme", mode);
+      applyTheme(mode);
+      syncToggle(mode);
+    });
+  }
+
+  if (mql) {
+    const onSystemChange = () => {
+      if (mode !== "auto") return;
+      applyTheme(mode);
+      syncToggle(mode);
+    };
+
+    if (mql.addEventListener) {
+      mql.addEventListener("change", onSystemChange);
+    } else if (mql.addListener) {
+      mql.addListener(onSystemChange);
+    }
+  }
+})();
@@ -0,0 +1,54 @@
+(() => {
+  const board = document.querySelector("[data-missing-board]");
+  if (!board) return;
+
+  const feedUrl = board.dataset.feedUrl;
+  const pollMs = Math.max(5, parseInt(board.dataset.pollSeconds || "15", 10) || 15) * 1000;
+  const rowsEl = board.querySelector("[data-board-rows]");
+  const reportedEl = board.querySelector("[data-board-reported]");
+  const totalEl = board.querySelector("[data-board-total]");
+
+  function cell(text, className) {
+    const td = document.createElement("td");
+    if (className) td.className = className;
+    td.textContent = text;
+    return td;
+  }
+
+  function render(data) {
+    if (reportedEl) reportedEl.textContent = data.reported;
+    if (totalEl) totalEl.textContent = data.total;
+    if (!rowsEl) return;
+
+    rowsEl.innerHTML = "";
+    if (!data.missing.length) {
+      const tr = document.createElement("tr");
+      const td = cell("Все классы сдали отчёт 🎉", "text-center text-secondary py-4");
+      td.colSpan = 3;
+      tr.appendChild(td);
+      rowsEl.appendChild(tr);
+      return;
+    }
+    data.missing.forEach(row => {
+      const tr = document.createElement("tr");
+      tr.append(
+        cell(row.name, "fw-semibold"),
+        cell(row.teacher || "—"),
+        cell(row.student_count, "text-end"),
+      );
+      rowsEl.appendChild(tr);
+    });
+  }
+
+  function poll() {
+    // фоновые вкладки не опрашивают сервер
+    if (document.visibilityState !== "visible") return;
+    fetch(feedUrl, { credentials: "same-origin", headers: { Accept: "application/json" } })
+      .then(resp => (resp.ok ? resp.json() : null))
+      .then(data => { if (data) render(data); })
+      .catch(() => {});
+  }
+
+  setInterval(poll, pollMs);
+  document.addEventListener("visibilitychange", poll);
+})();
@@ -79,6 +79,88 @@
     });
   }
 
+  // --- Lazy Sections ---
+  // Графики и таблицы приходят отдельными запросами (statistics/section/<name>/),
+  // когда секция подъезжает к экрану или раскрывается; браузер сам сверяет ETag.
+  const sectionLoads = new Map();
+
+  function renderHeatmapSideList(data) {
+    const list = document.querySelector(".heatmap-side__list");
+    if (!list || !Array.isArray(data.heatmap_rows)) return;
+    list.innerHTML = "";
+    data.heatmap_rows.forEach(row => {
+      const item = document.createElement("li");
+      item.className = "heatmap-side__item";
+      item.title = row.class_name;
+      item.dataset.className = row.class_name;
+      const name = document.createElement("span");
+      name.className = "heatmap-side__class";
+      name.textContent = row.class_name;
+      const ratio = document.createElement("span");
+      ratio.className = "heatmap-side__ratio";
+      ratio.textContent = `${row.report_count}/${data.working_days_count}`;
+      item.append(name, ratio);
+      list.appendChild(item);
+    });
+  }
+
+  function loadSection(kind) {
+    if (sectionLoads.has(kind)) return sectionLoads.get(kind);
+    const el = document.querySelector(`[data-lazy-section="${kind}"]`);
+    if (!el || !el.dataset.src) return Promise.resolve();
+
+    const isJson = el.dataset.lazyFormat === "json";
+    const promise = fetch(el.dataset.src, {
+      credentials: "same-origin",
+      headers: { Accept: isJson ? "application/json" : "text/html" },
+    })
+      .then(resp => {
+        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+        return isJson ? resp.json() : resp.text();
+      })
+      .then(data => {
+        if (isJson) {
+          window.APP_CHART_DATA = data;
+          renderHeatmapSideList(data);
+          initCharts();
+        } else {
+          el.innerHTML = data;
+          if (window.AppTable) window.AppTable.initTables(el);
+        }
+        document.dispatchEvent(new CustomEvent("statistics:section-loaded", { detail: { kind } }));
+      })
+      .catch(() => {
+        // следующая попытка — при следующем раскрытии секции
+        sectionLoads.delete(kind);
+        const status = el.querySelector("[data-lazy-status]");
+        if (status) status.textContent = "Не удалось загрузить данные. Раскройте секцию ещё раз.";
+      });
+    sectionLoads.set(kind, promise);
+    return promise;
+  }
+
+  function loadSectionsForFilters(tableType) {
+    SECTION_KINDS.forEach(k => {
+      if (tableType === "all" || tableType === k) loadSection(k);
+    });
+  }
+
+  function initLazySections() {
+    const blocks = $$("[data-section-block]");
+    if (!("IntersectionObserver" in window)) {
+      blocks.forEach(block => loadSection(block.dataset.sectionBlock));
+      return;
+    }
+    const observer = new IntersectionObserver(entries => {
+      entries.forEach(entry => {
+        if (!entry.isIntersecting) return;
+        observer.unobserve(entry.target);
+        loadSection(entry.target.dataset.sectionBlock);
+      });
+    }, { rootMargin: "200px 0px" });
+    blocks.forEach(block => observer.observe(block));
+  }
+
   // --- Filtering ---
   (function initFilters() {
     const globalInput = $("#global-search");
@@ -100,6 +182,8 @@
       const tableType = typeSelect.value;
 
       const isFiltering = !!(globalTerm || classTerm || studentTerm || minUnexcused || minAbsences);
+      // фильтр по ещё не загруженным секциям: подгружаем их, после загрузки фильтры применятся заново
+      if (isFiltering || tableType !== "all") loadSectionsForFilters(tableType);
 
       $$("[data-section-block]").forEach((block) => {
         const kind = block.dataset.sectionBlock;
@@ -179,9 +263,16 @@
       });
     }
 
+    document.addEventListener("statistics:section-loaded", () => applyFilters({ doScroll: false }));
+
     applyFilters({ doScroll: false });
   })();
 
+  document.addEventListener("show.bs.collapse", e => {
+     const k = e.target.getAttribute("data-section-collapse");
+     if (k) loadSection(k);
+  });
+
   document.addEventListener("shown.bs.collapse", e => {
      const k = e.target.getAttribute("data-section-collapse");
      if(k) setButtonExpanded(k, true);
@@ -580,8 +671,78 @@
     }
   }
 
-  // Запуск
-  if (document.readyState === "loading") document.addEventListener("DOMContentLoaded", initCharts);
-  else initCharts();
+  // --- Live Feed ---
+  // Сохранения отчётов приходят по SSE (statistics/live/): счётчик «сдали сегодня»
+  // перечитывается из кэша табло, а уже загруженные секции текущего месяца — обновляются.
+  function initLiveFeed() {
+    const panel = document.querySelector("[data-live-panel]");
+    if (!panel || !("EventSource" in window)) return;
+
+    const statusEl = panel.querySelector("[data-live-status]");
+    const reportedEl = panel.querySelector("[data-live-reported]");
+    const totalEl = panel.querySelector("[data-live-total]");
+    const lastEl = panel.querySelector("[data-live-last]");
+    const month = parseInt(panel.dataset.month, 10);
+    const year = parseInt(panel.dataset.year, 10);
+    let reloadTimer = null;
+
+    const setStatus = (text, cls) => {
+      if (!statusEl) return;
+      statusEl.className = `badge me-2 ${cls}`;
+      statusEl.innerHTML = `<i class="bi bi-broadcast me-1"></i> ${text}`;
+    };
+
+    const refreshBoard = () => fetch(panel.dataset.boardUrl, {
+      credentials: "same-origin",
+      headers: { Accept: "application/json" },
+    })
+      .then(resp => (resp.ok ? resp.json() : null))
+      .then(data => {
+        if (!data) return;
+        if (reportedEl) reportedEl.textContent = data.reported;
+        if (totalEl) totalEl.textContent = data.total;
+      })
+      .catch(() => {});
+
+    // несколько сохранений подряд (перемена) — одна перезагрузка секций
+    const scheduleReload = () => {
+      clearTimeout(reloadTimer);
+      reloadTimer = setTimeout(() => {
+        [...sectionLoads.keys()].forEach(kind => {
+          sectionLoads.delete(kind);
+          loadSection(kind);
+        });
+      }, 2000);
+    };
+
+    const source = new EventSource(panel.dataset.streamUrl);
+    source.addEventListener("open", () => setStatus("В эфире", "text-bg-success"));
+    source.addEventListener("error", () => setStatus("Переподключение…", "text-bg-secondary"));
+    source.addEventListener("attendance", e => {
+      let event;
+      try { event = JSON.parse(e.data); } catch (err) { return; }
+
+      if (lastEl) {
+        const time = new Date(event.saved_at).toLocaleTimeString("ru-RU", { hour: "2-digit", minute: "2-digit" });
+        const action = event.type === "created" ? "сдал отчёт" : "исправил отчёт";
+        lastEl.textContent = `${time} — ${event.class_name} ${action}${event.saved_by ? ` (${event.saved_by})` : ""}`;
+      }
+      refreshBoard();
+
+      const [y, m] = String(event.date).split("-").map(Number);
+      if (y === year && m === month) scheduleReload();
+    });
+
+    refreshBoard();
+  }
+
+  // Запуск: графики строятся, когда придут их данные
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", initLazySections);
+    document.addEventListener("DOMContentLoaded", initLiveFeed);
+  } else {
+    initLazySections();
+    initLiveFeed();
+  }
 
 })();
\ No newline at end of file
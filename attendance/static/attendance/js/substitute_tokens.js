@@ -127,6 +127,38 @@
     ttlPreview.textContent = human(sec,min,hour,day,week);
   }
 
+  // ===== bulk issue =====
+  const bulkForm = document.getElementById('bulk-token-form');
+
+  if (bulkForm) {
+    // отметка параллели отмечает все её классы
+    bulkForm.querySelectorAll('[data-bulk-grade-toggle]').forEach(toggle => {
+      toggle.addEventListener('change', () => {
+        const group = toggle.closest('[data-bulk-grade]');
+        group.querySelectorAll('[data-bulk-class]').forEach(cb => { cb.checked = toggle.checked; });
+      });
+    });
+    // снятый класс снимает и параллель — иначе сервер выдаст токены всей параллели
+    bulkForm.querySelectorAll('[data-bulk-class]').forEach(cb => {
+      cb.addEventListener('change', () => {
+        const toggle = cb.closest('[data-bulk-grade]').querySelector('[data-bulk-grade-toggle]');
+        if (toggle && !cb.checked) toggle.checked = false;
+      });
+    });
+
+    bulkForm.addEventListener('submit', (e) => {
+      if (!bulkForm.querySelector('[data-bulk-class]:checked, [data-bulk-grade-toggle]:checked')) {
+        e.preventDefault();
+        alert('Отметьте хотя бы один класс.');
+        return;
+      }
+      // длительность — та же, что настроена в форме «Создать токен»
+      [hSec, hMin, hHour, hDay, hWeek].forEach(h => {
+        if (h) bulkForm.elements[h.name].value = h.value;
+      });
+    });
+  }
+
   // ===== copy token button =====
   const copyBtn = document.getElementById('copy-token-btn');
   const tokenText = document.getElementById('token-text');
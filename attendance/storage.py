@@ -0,0 +1,36 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class HashedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Статика с хэшем содержимого в имени (app.3f9c1e.js) и заранее сжатыми копиями
+    .gz и .br (Brotli — если установлен пакет Brotli). WhiteNoise отдаёт файлы
+    с хэшем с Cache-Control: immutable на год — браузер не перепроверяет их
+    при каждом открытии страницы, а новая версия файла получает новое имя.
+    """
+
+    # Сторонние файлы лежат как в поставке и ссылаются на то, чего у нас нет
+    # (sourceMappingURL на .map, запасной шрифт .woff): такие ссылки оставляем как есть.
+    # В собственных файлах ссылка на отсутствующий файл — ошибка collectstatic.
+    vendored_prefixes = ('attendance/bootstrap/',)
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+        if not name.replace('\\', '/').startswith(self.vendored_prefixes):
+            return converter
+
+        def lenient_converter(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                return matchobj['matched']
+
+        return lenient_converter
+
+    def stored_name(self, name):
+        if not self.hashed_files and not self.exists(self.manifest_name):
+            # манифеста нет (collectstatic не запускали: тесты, локальная разработка,
+            # упавший collectstatic в entrypoint) — отдаём файл под исходным именем.
+            # При манифесте файл, которого в нём нет, — ошибка, а не ссылка без хэша
+            return name
+        return super().stored_name(name)
@@ -1,8 +1,40 @@
-from datetime import date
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from datetime import date, datetime, timedelta
+from unittest import mock, skipIf
 
-from django.test import SimpleTestCase, override_settings
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
-from attendance.services import school_calendar
+from attendance.middleware import AsyncWhiteNoiseMiddleware
+from attendance.services import (
+    absence_history, absence_state, class_directory, class_rosters, data_version, day_snapshots, live_feed,
+    missing_reports, orvi_watch, profiling, roles, scheduler, school_calendar, warmup,
+)
+from attendance.views.stats import SECTION_BUILDERS
+from attendance.services.benchmark_data import bench_class_name, percentile, seed_school
+from database.models import (
+    ClassRoom, Student, AttendanceSummary, AbsentStudent, StudentAbsenceState, StudentMonthlyAbsence,
+    OrviWindowStat, SubstituteAccessToken, DaySnapshot, JobLease, JobRun,
+)
 from attendance.utils import class_sort_key, parse_int_param
 
 
@@ -27,3 +59,1303 @@ class SchoolCalendarTests(SimpleTestCase):
         self.assertFalse(school_calendar.is_school_day(date(2026, 1, 3)))
         self.assertFalse(school_calendar.is_school_day(date(2026, 1, 1)))
         self.assertTrue(school_calendar.is_school_day(date(2026, 1, 6)))
+
+
+class BenchmarkDataTests(SimpleTestCase):
+    def test_bench_class_name_is_unique_and_short(self):
+        names = [bench_class_name(i) for i in range(300)]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual(names[:2], ["1А", "2А"])
+        self.assertTrue(all(len(n) <= 10 for n in names))
+
+    def test_percentile_interpolates(self):
+        samples = [4, 1, 3, 2]
+        self.assertEqual(percentile(samples, 0), 1)
+        self.assertEqual(percentile(samples, 50), 2.5)
+        self.assertEqual(percentile(samples, 100), 4)
+        self.assertIsNone(percentile([], 50))
+
+
+# Холодный старт воркера: django.setup() и загрузка URLconf (импорт всех view)
+STARTUP_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    'seconds': time.perf_counter() - started,
+    # ru_maxrss: на Linux — в килобайтах, на macOS — в байтах
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    'modules': sorted(sys.modules),
+}))
+"""
+
+
+@skipIf(sys.platform == 'win32', 'нет модуля resource')
+class StartupBudgetTests(SimpleTestCase):
+    """
+    Старт воркера в отдельном процессе под python -X importtime. Бюджеты с запасом
+    (локально ~0.4 с и ~45 МБ): тест ловит тяжёлый импорт на старте, а не шум машины.
+    """
+    STARTUP_SECONDS = 1.5
+    STARTUP_RSS_MB = 80
+    # импортируются только при первом использовании
+    LAZY_MODULES = ('openpyxl',)
+
+    def run_startup(self):
+        # модуль настроек — из окружения: под override_settings settings.SETTINGS_MODULE пуст
+        env = {**os.environ, 'PYTHONPATH': os.pathsep.join(p for p in sys.path if p)}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR, timeout=60,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+    @staticmethod
+    def slowest_imports(importtime_log, limit=10):
+        """Самые долгие модули по собственному времени импорта (мкс) из вывода -X importtime."""
+        rows = []
+        for line in importtime_log.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, _, name = line[len('import time:'):].split('|')
+            rows.append((int(self_us), name.strip()))
+        return sorted(rows, reverse=True)[:limit]
+
+    def test_cold_start_within_budget(self):
+        report, importtime_log = self.run_startup()
+        slowest = '\n'.join(f'{us / 1000:8.1f} мс  {name}' for us, name in self.slowest_imports(importtime_log))
+
+        self.assertEqual([m for m in self.LAZY_MODULES if m in report['modules']], [],
+                         'тяжёлые зависимости импортируются при старте')
+        self.assertLess(report['seconds'], self.STARTUP_SECONDS,
+                        f"старт {report['seconds']:.2f} с; самые долгие импорты:\n{slowest}")
+        self.assertLess(report['rss_mb'], self.STARTUP_RSS_MB,
+                        f"память после старта {report['rss_mb']:.0f} МБ; самые долгие импорты:\n{slowest}")
+
+
+class StaticAssetsTests(SimpleTestCase):
+    def test_unhashed_url_without_manifest(self):
+        # тесты и разработка без collectstatic: страницы открываются, ссылки без хэша
+        self.assertEqual(static('attendance/js/base.js'), '/static/attendance/js/base.js')
+
+    def test_collectstatic_hashes_and_compresses(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = static('attendance/js/base.js')
+            self.assertRegex(url, r'^/static/attendance/js/base\.[0-9a-f]{12}\.js$')
+            self.assertTrue(os.path.exists(os.path.join(root, url.removeprefix('/static/') + '.gz')))
+
+            middleware = AsyncWhiteNoiseMiddleware(lambda request: HttpResponse(status=404))
+            response = middleware(RequestFactory().get(url, HTTP_ACCEPT_ENCODING='gzip'))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            response.close()
+
+            # Bootstrap как в поставке: ссылки на .map и .woff, которых нет, остаются как есть
+            css = static('attendance/bootstrap/bootstrap.min.css').removeprefix('/static/')
+            with open(os.path.join(root, css), encoding='utf-8') as f:
+                self.assertIn('sourceMappingURL=bootstrap.min.css.map', f.read())
+            # с манифестом неизвестный файл — ошибка, а не ссылка без хэша под вечным кэшем
+            with self.assertRaises(ValueError):
+                static('attendance/js/missing.js')
+
+
+# Понедельник, не праздник: главная страница принимает данные
+QUERY_BUDGET_TODAY = date(2026, 3, 16)
+
+
+@override_settings(SCHOOL_HOLIDAYS=[], PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryBudgetTests(TestCase):
+    """
+    Число SQL-запросов каждой страницы не должно зависеть от размера школы.
+    Каждый сценарий прогоняется на маленькой школе, затем данные дозаливаются
+    и сценарий повторяется — количество запросов обязано совпасть
+    (или уложиться в BUDGETS, если рост допустим).
+    """
+    SMALL = {'classes': 2, 'students_per_class': 4, 'days': 2}
+    EXTRA = {'classes': 5, 'students_per_class': 12, 'days': 5}
+
+    # Сценарии, где рост запросов допустим, но ограничен сверху
+    BUDGETS = {}
+
+    def setUp(self):
+        patcher = mock.patch('django.utils.timezone.localdate', return_value=QUERY_BUDGET_TODAY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def seed(self, scale, seed):
+        seed_school(today=QUERY_BUDGET_TODAY, seed=seed, **scale)
+
+    def capture(self, request):
+        with CaptureQueriesContext(connection) as ctx:
+            response = request()
+        self.assertLess(response.status_code, 400, response.content[:500])
+        return ctx.captured_queries
+
+    def assertQueriesStable(self, name, scenario):
+        """
+        scenario(scale) готовит данные и возвращает функцию, выполняющую сам запрос;
+        считаются только запросы этой функции. Вызывается до и после дозаливки данных.
+        """
+        self.seed(self.SMALL, seed=1)
+        small = self.capture(scenario('small'))
+        self.seed(self.EXTRA, seed=2)
+        large = self.capture(scenario('large'))
+
+        budget = self.BUDGETS.get(name)
+        ok = len(large) <= budget if budget is not None else len(large) == len(small)
+        if not ok:
+            sql = '\n'.join(f'{i}. {q["sql"]}' for i, q in enumerate(large, start=1))
+            self.fail(
+                f'{name}: {len(small)} запросов на малой школе, {len(large)} на большой '
+                f'(бюджет: {budget if budget is not None else "без роста"}).\nSQL:\n{sql}'
+            )
+
+    def login(self, username):
+        user = User.objects.get(username=username)
+        self.client.force_login(user)
+        return user
+
+    def newest_class(self):
+        return ClassRoom.objects.order_by('-id').first()
+
+    def test_index_get(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            # сегодняшние сводки по всем классам, чтобы отрисовывались списки отсутствующих
+            for class_room in ClassRoom.objects.exclude(attendance_summaries__date=QUERY_BUDGET_TODAY):
+                summary = AttendanceSummary.objects.create(
+                    class_room=class_room, date=QUERY_BUDGET_TODAY,
+                    present_count_auto=class_room.student_count, unexcused_absent_count=1,
+                )
+                summary.absent_students.create(student=class_room.students.first())
+            return lambda: self.client.get(reverse('index'))
+
+        self.assertQueriesStable('index_get', scenario)
+
+    def test_index_post(self):
+        def scenario(scale):
+            class_room = self.newest_class()
+            self.login(class_room.teacher.username)
+            ids = ','.join(str(i) for i in class_room.students.values_list('id', flat=True))
+            return lambda: self.client.post(reverse('index'), {
+                'row_count': '1',
+                'class_0': str(class_room.id),
+                f'absent_students_{class_room.id}': ids,
+                f'all_absent_students_{class_room.id}': ids,
+            })
+
+        self.assertQueriesStable('index_post', scenario)
+
+    def test_index_post_edit(self):
+        def scenario(scale):
+            class_room = self.newest_class()
+            self.login(class_room.teacher.username)
+            AttendanceSummary.objects.create(
+                class_room=class_room, date=QUERY_BUDGET_TODAY, present_count_auto=class_room.student_count,
+            )
+            ids = ','.join(str(i) for i in class_room.students.values_list('id', flat=True))
+            return lambda: self.client.post(reverse('index'), {
+                'row_count': '1',
+                'edit_class': str(class_room.id),
+                'class_0': str(class_room.id),
+                f'orvi_students_{class_room.id}': ids,
+            })
+
+        self.assertQueriesStable('index_post_edit', scenario)
+
+    def test_statistics(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            return lambda: self.client.get(reverse('statistics'), {'month': 3, 'year': 2026})
+
+        self.assertQueriesStable('statistics', scenario)
+
+    def test_statistics_sections(self):
+        for name in ('visuals', 'privileged_types', 'daily', 'by_class', 'by_student'):
+            with self.subTest(section=name):
+                def scenario(scale):
+                    self.login('bench_deputy')
+                    cache.clear()
+                    url = reverse('statistics_section', args=[name])
+                    return lambda: self.client.get(url, {'month': 3, 'year': 2026})
+
+                self.assertQueriesStable(f'statistics_{name}', scenario)
+
+    def test_export_excel(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            day = AttendanceSummary.objects.latest('date').date
+            params = {'date': day.isoformat(), 'format': 'excel'}
+            return lambda: self.client.get(reverse('daily_statistics_export'), params)
+
+        self.assertQueriesStable('export_excel', scenario)
+
+    def test_export_word(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            day = AttendanceSummary.objects.latest('date').date
+            params = {'date': day.isoformat(), 'format': 'word'}
+            return lambda: self.client.get(reverse('daily_statistics_export'), params)
+
+        self.assertQueriesStable('export_word', scenario)
+
+    def test_manage_students_get(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            return lambda: self.client.get(reverse('manage_students'), {'show_inactive': '1'})
+
+        self.assertQueriesStable('manage_students_get', scenario)
+
+    def test_manage_students_bulk_actions(self):
+        actions = ('priv_on', 'priv_off', 'priv_svo', 'priv_multi', 'priv_low_income', 'priv_disabled',
+                   'delete', 'restore')
+        for action in actions:
+            with self.subTest(action=action):
+                def scenario(scale):
+                    self.login('bench_deputy')
+                    ids = [str(i) for i in Student.objects.values_list('id', flat=True)]
+                    return lambda: self.client.post(reverse('manage_students'), {'action': action, 'student_ids': ids})
+
+                self.assertQueriesStable(f'manage_students_{action}', scenario)
+
+    def test_admin_changelists(self):
+        for model in ('classroom', 'student', 'attendancesummary', 'absentstudent'):
+            with self.subTest(model=model):
+                def scenario(scale):
+                    admin_user, _ = User.objects.get_or_create(
+                        username='admin', defaults={'is_staff': True, 'is_superuser': True}
+                    )
+                    self.client.force_login(admin_user)
+                    url = reverse(f'admin:database_{model}_changelist')
+                    self.client.get(url)  # роли пользователя — в кэш, как у любого повторного запроса
+                    return lambda: self.client.get(url)
+
+                self.assertQueriesStable(f'admin_{model}', scenario)
+
+    def test_admin_bulk_deactivate(self):
+        def scenario(scale):
+            admin_user, _ = User.objects.get_or_create(
+                username='admin', defaults={'is_staff': True, 'is_superuser': True}
+            )
+            self.client.force_login(admin_user)
+            ids = [str(i) for i in Student.objects.values_list('id', flat=True)]
+            return lambda: self.client.post(
+                reverse('admin:database_student_changelist'), {'action': 'deactivate', '_selected_action': ids}
+            )
+
+        self.assertQueriesStable('admin_student_deactivate', scenario)
+        self.assertFalse(Student.objects.filter(is_active=True).exists())
+        self.assertFalse(ClassRoom.objects.exclude(student_count=0).exists())
+
+    def test_student_history(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            student = AbsentStudent.objects.values('student_id').annotate(n=Count('id')).order_by('-n').first()
+            url = reverse('student_history_api', args=[student['student_id']])
+            return lambda: self.client.get(url, {'from': '2025-09', 'limit': 2, 'cursor': '2026-03-01.0'})
+
+        self.assertQueriesStable('student_history', scenario)
+
+    def test_chronic_absences(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            return lambda: self.client.get(reverse('chronic_absences'), {'streak': 1, 'percent': 1})
+
+        self.assertQueriesStable('chronic_absences', scenario)
+
+    def test_orvi_feed(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            return lambda: self.client.get(reverse('orvi_feed'))
+
+        self.assertQueriesStable('orvi_feed', scenario)
+
+    def test_missing_reports_feed(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            cache.clear()
+            return lambda: self.client.get(reverse('missing_reports_feed'))
+
+        self.assertQueriesStable('missing_reports_feed', scenario)
+
+    def test_substitute_login(self):
+        def scenario(scale):
+            self.client.logout()
+            class_room = self.newest_class()
+            raw = SubstituteAccessToken.generate_raw_token()
+            SubstituteAccessToken.objects.create(
+                class_room=class_room, token_hash=SubstituteAccessToken.hash_token(raw),
+                expires_at=timezone.now() + timedelta(hours=1),
+            )
+            return lambda: self.client.post(reverse('substitute_login'), {'token': raw})
+
+        self.assertQueriesStable('substitute_login', scenario)
+
+    def test_substitute_tokens_page(self):
+        def scenario(scale):
+            deputy = self.login('bench_deputy')
+            SubstituteAccessToken.objects.bulk_create([
+                SubstituteAccessToken(
+                    class_room=class_room, issued_by=deputy,
+                    token_hash=SubstituteAccessToken.hash_token(f'{scale}-{class_room.id}'),
+                    expires_at=timezone.now() + timedelta(hours=1),
+                )
+                for class_room in ClassRoom.objects.all()
+            ])
+            return lambda: self.client.get(reverse('substitute_tokens'))
+
+        self.assertQueriesStable('substitute_tokens', scenario)
+
+    def test_substitute_bulk_issue(self):
+        def scenario(scale):
+            self.login('bench_deputy')
+            data = {'action': 'bulk_create', 'ttl_min': 45, 'output': 'csv',
+                    'class_ids': list(ClassRoom.objects.values_list('id', flat=True))}
+            return lambda: self.client.post(reverse('substitute_tokens'), data)
+
+        self.assertQueriesStable('substitute_bulk_issue', scenario)
+
+
+class RequestProfilerTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(PROFILING_DIR=tmp.name, PROFILING_MAX_REPORTS=2)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.staff = User.objects.create_user('admin', password='x', is_staff=True)
+
+    def test_profile_is_saved_only_for_staff(self):
+        user = User.objects.create_user('teacher', password='x')
+        self.client.force_login(user)
+        response = self.client.get(reverse('index'), {'_profile': '1'})
+        self.assertNotIn('X-Profile-Id', response)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('index'), {'_profile': '1'})
+        name = response['X-Profile-Id']
+        report = profiling.load_report(name)
+        self.assertEqual(report['view'], 'index')
+        self.assertGreater(report['query_count'], 0)
+        self.assertIn('cumulative', report['top_functions'])
+
+        page = self.client.get(reverse('profile_detail', args=[name]))
+        self.assertContains(page, name)
+
+    def test_reports_are_pruned(self):
+        self.client.force_login(self.staff)
+        for _ in range(3):
+            self.client.get(reverse('index'), {'_profile': '1'})
+        self.assertEqual(len(profiling.list_profiles()), 2)
+
+
+class AsyncViewsTests(TestCase):
+    """Страницы завуча и главная через ASGI-обработчик (async middleware + async views)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.deputy = User.objects.create_user('deputy', password='x')
+        cls.deputy.groups.add(Group.objects.create(name='Завуч'))
+        teacher = User.objects.create_user('teacher', password='x')
+        cls.class_room = ClassRoom.objects.create(name='1А', teacher=teacher)
+        cls.class_room.staff.add(cls.deputy)
+        Student.objects.create(full_name='Иванов Иван', class_room=cls.class_room)
+        AttendanceSummary.objects.create(class_room=cls.class_room, date=date(2026, 3, 16), present_count_auto=1)
+
+    async def test_deputy_pages(self):
+        await self.async_client.aforce_login(self.deputy)
+        response = await self.async_client.get(reverse('statistics'), {'month': 3, 'year': 2026})
+        self.assertContains(response, reverse('statistics_section', args=['by_class']))
+        response = await self.async_client.get(
+            reverse('statistics_section', args=['by_class']), {'month': 3, 'year': 2026}
+        )
+        self.assertContains(response, '1А')
+
+        response = await self.async_client.get(reverse('index'))
+        self.assertEqual(response.status_code, 200)
+
+        for fmt in ('excel', 'word'):
+            response = await self.async_client.get(
+                reverse('daily_statistics_export'), {'date': '2026-03-16', 'format': fmt}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('attachment', response['Content-Disposition'])
+
+    async def test_expired_substitute_token_logs_out(self):
+        token = await SubstituteAccessToken.objects.acreate(
+            class_room=self.class_room, token_hash='x' * 64, expires_at=timezone.now() - timedelta(minutes=1),
+        )
+        await self.async_client.aforce_login(self.deputy)
+        session = await self.async_client.asession()
+        await session.aset('substitute_token_id', token.id)
+        await session.asave()
+
+        response = await self.async_client.get(reverse('index'))
+        self.assertRedirects(response, reverse('substitute_login'), fetch_redirect_response=False)
+
+
+class DbPoolStatsTests(TestCase):
+    def test_stats_are_staff_only(self):
+        user = User.objects.create_user('teacher', password='x')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse('db_pool_stats')).status_code, 302)
+
+        user.is_staff = True
+        user.save(update_fields=['is_staff'])
+        data = self.client.get(reverse('db_pool_stats')).json()
+        self.assertEqual(data['alias'], 'default')
+        self.assertIn('pooled', data)
+
+
+class CachedSessionTests(TestCase):
+    def test_substitute_session_expires_with_token(self):
+        teacher = User.objects.create_user('teacher', password='x')
+        class_room = ClassRoom.objects.create(name='1А', teacher=teacher)
+        raw = SubstituteAccessToken.generate_raw_token()
+        SubstituteAccessToken.objects.create(
+            class_room=class_room, token_hash=SubstituteAccessToken.hash_token(raw),
+            expires_at=timezone.now() + timedelta(minutes=10),
+        )
+
+        response = self.client.post(reverse('substitute_login'), {'token': raw})
+        self.assertRedirects(response, reverse('index'), fetch_redirect_response=False)
+
+        session = self.client.session
+        self.assertTrue(session['substitute_as'])
+        self.assertLessEqual(session.get_expiry_age(), 600)
+        row = Session.objects.get(session_key=session.session_key)
+        self.assertLessEqual(row.expire_date, timezone.now() + timedelta(minutes=10))
+
+    def test_sweep_sessions_removes_expired_rows(self):
+        Session.objects.create(session_key='old', session_data='', expire_date=timezone.now() - timedelta(days=1))
+        Session.objects.create(session_key='new', session_data='', expire_date=timezone.now() + timedelta(days=1))
+        call_command('sweep_sessions', batch_size=1, stdout=open(os.devnull, 'w'))
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['new'])
+
+
+@override_settings(SCHOOL_HOLIDAYS=[])
+class StudentHistoryTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user('teacher', password='x')
+        self.class_room = ClassRoom.objects.create(name='7А', teacher=self.teacher)
+        self.class_room.staff.add(self.teacher)
+        self.student = Student.objects.create(full_name='Петров Пётр', class_room=self.class_room)
+        days = [date(2026, 2, 26), date(2026, 2, 27), date(2026, 3, 2), date(2026, 3, 3), date(2026, 3, 4)]
+        for day in days:
+            summary = AttendanceSummary.objects.create(class_room=self.class_room, date=day, present_count_auto=1)
+            AbsentStudent.objects.create(
+                attendance=summary, student=self.student,
+                reason=AbsentStudent.Reason.ORVI if day.day == 3 else AbsentStudent.Reason.UNEXCUSED,
+            )
+        call_command('rebuild_absence_counters', stdout=open(os.devnull, 'w'))
+        self.client.force_login(self.teacher)
+
+    def get_page(self, **params):
+        params = {'from': '2026-02', 'to': '2026-03', 'limit': 2, **params}
+        response = self.client.get(reverse('student_history_api', args=[self.student.id]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pagination_keeps_running_count(self):
+        pages = [self.get_page()]
+        while pages[-1]['next_cursor']:
+            pages.append(self.get_page(cursor=pages[-1]['next_cursor']))
+
+        items = [item for page in pages for item in page['items']]
+        self.assertEqual([i['running_count'] for i in items], [1, 2, 3, 4, 5])
+        self.assertEqual(items[-1]['date'], '2026-03-04')
+        self.assertEqual(pages[0]['total'], 5)
+        self.assertEqual([m['total'] for m in pages[0]['months']], [2, 3])
+
+    def test_reason_filter(self):
+        page = self.get_page(reason=AbsentStudent.Reason.ORVI)
+        self.assertEqual(page['total'], 1)
+        self.assertEqual([i['date'] for i in page['items']], ['2026-03-03'])
+
+    def test_counters_follow_dashboard_save(self):
+        today = date(2026, 3, 16)
+        with mock.patch('django.utils.timezone.localdate', return_value=today):
+            response = self.client.post(reverse('index'), {
+                'row_count': '1',
+                'class_0': str(self.class_room.id),
+                f'absent_students_{self.class_room.id}': str(self.student.id),
+                f'all_absent_students_{self.class_room.id}': str(self.student.id),
+            })
+        self.assertEqual(response.status_code, 302)
+        counter = StudentMonthlyAbsence.objects.get(
+            student=self.student, month=date(2026, 3, 1), reason=AbsentStudent.Reason.UNEXCUSED
+        )
+        self.assertEqual(counter.absence_count, 3)
+
+    def test_teacher_cannot_see_other_class(self):
+        other = Student.objects.create(full_name='Чужой', class_room=ClassRoom.objects.create(name='8Б'))
+        response = self.client.get(reverse('student_history', args=[other.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_renders(self):
+        response = self.client.get(reverse('student_history', args=[self.student.id]), {'from': '2026-02'})
+        self.assertContains(response, 'Петров Пётр')
+
+
+@override_settings(SCHOOL_HOLIDAYS=[(2, 23)])
+class AbsenceStateTests(TestCase):
+    UNEXCUSED = AbsentStudent.Reason.UNEXCUSED
+    ORVI = AbsentStudent.Reason.ORVI
+
+    def setUp(self):
+        self.class_room = ClassRoom.objects.create(name='9А')
+        self.student = Student.objects.create(full_name='Сидоров Сидор', class_room=self.class_room)
+        self.other = Student.objects.create(full_name='Орлов Олег', class_room=self.class_room)
+
+    def save_day(self, day, reasons):
+        summary, _ = AttendanceSummary.objects.get_or_create(
+            class_room=self.class_room, date=day, defaults={'present_count_auto': 2}
+        )
+        summary.absent_students.all().delete()
+        for student, reason in reasons.items():
+            AbsentStudent.objects.create(attendance=summary, student=student, reason=reason)
+        absence_state.apply_day(self.class_room.id, day, {s.id: r for s, r in reasons.items()})
+
+    def state(self, student=None):
+        return StudentAbsenceState.objects.get(student=student or self.student)
+
+    def test_streak_spans_weekend_and_holiday(self):
+        # пт 20.02, выходные, пн 23.02 — праздник, вт 24.02
+        self.save_day(date(2026, 2, 19), {self.student: self.UNEXCUSED})
+        self.save_day(date(2026, 2, 20), {self.student: self.UNEXCUSED})
+        self.save_day(date(2026, 2, 24), {self.student: self.UNEXCUSED})
+        state = self.state()
+        self.assertEqual((state.streak_reason, state.streak_days), (self.UNEXCUSED, 3))
+        self.assertEqual(state.streak_start, date(2026, 2, 19))
+        self.assertEqual(self.state(self.other).streak_days, 0)
+
+    def test_reason_change_and_missing_report_reset_streak(self):
+        self.save_day(date(2026, 3, 2), {self.student: self.UNEXCUSED})
+        self.save_day(date(2026, 3, 3), {self.student: self.ORVI})
+        self.assertEqual((self.state().streak_reason, self.state().streak_days), (self.ORVI, 1))
+        # 04.03 класс не отчитался — серия начинается заново
+        self.save_day(date(2026, 3, 5), {self.student: self.ORVI})
+        self.assertEqual((self.state().streak_days, self.state().streak_start), (1, date(2026, 3, 5)))
+
+    def test_resaving_same_day_replaces_its_contribution(self):
+        self.save_day(date(2026, 3, 2), {self.student: self.UNEXCUSED})
+        self.save_day(date(2026, 3, 3), {self.student: self.UNEXCUSED})
+        self.save_day(date(2026, 3, 3), {})
+        self.save_day(date(2026, 3, 3), {self.student: self.UNEXCUSED})
+        state = self.state()
+        self.assertEqual(state.streak_days, 2)
+        self.assertEqual((state.month_days, state.month_missed), (2, 2))
+        self.assertEqual(state.last_absent_date, date(2026, 3, 3))
+
+    def test_rebuild_matches_incremental(self):
+        days = [date(2026, 2, 26), date(2026, 2, 27), date(2026, 3, 2), date(2026, 3, 3)]
+        for i, day in enumerate(days):
+            self.save_day(day, {self.student: self.UNEXCUSED} if i else {self.other: self.ORVI})
+        fields = absence_state.STATE_FIELDS
+        incremental = list(StudentAbsenceState.objects.order_by('student_id').values(*fields))
+        absence_state.rebuild_all()
+        self.assertEqual(list(StudentAbsenceState.objects.order_by('student_id').values(*fields)), incremental)
+
+    def test_report_lists_students_over_threshold(self):
+        for day in (date(2026, 3, 2), date(2026, 3, 3), date(2026, 3, 4)):
+            self.save_day(day, {self.student: self.UNEXCUSED})
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.client.force_login(deputy)
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2026, 3, 4)):
+            response = self.client.get(reverse('chronic_absences'), {'streak': 3})
+        self.assertContains(response, 'Сидоров Сидор')
+        self.assertNotContains(response, 'Орлов Олег')
+
+    def test_report_skips_stale_streak(self):
+        # серия закончилась месяц назад, а класс с тех пор не отчитывался — в отчёт не попадает
+        for day in (date(2026, 2, 2), date(2026, 2, 3), date(2026, 2, 4)):
+            self.save_day(day, {self.student: self.UNEXCUSED})
+        self.assertEqual(list(absence_state.chronic_absences(date(2026, 2, 6), 3, 100)), [self.state()])
+        self.assertEqual(list(absence_state.chronic_absences(date(2026, 3, 4), 3, 100)), [])
+
+
+@override_settings(SCHOOL_HOLIDAYS=[], ORVI_WINDOW_DAYS=[3, 5], ORVI_QUARANTINE_PERCENT=20)
+class OrviWatchTests(TestCase):
+    def setUp(self):
+        self.class_a = ClassRoom.objects.create(name='2А')
+        self.class_b = ClassRoom.objects.create(name='2Б')
+        self.other_grade = ClassRoom.objects.create(name='3А')
+        # пн 02.03 – пт 06.03: в 2А растёт ОРВИ, в 2Б — один заболевший
+        for day, orvi_a in zip(range(2, 7), (0, 1, 3, 6, 8)):
+            self.report(self.class_a, date(2026, 3, day), orvi_a)
+            self.report(self.class_b, date(2026, 3, day), 1)
+
+    def report(self, class_room, day, orvi):
+        AttendanceSummary.objects.create(
+            class_room=class_room, date=day, present_count_auto=20, orvi_count=orvi,
+        )
+
+    def window(self, key, size):
+        return OrviWindowStat.objects.get(key=key, window_days=size)
+
+    def test_last_window(self):
+        days = [date(2026, 3, day) for day in range(2, 7)]
+        per_day = {days[0]: (9, 20), days[2]: (1, 20), days[4]: (3, 20)}
+        window = orvi_watch.last_window(days, per_day, 3)
+        self.assertEqual(
+            (window['first_day'], window['days_reported'], window['orvi_count'], window['enrolled_count']),
+            (days[2], 2, 4, 40),
+        )
+
+    def test_update_for_class_and_grade(self):
+        orvi_watch.update_for_class(self.class_a, date(2026, 3, 6))
+
+        three = self.window(f'class:{self.class_a.id}', 3)
+        self.assertEqual((three.first_day, three.orvi_count, three.enrolled_count), (date(2026, 3, 4), 17, 60))
+        self.assertEqual(self.window(f'class:{self.class_a.id}', 5).orvi_count, 18)
+
+        grade = self.window('grade:2', 3)
+        self.assertEqual((grade.orvi_count, grade.enrolled_count), (20, 120))
+        self.assertFalse(OrviWindowStat.objects.filter(key='grade:3').exists())
+
+    def test_window_skips_weekend(self):
+        self.report(self.class_a, date(2026, 3, 9), 10)
+        orvi_watch.update_for_class(self.class_a, date(2026, 3, 9))
+        three = self.window(f'class:{self.class_a.id}', 3)
+        self.assertEqual((three.first_day, three.orvi_count), (date(2026, 3, 5), 24))
+
+    def test_rebuild_matches_incremental(self):
+        orvi_watch.update_for_class(self.class_a, date(2026, 3, 6))
+        orvi_watch.update_for_class(self.class_b, date(2026, 3, 6))
+        fields = ('key', 'window_days', 'first_day', 'orvi_count', 'enrolled_count', 'days_reported')
+        incremental = set(OrviWindowStat.objects.filter(key__in=[
+            f'class:{self.class_a.id}', f'class:{self.class_b.id}', 'grade:2',
+        ]).values_list(*fields))
+        orvi_watch.rebuild_all()
+        rebuilt = set(OrviWindowStat.objects.filter(key__in=[
+            f'class:{self.class_a.id}', f'class:{self.class_b.id}', 'grade:2',
+        ]).values_list(*fields))
+        self.assertEqual(rebuilt, incremental)
+
+    def test_feed_and_widget_highlight_class_over_threshold(self):
+        orvi_watch.update_for_class(self.class_a, date(2026, 3, 6))
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.class_a.staff.add(deputy)
+        self.client.force_login(deputy)
+
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2026, 3, 6)):
+            feed = self.client.get(reverse('orvi_feed'), {'alerts': '1'}).json()
+            page = self.client.get(reverse('index'))
+
+        self.assertEqual([(i['label'], i['window_days']) for i in feed['items']], [('2А', 3)])
+        self.assertTrue(feed['items'][0]['over_threshold'])
+        self.assertContains(page, 'ОРВИ выше порога карантина')
+
+
+class StatisticsSectionTests(TestCase):
+    def setUp(self):
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.class_room = ClassRoom.objects.create(name='1А')
+        self.class_room.staff.add(deputy)
+        Student.objects.create(full_name='Иванов Иван', class_room=self.class_room)
+        self.summary = AttendanceSummary.objects.create(
+            class_room=self.class_room, date=date(2026, 3, 16), present_count_auto=1, present_count_reported=1,
+        )
+        self.client.force_login(deputy)
+
+    def get(self, name, **headers):
+        return self.client.get(reverse('statistics_section', args=[name]), {'month': 3, 'year': 2026}, **headers)
+
+    def test_page_is_a_shell(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('statistics'), {'month': 3, 'year': 2026})
+        self.assertFalse([q for q in ctx.captured_queries if 'attendancesummary' in q['sql']])
+        for name in ('visuals', 'privileged_types', 'daily', 'by_class', 'by_student'):
+            self.assertContains(response, reverse('statistics_section', args=[name]))
+
+    def test_sections_render(self):
+        charts = self.get('visuals').json()
+        self.assertEqual(charts['heatmap_rows'], [{'class_name': '1А', 'report_count': 1}])
+        self.assertEqual(charts['heatmap'][0]['name'], '1А')
+        for name in ('privileged_types', 'daily', 'by_class'):
+            self.assertContains(self.get(name), '1А')
+        self.assertEqual(self.get('unknown').status_code, 404)
+
+    def test_conditional_get_and_version_change(self):
+        response = self.get('by_class')
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        self.assertEqual(self.get('by_class', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.get('by_class', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+
+        self.summary.unexcused_absent_count = 1
+        self.summary.save()
+        response = self.get('by_class', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_gzip(self):
+        response = self.get('visuals', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+
+@override_settings(SCHOOL_HOLIDAYS=[])
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('django.utils.timezone.localdate', return_value=QUERY_BUDGET_TODAY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.class_room = ClassRoom.objects.create(name='1А')
+        self.class_room.staff.add(deputy)
+        self.student = Student.objects.create(full_name='Иванов Иван', class_room=self.class_room)
+        # окно редактирования уже закрыто
+        self.summary = AttendanceSummary.objects.create(
+            class_room=self.class_room, date=QUERY_BUDGET_TODAY, present_count_auto=1,
+            created_at=timezone.now() - timedelta(hours=2),
+        )
+        self.client.force_login(deputy)
+
+    def test_version_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            version = async_to_sync(data_version.scope_version)(QUERY_BUDGET_TODAY, QUERY_BUDGET_TODAY)
+        self.assertEqual((version.values['summaries'], version.values['students']), (1, 1))
+
+    def test_absence_edit_changes_version(self):
+        def tag():
+            return async_to_sync(data_version.scope_version)(QUERY_BUDGET_TODAY, QUERY_BUDGET_TODAY).tag
+
+        before = tag()
+        absent = AbsentStudent.objects.create(attendance=self.summary, student=self.student)
+        created = tag()
+        self.assertNotEqual(created, before)
+
+        AbsentStudent.objects.filter(id=absent.id).update(updated_at=timezone.now() - timedelta(days=1))
+        stale = tag()
+        absent.reason = AbsentStudent.Reason.ORVI
+        absent.save()
+        self.assertNotEqual(tag(), stale)
+
+        absent.delete()
+        self.assertEqual(tag(), before)
+
+    def test_index_not_modified_until_roster_changes(self):
+        self.client.get(reverse('index'))  # первый ответ выдаёт CSRF-cookie, она входит в ETag
+        etag = self.client.get(reverse('index'))['ETag']
+        self.assertEqual(self.client.get(reverse('index'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.student.full_name = 'Иванов Пётр'
+        self.student.save()
+        response = self.client.get(reverse('index'), HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Иванов Пётр')
+
+    def test_index_is_rebuilt_while_edit_window_is_open(self):
+        AttendanceSummary.objects.filter(id=self.summary.id).update(created_at=timezone.now())
+        response = self.client.get(reverse('index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_export_not_modified(self):
+        params = {'date': QUERY_BUDGET_TODAY.isoformat(), 'format': 'excel'}
+        etag = self.client.get(reverse('daily_statistics_export'), params)['ETag']
+        response = self.client.get(reverse('daily_statistics_export'), params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.summary.orvi_count = 1
+        self.summary.save()
+        response = self.client.get(reverse('daily_statistics_export'), params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class MissingReportsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user('teacher', first_name='Анна', last_name='Петрова')
+        self.reported = ClassRoom.objects.create(name='1А')
+        self.missing = ClassRoom.objects.create(name='1Б', teacher=self.teacher)
+        AttendanceSummary.objects.create(class_room=self.reported, date=QUERY_BUDGET_TODAY, present_count_auto=1)
+
+    def test_board_lists_classes_without_summary(self):
+        board = missing_reports.board(QUERY_BUDGET_TODAY)
+        self.assertEqual((board['total'], board['reported']), (2, 1))
+        self.assertEqual(board['missing'], [
+            {'id': self.missing.id, 'name': '1Б', 'teacher': 'Петрова Анна', 'student_count': 0},
+        ])
+        with self.assertNumQueries(0):
+            missing_reports.board(QUERY_BUDGET_TODAY)
+
+    def test_save_invalidates_board(self):
+        missing_reports.board(QUERY_BUDGET_TODAY)
+        with self.captureOnCommitCallbacks(execute=True):
+            AttendanceSummary.objects.create(class_room=self.missing, date=QUERY_BUDGET_TODAY, present_count_auto=1)
+        self.assertEqual(missing_reports.board(QUERY_BUDGET_TODAY)['missing'], [])
+
+    def test_feed_and_page(self):
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.client.force_login(deputy)
+
+        with mock.patch('django.utils.timezone.localdate', return_value=QUERY_BUDGET_TODAY):
+            feed = self.client.get(reverse('missing_reports_feed'), {'date': QUERY_BUDGET_TODAY.isoformat()}).json()
+            self.assertEqual([row['name'] for row in feed['missing']], ['1Б'])
+            page = self.client.get(reverse('missing_reports'), {'date': QUERY_BUDGET_TODAY.isoformat()})
+            self.assertContains(page, 'Петрова Анна')
+
+            # даты вне диапазона табло прижимаются к нему — кэш не растёт от произвольных дат
+            feed = self.client.get(reverse('missing_reports_feed'), {'date': '2099-01-01'}).json()
+            self.assertEqual(feed['date'], QUERY_BUDGET_TODAY.isoformat())
+            feed = self.client.get(reverse('missing_reports_feed'), {'date': '2000-01-01'}).json()
+            earliest = QUERY_BUDGET_TODAY - timedelta(days=missing_reports.HISTORY_DAYS)
+            self.assertEqual(feed['date'], earliest.isoformat())
+
+
+class LiveFeedTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(LIVE_FEED_DIR=tmp.name, LIVE_FEED_MAX_SECONDS=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.class_room = ClassRoom.objects.create(name='1А')
+
+    def test_publish_and_read_back(self):
+        live_feed.publish({'class_name': '1А'})
+        live_feed.publish({'class_name': '1Б'})
+        today = timezone.localdate()
+        events, position = live_feed.read_events(today, 0)
+        self.assertEqual([e['class_name'] for _, e in events], ['1А', '1Б'])
+        self.assertEqual(live_feed.read_events(today, position), ([], position))
+
+        first_offset = events[0][0]
+        self.assertEqual(live_feed.parse_event_id(live_feed.event_id(today, first_offset)), (today, first_offset))
+        self.assertIsNone(live_feed.parse_event_id('мусор'))
+        events, _ = live_feed.read_events(today, first_offset)
+        self.assertEqual([e['class_name'] for _, e in events], ['1Б'])
+
+    def test_summary_save_is_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            AttendanceSummary.objects.create(class_room=self.class_room, date=QUERY_BUDGET_TODAY, present_count_auto=3)
+        events, _ = live_feed.read_events(timezone.localdate(), 0)
+        self.assertEqual(len(events), 1)
+        event = events[0][1]
+        self.assertEqual(
+            (event['type'], event['class_name'], event['date']), ('created', '1А', QUERY_BUDGET_TODAY.isoformat())
+        )
+        self.assertEqual(event['counts']['present_auto'], 3)
+
+    def test_summary_event_does_not_load_relations(self):
+        author = User.objects.create_user('teacher', first_name='Анна', last_name='Петрова')
+        summary = AttendanceSummary.objects.create(
+            class_room=self.class_room, date=QUERY_BUDGET_TODAY, present_count_auto=3, created_by=author,
+        )
+        class_directory.classes()
+        fresh = AttendanceSummary.objects.get(id=summary.id)
+        with self.assertNumQueries(0):
+            event = live_feed.summary_event(fresh, False)
+        self.assertEqual((event['class_name'], event['saved_by']), ('1А', ''))
+
+        fresh.created_by = author
+        self.assertEqual(live_feed.summary_event(fresh, False)['saved_by'], 'Анна Петрова')
+
+    async def test_stream_replays_after_last_event_id(self):
+        deputy = await User.objects.acreate(username='deputy')
+        await deputy.groups.aadd(await Group.objects.acreate(name='Завуч'))
+        await self.async_client.aforce_login(deputy)
+        live_feed.publish({'class_name': '1А'})
+        live_feed.publish({'class_name': '1Б'})
+        first_offset = live_feed.read_events(timezone.localdate(), 0)[0][0][0]
+
+        response = await self.async_client.get(
+            reverse('live_feed'), headers={'Last-Event-ID': live_feed.event_id(timezone.localdate(), first_offset)}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertIn('event: attendance', body)
+        self.assertIn('"1Б"', body)
+        self.assertNotIn('"1А"', body)
+
+
+class ClassDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user('teacher', first_name='Анна', last_name='Петрова')
+        self.class_10a = ClassRoom.objects.create(name='10А')
+        self.class_2b = ClassRoom.objects.create(name='2Б', teacher=self.teacher)
+        self.student = Student.objects.create(full_name='Иванов Иван', class_room=self.class_2b)
+
+    def test_sorted_records_served_from_process(self):
+        records = class_directory.classes()
+        self.assertEqual([r.name for r in records], ['2Б', '10А'])
+        self.assertEqual((records[0].teacher_name, records[0].student_count), ('Анна Петрова', 1))
+        with self.assertNumQueries(0):
+            self.assertIs(class_directory.classes(), records)
+        self.assertEqual([r.name for r in class_directory.subset([self.class_10a.id])], ['10А'])
+
+    def test_signals_bump_version(self):
+        class_directory.classes()
+        ClassRoom.objects.create(name='1А')
+        self.assertEqual([r.name for r in class_directory.classes()], ['1А', '2Б', '10А'])
+
+        self.student.is_active = False
+        self.student.save(update_fields=['is_active'])
+        self.assertEqual(class_directory.subset([self.class_2b.id])[0].student_count, 0)
+
+        self.teacher.last_login = timezone.now()
+        self.teacher.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            class_directory.classes()
+
+    def test_bulk_deactivation_updates_counts(self):
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.client.force_login(deputy)
+        class_directory.classes()
+
+        self.client.post(reverse('manage_students'), {'action': 'delete', 'student_ids': [self.student.id]})
+        self.class_2b.refresh_from_db()
+        self.assertEqual(self.class_2b.student_count, 0)
+        self.assertEqual(class_directory.subset([self.class_2b.id])[0].student_count, 0)
+
+
+class WarmCachesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.deputy = User.objects.create_user('deputy')
+        self.deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.class_room = ClassRoom.objects.create(name='1А')
+        self.student = Student.objects.create(full_name='Иванов Иван', class_room=self.class_room)
+
+    def test_roles_cached_and_reset_on_group_change(self):
+        self.assertEqual(roles.user_roles(self.deputy), {'Завуч'})
+        with self.assertNumQueries(0):
+            roles.user_roles(self.deputy)
+        self.deputy.groups.add(Group.objects.create(name='Учитель'))
+        self.assertEqual(roles.user_roles(self.deputy), {'Завуч', 'Учитель'})
+
+    def test_roster_reset_on_student_change(self):
+        rosters = async_to_sync(class_rosters.arosters)([self.class_room.id])
+        self.assertEqual([s.full_name for s in rosters[self.class_room.id]['students']], ['Иванов Иван'])
+        self.student.full_name = 'Иванов Пётр'
+        self.student.save(update_fields=['full_name'])
+        rosters = async_to_sync(class_rosters.arosters)([self.class_room.id])
+        self.assertEqual([s.full_name for s in rosters[self.class_room.id]['students']], ['Иванов Пётр'])
+
+    def test_connection_stage_skipped_without_pool(self):
+        # без пула соединение потока прогрева закрылось бы впустую
+        self.assertEqual(warmup.warm_connection(), 'без пула — пропущено')
+
+    def test_command_fills_shared_caches(self):
+        out = StringIO()
+        call_command('warm_caches', stdout=out)
+        self.assertIn('пропущено', out.getvalue())
+        self.assertIn('Роли сотрудников', out.getvalue())
+        self.assertIn('Кэши прогреты', out.getvalue())
+
+        with self.assertNumQueries(0):
+            self.assertIn('Завуч', roles.user_roles(self.deputy))
+            async_to_sync(class_rosters.arosters)([self.class_room.id])
+            missing_reports.board(timezone.localdate())
+        today = timezone.localdate()
+        version = async_to_sync(data_version.month_version)(today.year, today.month)
+        self.assertIsNotNone(cache.get(f'statistics:by_class:{today.year}-{today.month:02d}:{version.tag}'))
+
+
+class SubstituteTokenSweepTests(TestCase):
+    def setUp(self):
+        self.class_room = ClassRoom.objects.create(name='1А')
+        now = timezone.now()
+        self.active = self.make('active', expires_at=now + timedelta(hours=1))
+        self.fresh_expired = self.make('fresh', expires_at=now - timedelta(days=1))
+        self.old_expired = self.make('old', expires_at=now - timedelta(days=40))
+        self.old_revoked = self.make(
+            'revoked', expires_at=now + timedelta(hours=1), revoked_at=now - timedelta(days=40)
+        )
+
+    def make(self, raw, **fields):
+        return SubstituteAccessToken.objects.create(
+            class_room=self.class_room, token_hash=SubstituteAccessToken.hash_token(raw), **fields
+        )
+
+    def test_queryset_matches_property(self):
+        active_ids = set(SubstituteAccessToken.objects.active().values_list('id', flat=True))
+        self.assertEqual(active_ids, {t.id for t in SubstituteAccessToken.objects.all() if t.is_active})
+        self.assertEqual(SubstituteAccessToken.objects.inactive().count(), 3)
+
+    def test_sweeper_keeps_recent_tokens(self):
+        out = StringIO()
+        call_command('sweep_substitute_tokens', '--dry-run', stdout=out)
+        self.assertIn('К удалению токенов: 2', out.getvalue())
+        call_command('sweep_substitute_tokens', batch_size=1, days=30, stdout=out)
+        self.assertEqual(
+            set(SubstituteAccessToken.objects.values_list('id', flat=True)), {self.active.id, self.fresh_expired.id}
+        )
+
+    def test_page_lists_active_and_expired_separately(self):
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.client.force_login(deputy)
+        response = self.client.get(reverse('substitute_tokens'))
+        self.assertEqual(list(response.context['active_page']), [self.active])
+        self.assertEqual(response.context['inactive_page'].paginator.count, 3)
+
+
+class SubstituteBulkIssueTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create_user('teacher', first_name='Анна', last_name='Петрова')
+        self.a5 = ClassRoom.objects.create(name='5А', teacher=teacher)
+        self.b5 = ClassRoom.objects.create(name='5Б', teacher=teacher)
+        self.no_teacher = ClassRoom.objects.create(name='5В')
+        self.a6 = ClassRoom.objects.create(name='6А', teacher=teacher)
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.client.force_login(deputy)
+
+    def issue(self, **data):
+        return self.client.post(reverse('substitute_tokens'), {'action': 'bulk_create', 'ttl_hour': 2, **data})
+
+    def test_grade_and_classes_to_csv(self):
+        response = self.issue(grades=['5'], class_ids=[self.a6.id], output='csv')
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        rows = list(csv.reader(response.content.decode('utf-8-sig').splitlines(), delimiter=';'))[1:]
+        self.assertEqual([row[0] for row in rows], ['5А', '5Б', '6А', '5В'])
+        self.assertEqual(rows[0][1], 'Анна Петрова')
+        self.assertEqual((rows[-1][2], rows[-1][4]), ('', 'Токен не выдан: нет активного классного руководителя'))
+        rows = rows[:-1]
+
+        tokens = SubstituteAccessToken.objects.all()
+        self.assertEqual(
+            {t.token_hash for t in tokens}, {SubstituteAccessToken.hash_token(row[2]) for row in rows}
+        )
+        self.assertFalse(tokens.filter(class_room=self.no_teacher).exists())
+        self.assertTrue(all(t.ttl_seconds == 7200 for t in tokens))
+
+    def test_printable_sheet(self):
+        response = self.issue(class_ids=[self.a5.id, self.no_teacher.id])
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertEqual([item['class_name'] for item in response.context['issued']], ['5А'])
+        self.assertEqual(response.context['skipped'], ['5В'])
+        self.assertContains(response, response.context['issued'][0]['token'])
+        self.assertContains(response, 'нет активного классного руководителя')
+        self.assertNotIn('created_token', self.client.session)
+
+    def test_token_never_starts_with_formula_char(self):
+        with mock.patch('secrets.token_urlsafe', side_effect=['-Abc', '-Def', 'Ghi']):
+            self.assertEqual(SubstituteAccessToken.generate_raw_token(), 'Ghi')
+
+    def test_requires_classes_and_valid_ttl(self):
+        self.assertRedirects(self.issue(), reverse('substitute_tokens'), fetch_redirect_response=False)
+        response = self.client.post(reverse('substitute_tokens'), {
+            'action': 'bulk_create', 'class_ids': [self.a5.id], 'ttl_week': 3,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(SubstituteAccessToken.objects.exists())
+
+
+class DaySnapshotTests(TestCase):
+    DAY = date(2026, 3, 16)
+
+    def setUp(self):
+        cache.clear()
+        deputy = User.objects.create_user('deputy')
+        deputy.groups.add(Group.objects.create(name='Завуч'))
+        self.client.force_login(deputy)
+        created_at = timezone.make_aware(datetime(2026, 3, 16, 9, 0))
+        for name, absent in (('1А', ['Иванов Иван', 'Петров Пётр']), ('1Б', [])):
+            class_room = ClassRoom.objects.create(name=name)
+            summary = AttendanceSummary.objects.create(
+                class_room=class_room, date=self.DAY, present_count_auto=3, present_count_reported=3 - len(absent),
+                unexcused_absent_count=len(absent), created_at=created_at,
+            )
+            for full_name in absent:
+                student = Student.objects.create(full_name=full_name, class_room=class_room)
+                AbsentStudent.objects.create(attendance=summary, student=student)
+        ClassRoom.objects.create(name='2А')
+        self.summary = summary
+
+    def close(self):
+        return day_snapshots.close_days(now=timezone.make_aware(datetime(2026, 3, 17, 8, 0)))
+
+    def sections(self):
+        names = ('visuals', 'daily', 'by_class', 'by_student')
+        return {name: async_to_sync(SECTION_BUILDERS[name])(2026, 3) for name in names}
+
+    def test_closes_only_past_days_after_edit_window(self):
+        still_editable = timezone.make_aware(datetime(2026, 3, 16, 9, 20))
+        self.assertEqual(day_snapshots.closable_days(now=still_editable), [])
+        self.assertEqual(self.close(), [self.DAY])
+        self.assertEqual(self.close(), [])
+
+        data = day_snapshots.decode(DaySnapshot.objects.get(date=self.DAY).payload)
+        self.assertEqual([name for _, name in data['classes']], ['1А', '1Б', '2А'])
+        self.assertEqual([r['class_name'] for r in data['reports']], ['1А', '1Б'])
+        self.assertEqual([a[1] for a in data['reports'][0]['absent']], ['Иванов Иван', 'Петров Пётр'])
+
+    def test_reports_read_snapshot_unchanged(self):
+        live = self.sections()
+        params = {'date': self.DAY.isoformat(), 'format': 'word'}
+        live_export = self.client.get(reverse('daily_statistics_export'), params).content
+        self.close()
+
+        self.assertEqual(self.sections(), live)
+        self.assertIn('Иванов Иван, Петров Пётр', live['daily'][1])
+
+        self.assertEqual(self.client.get(reverse('daily_statistics_export'), params).content, live_export)
+        # готовый файл закрытого дня — из кэша: запросы только за пользователем и снимком
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('daily_statistics_export'), params)
+        self.assertEqual(response.content, live_export)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        # сжатые данные дня при попадании в кэш не читаются
+        self.assertFalse([q for q in ctx.captured_queries if 'payload' in q['sql']])
+
+    def test_edit_of_closed_day_drops_snapshot(self):
+        self.close()
+        self.summary.present_count_reported = 2
+        self.summary.save()
+        self.assertFalse(DaySnapshot.objects.exists())
+        self.assertEqual(self.close(), [self.DAY])
+
+
+@override_settings(SCHOOL_HOLIDAYS=[], PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AuditQueriesTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('django.utils.timezone.localdate', return_value=QUERY_BUDGET_TODAY)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        seed_school(today=QUERY_BUDGET_TODAY, classes=2, students_per_class=4, days=2)
+
+    def audit(self, **options):
+        out = StringIO()
+        call_command('audit_queries', stdout=out, **options)
+        return out.getvalue()
+
+    def test_report_is_stable_and_rolled_back(self):
+        summaries = AttendanceSummary.objects.count()
+        tokens = SubstituteAccessToken.objects.count()
+        report = self.audit(large_table_rows=1)
+
+        self.assertEqual(self.audit(large_table_rows=1), report)
+        for scenario in ('index_post', 'statistics:daily', 'export_excel', 'substitute_index'):
+            self.assertIn(scenario, report)
+        # на крошечных таблицах порог в одну строку отмечает любое чтение без индекса
+        self.assertIn('!! SEQ SCAN', report)
+        self.assertEqual(AttendanceSummary.objects.count(), summaries)
+        self.assertEqual(SubstituteAccessToken.objects.count(), tokens)
+
+    def test_fail_on_flags(self):
+        self.assertIn('с отметками 0', self.audit(fail_on_flags=True))
+        with self.assertRaisesMessage(CommandError, 'Запросов с отметками'):
+            self.audit(large_table_rows=1, fail_on_flags=True)
+
+
+class CronScheduleTests(SimpleTestCase):
+    def next_after(self, expr, moment):
+        return scheduler.CronSchedule(expr).next_after(timezone.make_aware(moment))
+
+    def test_next_after(self):
+        friday = datetime(2026, 3, 13, 7, 45)
+        self.assertEqual(self.next_after('30 7 * * 1-5', friday), timezone.make_aware(datetime(2026, 3, 16, 7, 30)))
+        self.assertEqual(self.next_after('*/20 * * * *', friday), timezone.make_aware(datetime(2026, 3, 13, 8, 0)))
+        self.assertEqual(self.next_after('0 4 * * 7', friday), timezone.make_aware(datetime(2026, 3, 15, 4, 0)))
+        # день месяца и день недели вместе — подходит любой
+        self.assertEqual(self.next_after('0 0 20 * 0', friday), timezone.make_aware(datetime(2026, 3, 15, 0, 0)))
+        self.assertIsNone(self.next_after('0 0 31 2 *', friday))
+
+    def test_invalid_expressions(self):
+        for expr in ('* * * *', '60 * * * *', '5-1 * * * *', '*/0 * * * *', 'x * * * *'):
+            with self.subTest(expr=expr), self.assertRaises(ValueError):
+                scheduler.CronSchedule(expr)
+
+
+@override_settings(
+    SCHEDULER_JOBS={
+        'prune': {'schedule': '* * * * *', 'command': ['prune_cache']},
+        'broken': {'schedule': '0 0 31 2 *', 'command': ['prune_cache', '--alias', 'missing']},
+        'disabled': {'schedule': '', 'command': ['prune_cache']},
+    },
+)
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.jobs = scheduler.jobs()
+        scheduler.ensure_leases(self.jobs)
+
+    def test_each_slot_runs_once_across_processes(self):
+        job = self.jobs['prune']
+        slot = timezone.now().replace(second=0, microsecond=0)
+        self.assertTrue(scheduler.acquire(job, 'a', slot))
+        self.assertFalse(scheduler.acquire(job, 'b', slot + timedelta(minutes=1)))  # аренда занята
+        scheduler.release(job, 'a')
+        self.assertFalse(scheduler.acquire(job, 'b', slot))  # этот запуск уже взят
+        self.assertTrue(scheduler.acquire(job, 'b', slot + timedelta(minutes=1)))
+
+    def test_takeover_fails_abandoned_runs(self):
+        job = self.jobs['prune']
+        crashed = JobRun.objects.create(job='prune', holder='a')
+        JobLease.objects.filter(name='prune').update(holder='a', locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(scheduler.acquire(job, 'b'))
+        crashed.refresh_from_db()
+        self.assertEqual((crashed.status, crashed.error), (JobRun.Status.FAILED, scheduler.ABANDONED_ERROR))
+        self.assertIsNotNone(crashed.finished_at)
+
+    def test_once_runs_due_jobs_and_records_them(self):
+        call_command('run_scheduler', once=True, stdout=StringIO())
+        self.assertNotIn('disabled', self.jobs)
+        run = JobRun.objects.get()
+        self.assertEqual((run.job, run.status), ('prune', JobRun.Status.OK))
+        self.assertIsNotNone(run.duration_ms)
+        lease = JobLease.objects.get(name='prune')
+        self.assertEqual(lease.last_slot, run.slot)
+        self.assertIsNone(lease.locked_until)
+
+    def test_failure_is_recorded_and_old_runs_pruned(self):
+        JobRun.objects.create(job='broken', status=JobRun.Status.OK, started_at=timezone.now() - timedelta(days=365))
+        with self.assertLogs('attendance.services.scheduler', 'ERROR'):
+            with self.assertRaisesMessage(CommandError, 'missing'):
+                call_command('run_scheduler', run='broken', stdout=StringIO())
+        run = JobRun.objects.get(job='broken', status=JobRun.Status.FAILED)
+        self.assertIn('CommandError', run.error)
+        self.assertIsNone(JobLease.objects.get(name='broken').locked_until)
+
+        scheduler.prune_runs(self.jobs['broken'])
+        self.assertEqual(list(JobRun.objects.values_list('status', flat=True)), [JobRun.Status.FAILED])
+
+    @override_settings(SCHEDULER_JOBS={'bad': {'schedule': '0 25 * * *', 'command': ['prune_cache']}})
+    def test_invalid_schedule_is_reported(self):
+        with self.assertRaisesMessage(CommandError, "SCHEDULER_JOBS['bad']"):
+            call_command('run_scheduler', list=True, stdout=StringIO())
+
+
+class VerifyAggregatesTests(TestCase):
+    def setUp(self):
+        self.class_room = ClassRoom.objects.create(name='1А')
+        student = Student.objects.create(full_name='Иванов Иван', class_room=self.class_room)
+        summary = AttendanceSummary.objects.create(
+            class_room=self.class_room, date=date(2026, 3, 2), present_count_auto=1,
+        )
+        AbsentStudent.objects.create(attendance=summary, student=student)
+        absence_history.rebuild_all()
+
+    def test_reports_and_fixes_drift(self):
+        self.assertIn('Итоги сходятся', self.verify())
+        ClassRoom.objects.filter(id=self.class_room.id).update(student_count=5)
+        StudentMonthlyAbsence.objects.update(absence_count=7)
+
+        with self.assertRaisesMessage(CommandError, 'численность классов: 1; счётчики пропусков: 1'):
+            self.verify()
+        self.verify(fix=True)
+        self.assertIn('Итоги сходятся', self.verify())
+
+    def verify(self, **options):
+        out = StringIO()
+        call_command('verify_aggregates', stdout=out, **options)
+        return out.getvalue()
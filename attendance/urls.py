@@ -4,7 +4,15 @@ from . import views
 urlpatterns = [
     path('', views.index, name='index'),
     path('statistics/', views.statistics, name='statistics'),
+    path('statistics/section/<str:name>/', views.statistics_section, name='statistics_section'),
+    path('statistics/chronic/', views.chronic_absences, name='chronic_absences'),
+    path('statistics/orvi.json', views.orvi_feed, name='orvi_feed'),
+    path('statistics/missing/', views.missing_reports_page, name='missing_reports'),
+    path('statistics/missing.json', views.missing_reports_feed, name='missing_reports_feed'),
+    path('statistics/live/', views.live_feed_stream, name='live_feed'),
     path('statistics/export-day/', views.export_daily_statistics, name='daily_statistics_export'),
     path('students/', views.manage_students, name='manage_students'),
+    path('students/<int:student_id>/history/', views.student_history, name='student_history'),
+    path('students/<int:student_id>/history.json', views.student_history_api, name='student_history_api'),
     path('substitute-tokens/', views.substitute_tokens, name='substitute_tokens'),
 ]
@@ -23,6 +23,12 @@ def class_sort_key(value):
     return (number, suffix)
 
 
+def class_grade(value):
+    """Номер параллели по имени класса («5А» -> 5) или None."""
+    number = class_sort_key(value)[0]
+    return number if number != float('inf') else None
+
+
 def parse_int_param(value, default, min_value=None, max_value=None):
     try:
         if value is None or value == "":
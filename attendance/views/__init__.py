@@ -1,6 +1,11 @@
 from .auth import UserLoginView, UserLogoutView, deny_substitute_access, is_deputy
 from .dashboard import index
-from .stats import statistics
+from .stats import statistics, statistics_section
+from .chronic import chronic_absences
+from .orvi import orvi_feed
+from .missing import missing_reports_page, missing_reports_feed
+from .live import live_feed_stream
 from .export import export_daily_statistics
 from .students import manage_students
-from .substitute import substitute_login, substitute_tokens
\ No newline at end of file
+from .substitute import substitute_login, substitute_tokens
+from .history import student_history, student_history_api
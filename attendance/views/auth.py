@@ -1,13 +1,26 @@
 from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
 from django.contrib import messages
 from django.contrib.auth.views import LoginView, LogoutView
 from django.shortcuts import redirect
 
+from ..services import roles
+
 
 def deny_substitute_access(view_func):
     """
     Запрещает доступ к view, если пользователь вошёл по токену замены.
     """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def _awrapped(request, *args, **kwargs):
+            if await request.session.aget('substitute_as'):
+                messages.error(request, 'Доступ ограничен: вы вошли как заменяющий по токену.')
+                return redirect('index')
+            return await view_func(request, *args, **kwargs)
+        return _awrapped
+
     @wraps(view_func)
     def _wrapped(request, *args, **kwargs):
         if request.session.get('substitute_as'):
@@ -17,7 +30,7 @@ def deny_substitute_access(view_func):
     return _wrapped
 
 def is_deputy(user):
-    return user.is_authenticated and user.groups.filter(name='Завуч').exists()
+    return roles.DEPUTY in roles.user_roles(user)
 
 class UserLoginView(LoginView):
     template_name = 'attendance/login.html'
@@ -0,0 +1,38 @@
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.shortcuts import render
+from django.utils import timezone
+
+from database.models import AbsentStudent
+from ..services import absence_state
+from ..utils import class_sort_key, parse_int_param
+from .auth import deny_substitute_access, is_deputy
+
+
+@login_required
+@deny_substitute_access
+@user_passes_test(is_deputy)
+def chronic_absences(request):
+    """Ученики с сериями пропусков без уважительной причины и высокой долей пропусков за месяц."""
+    today = timezone.localdate()
+    default_streak, default_percent = absence_state.thresholds()
+    streak_days = parse_int_param(request.GET.get('streak'), default_streak, min_value=1, max_value=60)
+    month_percent = parse_int_param(request.GET.get('percent'), default_percent, min_value=1, max_value=100)
+
+    rows = []
+    for state in absence_state.chronic_absences(today, streak_days, month_percent):
+        rows.append({
+            'state': state,
+            'student': state.student,
+            'by_streak': state.streak_reason == AbsentStudent.Reason.UNEXCUSED and state.streak_days >= streak_days,
+            'month_percent': round(state.month_missed_ratio * 100),
+        })
+    rows.sort(key=lambda r: (r['student'].full_name or '').lower())
+    rows.sort(key=lambda r: class_sort_key(r['student'].class_room))
+
+    return render(request, 'attendance/chronic_absences.html', {
+        'rows': rows,
+        'streak_days': streak_days,
+        'month_percent': month_percent,
+        'min_month_days': absence_state.MIN_MONTH_DAYS,
+        'today': today,
+    })
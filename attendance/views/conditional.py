@@ -0,0 +1,45 @@
+import hashlib
+from pathlib import Path
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def _release():
+    """Метка выката: после обновления шаблонов старые ETag не должны совпасть."""
+    root = Path(__file__).resolve().parent.parent / 'templates'
+    return max((path.stat().st_mtime_ns for path in root.rglob('*.html')), default=0)
+
+
+RELEASE = _release()
+
+
+def validators(request, user, version, *parts):
+    """
+    ETag и Last-Modified ответа по версии данных. В ETag также входят пользователь,
+    CSRF-cookie (страница из кэша браузера должна отправлять рабочие формы)
+    и всё, от чего ещё зависит ответ (parts). user передаётся явно: в async-views
+    это результат await request.auser().
+    """
+    seed = (RELEASE, version.tag, user.pk, request.META.get('CSRF_COOKIE'), *parts)
+    etag = quote_etag(hashlib.sha1('|'.join(map(str, seed)).encode()).hexdigest()[:20])
+    last_modified = int(version.last_modified.timestamp()) if version.last_modified else None
+    return etag, last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """304, если валидаторы клиента совпали, иначе None — ответ нужно строить."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # данные конкретного пользователя: браузер хранит ответ у себя, но каждый раз сверяет ETag
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Cookie'])
+    return response
@@ -1,43 +1,56 @@
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import datetime
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum, Q
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db.models import Sum
 from django.shortcuts import render, redirect
 from django.utils import timezone
 
-from database.models import ClassRoom, Student, AttendanceSummary, AbsentStudent
+from database.models import ClassRoom, Student, AttendanceSummary, AbsentStudent, OrviWindowStat
 from school_attendance.settings import DEBUG
 from ..utils import class_sort_key
 from ..services import school_calendar  # ✅ Import calendar service
+from ..services import absence_history, absence_state, class_rosters, data_version, day_snapshots, orvi_watch, roles
+from .conditional import not_modified, set_validators, validators
+
+
+def _resolve_today(request):
+    if request.GET.get('test_date') and DEBUG:
+        try:
+            return datetime.strptime(request.GET['test_date'], '%Y-%m-%d').date()
+        except ValueError:
+            return timezone.localdate()
+    return timezone.localdate()
 
 
 @login_required
-def index(request):
+async def index(request):
     """
     Главная страница:
     - показывает таблицу только по тем классам, которые закреплены за пользователем
     - обработка POST запроса на сохранение посещаемости
     - ⛔️ Блокирует сохранение в выходные/праздники
+
+    GET — асинхронный (async ORM), чтобы под ASGI чтение не держало поток воркера.
+    POST — синхронный в отдельном потоке: это короткая запись, её логика остаётся прежней.
     """
-    if request.GET.get('test_date') and DEBUG:
-        try:
-            today = datetime.strptime(request.GET['test_date'], '%Y-%m-%d').date()
-        except ValueError:
-            today = timezone.localdate()
-    else:
-        today = timezone.localdate()
+    today = _resolve_today(request)
 
     # ✅ Проверка: рабочий ли сегодня день?
     is_work_day = school_calendar.is_school_day(today)
 
-    user = request.user
-    user_is_deputy = user.groups.filter(name='Завуч').exists()
-    user_is_teacher = user.groups.filter(name='Учитель').exists()
+    if request.method == 'POST':
+        return await sync_to_async(_save_attendance)(request, today, is_work_day)
+
+    user = await request.auser()
+    user_roles = await roles.auser_roles(user)
+    user_is_deputy = roles.DEPUTY in user_roles
+    user_is_teacher = roles.TEACHER in user_roles
 
-    is_substitute = bool(request.session.get('substitute_as'))
-    substitute_class_id = request.session.get('substitute_class_id')
+    is_substitute = bool(await request.session.aget('substitute_as'))
+    substitute_class_id = await request.session.aget('substitute_class_id')
 
     if is_substitute and substitute_class_id:
         classes = ClassRoom.objects.filter(id=substitute_class_id)
@@ -49,16 +62,41 @@ def index(request):
         else:
             classes = ClassRoom.objects.none()
 
-    classes = sorted(classes, key=class_sort_key)
-
-    summaries = AttendanceSummary.objects.filter(
+    classes = sorted([c async for c in classes], key=class_sort_key)
+    class_ids = [c.id for c in classes]
+
+    # Условный GET: версия данных страницы одним запросом. Пока открыто окно
+    # редактирования, страница меняется со временем, а сообщения в cookie надо
+    # показать — в этих случаях страница всегда собирается заново.
+    today_summaries = AttendanceSummary.objects.filter(date=today, class_room_id__in=class_ids)
+    extra = {'summaries_created': (today_summaries, 'created_at')}
+    if user_is_deputy:
+        extra['orvi_changed'] = (OrviWindowStat.objects.all(), 'updated_at')
+    version = await data_version.scope_version(today, today, class_ids=class_ids, extra=extra)
+    last_created = version.values['summaries_created']
+    conditional = not request.COOKIES.get(CookieStorage.cookie_name) and not (
+        last_created and timezone.now() <= last_created + day_snapshots.EDIT_WINDOW
+    )
+    if conditional:
+        etag, last_modified = validators(
+            request, user, version, today, is_work_day, user_is_deputy, user_is_teacher, substitute_class_id,
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+    # виджет ОРВИ: готовые окна из таблицы, история не пересчитывается
+    orvi_alerts = [w async for w in orvi_watch.alerts(today)] if user_is_deputy else []
+
+    summaries_qs = AttendanceSummary.objects.filter(
         date=today,
         class_room__in=classes
-    ).select_related('class_room')
+    ).select_related('class_room').prefetch_related('absent_students__student')
+    summaries = [s async for s in summaries_qs]
 
     summary_by_class = {s.class_room_id: s for s in summaries}
 
-    totals_saved = summaries.aggregate(
+    totals_saved = await summaries_qs.aaggregate(
         total_present_reported=Sum('present_count_reported'),
         total_unexcused=Sum('unexcused_absent_count'),
         total_orvi=Sum('orvi_count'),
@@ -80,7 +118,7 @@ def index(request):
     can_edit_by_class = {}
 
     for s in summaries:
-        deadline = s.created_at + timedelta(minutes=30)
+        deadline = s.created_at + day_snapshots.EDIT_WINDOW
         edit_deadline_by_class[s.class_room_id] = deadline
         can_edit_by_class[s.class_room_id] = now_dt <= deadline
 
@@ -92,214 +130,18 @@ def index(request):
                 messages.error(request, 'Окно редактирования (30 минут) уже закрыто.')
                 edit_class_id = None
 
-    # ===== helpers (внутренние функции оставлены здесь для локальности) =====
-    def parse_int(value):
-        try:
-            return int((value or '').strip() or 0)
-        except (TypeError, ValueError):
-            return 0
-
-    def parse_ids(raw):
-        ids = set()
-        if not raw: return ids
-        for part in raw.split(','):
-            part = part.strip()
-            if not part: continue
-            try:
-                ids.add(int(part))
-            except ValueError:
-                continue
-        return ids
-
-    def validate_no_duplicates_between_reasons(class_room, unexcused_ids, orvi_ids, other_ids, family_ids):
-        intersections = [
-            ('Неуважительные + ОРВИ', unexcused_ids & orvi_ids),
-            ('Неуважительные + Другие заболевания', unexcused_ids & other_ids),
-            ('Неуважительные + Семейные', unexcused_ids & family_ids),
-            ('ОРВИ + Другие заболевания', orvi_ids & other_ids),
-            ('ОРВИ + Семейные', orvi_ids & family_ids),
-            ('Другие заболевания + Семейные', other_ids & family_ids),
-        ]
-        bad = [(name, ids) for name, ids in intersections if ids]
-        if bad:
-            example_ids = sorted(list(bad[0][1]))[:3]
-            messages.error(
-                request,
-                f'Класс {class_room.name}: один и тот же ученик не может быть в двух причинах. '
-                f'Найдены повторы ({bad[0][0]}), пример ID: {example_ids}'
-            )
-            return False
-        return True
-
-    # ===== POST Handling =====
-    if request.method == 'POST':
-        # ✅ Блокировка сохранения в выходной/праздничный день
-        if not is_work_day:
-            messages.error(request, 'Сегодня выходной или праздничный день. Заполнение посещаемости закрыто.')
-            return redirect('index')
-
-        row_count = int(request.POST.get('row_count', 0))
-        edit_class_post = request.POST.get('edit_class')
-        edit_class_post = int(edit_class_post) if (edit_class_post and str(edit_class_post).isdigit()) else None
-
-        for i in range(row_count):
-            class_id = request.POST.get(f'class_{i}')
-            if not class_id or not str(class_id).isdigit(): continue
-            class_id = int(class_id)
-
-            if edit_class_post and class_id != edit_class_post: continue
-
-            try:
-                class_room = ClassRoom.objects.get(id=class_id)
-            except ClassRoom.DoesNotExist:
-                continue
-
-            reported_present_raw = request.POST.get(f'reported_present_{i}', '').strip()
-            unexcused_absent_raw = request.POST.get(f'unexcused_absent_{i}', '').strip()
-            orvi_raw = request.POST.get(f'orvi_{i}', '').strip()
-            other_disease_raw = request.POST.get(f'other_disease_{i}', '').strip()
-            family_raw = request.POST.get(f'family_{i}', '').strip()
-
-            unexcused_students_raw = request.POST.get(f'absent_students_{class_id}', '').strip()
-            all_absent_students_raw = request.POST.get(f'all_absent_students_{class_id}', '').strip()
-            orvi_students_raw = request.POST.get(f'orvi_students_{class_id}', '').strip()
-            other_students_raw = request.POST.get(f'other_students_{class_id}', '').strip()
-            family_students_raw = request.POST.get(f'family_students_{class_id}', '').strip()
-
-            if not any([reported_present_raw, unexcused_absent_raw, orvi_raw, other_disease_raw, family_raw,
-                        unexcused_students_raw, all_absent_students_raw, orvi_students_raw, other_students_raw,
-                        family_students_raw]):
-                continue
-
-            reported_present = parse_int(reported_present_raw)
-            orvi_count = parse_int(orvi_raw)
-            other_disease_count = parse_int(other_disease_raw)
-            family_reason_count = parse_int(family_raw)
-
-            unexcused_ids = parse_ids(unexcused_students_raw)
-            orvi_ids = parse_ids(orvi_students_raw)
-            other_ids = parse_ids(other_students_raw)
-            family_ids = parse_ids(family_students_raw)
-            all_absent_ids = parse_ids(all_absent_students_raw)
-
-            if not validate_no_duplicates_between_reasons(class_room, unexcused_ids, orvi_ids, other_ids, family_ids):
-                return redirect('index')
-
-            unexcused_absent = len(unexcused_ids)
-
-            # Валидация чисел
-            if unexcused_absent_raw and parse_int(unexcused_absent_raw) != unexcused_absent:
-                messages.error(request, f'Класс {class_room.name}: число неуважительных не совпадает со списком.')
-                return redirect('index')
-            if orvi_raw and parse_int(orvi_raw) != len(orvi_ids):
-                messages.error(request, f'Класс {class_room.name}: число ОРВИ не совпадает со списком.')
-                return redirect('index')
-            if other_disease_raw and parse_int(other_disease_raw) != len(other_ids):
-                messages.error(request, f'Класс {class_room.name}: число "Другие" не совпадает со списком.')
-                return redirect('index')
-            if family_raw and parse_int(family_raw) != len(family_ids):
-                messages.error(request, f'Класс {class_room.name}: число "Семейные" не совпадает со списком.')
-                return redirect('index')
-
-            reason_ids_union = unexcused_ids | orvi_ids | other_ids | family_ids
-            if reason_ids_union:
-                if not all_absent_ids:
-                    all_absent_ids = set(reason_ids_union)
-                elif not reason_ids_union.issubset(all_absent_ids):
-                    messages.error(request, f'Класс {class_room.name}: общий список должен включать все причины.')
-                    return redirect('index')
-
-            if not reason_ids_union and all_absent_ids:
-                unexcused_ids = set(all_absent_ids)
-                unexcused_absent = len(unexcused_ids)
-
-            present_auto = class_room.student_count
-            total_absent_count = unexcused_absent + orvi_count + other_disease_count + family_reason_count
-
-            if present_auto and total_absent_count > present_auto:
-                messages.error(request, f'Класс {class_room.name}: отсутствующих больше, чем учеников.')
-                return redirect('index')
-
-            present_reported = max(0, present_auto - total_absent_count) if present_auto else reported_present
-
-            # Сохранение
-            existing = AttendanceSummary.objects.filter(class_room=class_room, date=today).first()
-            if existing:
-                if timezone.now() > (existing.created_at + timedelta(minutes=30)):
-                    messages.error(request, f'Класс {class_room.name}: окно редактирования закрыто.')
-                    return redirect('index')
-
-                existing.present_count_auto = present_auto
-                existing.present_count_reported = present_reported
-                existing.unexcused_absent_count = unexcused_absent
-                existing.orvi_count = orvi_count
-                existing.other_disease_count = other_disease_count
-                existing.family_reason_count = family_reason_count
-                existing.created_by = user
-                existing.save(update_fields=[
-                    'present_count_auto',
-                    'present_count_reported',
-                    'unexcused_absent_count',
-                    'orvi_count',
-                    'other_disease_count',
-                    'family_reason_count',
-                    'created_by',
-                ])
-
-                AbsentStudent.objects.filter(attendance=existing).delete()
-                summary_obj = existing
-            else:
-                summary_obj = AttendanceSummary.objects.create(
-                    class_room=class_room, date=today, present_count_auto=present_auto,
-                    present_count_reported=present_reported, unexcused_absent_count=unexcused_absent,
-                    orvi_count=orvi_count, other_disease_count=other_disease_count,
-                    family_reason_count=family_reason_count, created_by=user
-                )
-
-            if not all_absent_ids:
-                all_absent_ids = reason_ids_union
-
-            for sid in all_absent_ids:
-                try:
-                    student = Student.objects.get(id=sid, class_room=class_room)
-                except Student.DoesNotExist:
-                    continue
-
-                reason = AbsentStudent.Reason.UNEXCUSED
-                if sid in orvi_ids:
-                    reason = AbsentStudent.Reason.ORVI
-                elif sid in other_ids:
-                    reason = AbsentStudent.Reason.OTHER_DISEASE
-                elif sid in family_ids:
-                    reason = AbsentStudent.Reason.FAMILY
-
-                AbsentStudent.objects.create(attendance=summary_obj, student=student, reason=reason)
-
-        messages.success(request, 'Изменения сохранены.' if edit_class_post else 'Данные за сегодня сохранены.')
-        return redirect('index')
-
     # ===== GET Context Prep =====
-    students_by_class = {c.id: list(c.students.filter(is_active=True).order_by('full_name')) for c in classes}
-
-    privileged_qs = Student.objects.filter(class_room__in=classes, is_active=True).filter(
-        Q(privilege_types__isnull=False) | Q(is_privileged=True)
-    ).distinct().select_related('class_room').order_by('class_room__name', 'full_name')
-
-    priv_students_by_class = defaultdict(list)
-    privileged_total_by_class = defaultdict(int)
-    for s in privileged_qs:
-        priv_students_by_class[s.class_room_id].append(s)
-        privileged_total_by_class[s.class_room_id] += 1
-
-    absent_priv_qs = AbsentStudent.objects.filter(
-        attendance__date=today, attendance__class_room__in=classes, student__is_active=True
-    ).filter(
-        Q(student__privilege_types__isnull=False) | Q(student__is_privileged=True)
-    ).distinct().values_list('attendance__class_room_id', 'student_id')
-
-    absent_priv_ids_by_class = defaultdict(set)
-    for cid, sid in absent_priv_qs:
-        absent_priv_ids_by_class[cid].add(sid)
+    # составы классов (ученики и льготники) — из общего кэша, от дня не зависят
+    rosters = await class_rosters.arosters(class_ids)
+    students_by_class = {cid: roster['students'] for cid, roster in rosters.items()}
+    priv_students_by_class = {cid: roster['privileged'] for cid, roster in rosters.items()}
+    privileged_total_by_class = {cid: len(roster['privileged']) for cid, roster in rosters.items()}
+
+    # отсутствующие за сегодня уже подгружены вместе со сводками
+    absent_priv_ids_by_class = {}
+    for s in summaries:
+        priv_ids = {p.id for p in priv_students_by_class.get(s.class_room_id, ())}
+        absent_priv_ids_by_class[s.class_room_id] = {a.student_id for a in s.absent_students.all()} & priv_ids
 
     privileged_present_by_class = {}
     privileged_present_count_by_class = {}
@@ -322,7 +164,7 @@ def index(request):
     all_absent_ids_by_class = {}
 
     for s in summaries:
-        absents = list(s.absent_students.select_related('student').all())
+        absents = list(s.absent_students.all())
         unexcused_ids_by_class[s.class_room_id] = ','.join(
             str(a.student_id) for a in absents if a.reason == AbsentStudent.Reason.UNEXCUSED)
         orvi_ids_by_class[s.class_room_id] = ','.join(
@@ -351,7 +193,7 @@ def index(request):
         'other_ids_by_class': other_ids_by_class,
         'family_ids_by_class': family_ids_by_class,
         'all_absent_ids_by_class': all_absent_ids_by_class,
-        'privileged_total_by_class': dict(privileged_total_by_class),
+        'privileged_total_by_class': privileged_total_by_class,
         'privileged_present_by_class': privileged_present_by_class,
         'privileged_present_count_by_class': dict(privileged_present_count_by_class),
         'total_privileged_all': total_privileged_all,
@@ -359,5 +201,221 @@ def index(request):
         'is_deputy': user_is_deputy,
         'is_teacher': user_is_teacher,
         'is_substitute': is_substitute,
+        'orvi_alerts': orvi_alerts,
+        'orvi_threshold_percent': round(orvi_watch.threshold() * 100),
     }
-    return render(request, 'attendance/index.html', context)
+    # рендер шаблона синхронный (context processors и шаблонные теги) — выполняем в потоке
+    response = await sync_to_async(render)(request, 'attendance/index.html', context)
+    if conditional:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def _save_attendance(request, today, is_work_day):
+    """Обработка POST главной страницы: сохранение посещаемости по классам."""
+    user = request.user
+
+    # ===== helpers (внутренние функции оставлены здесь для локальности) =====
+    def parse_int(value):
+        try:
+            return int((value or '').strip() or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def parse_ids(raw):
+        ids = set()
+        if not raw: return ids
+        for part in raw.split(','):
+            part = part.strip()
+            if not part: continue
+            try:
+                ids.add(int(part))
+            except ValueError:
+                continue
+        return ids
+
+    def validate_no_duplicates_between_reasons(class_room, unexcused_ids, orvi_ids, other_ids, family_ids):
+        intersections = [
+            ('Неуважительные + ОРВИ', unexcused_ids & orvi_ids),
+            ('Неуважительные + Другие заболевания', unexcused_ids & other_ids),
+            ('Неуважительные + Семейные', unexcused_ids & family_ids),
+            ('ОРВИ + Другие заболевания', orvi_ids & other_ids),
+            ('ОРВИ + Семейные', orvi_ids & family_ids),
+            ('Другие заболевания + Семейные', other_ids & family_ids),
+        ]
+        bad = [(name, ids) for name, ids in intersections if ids]
+        if bad:
+            example_ids = sorted(list(bad[0][1]))[:3]
+            messages.error(
+                request,
+                f'Класс {class_room.name}: один и тот же ученик не может быть в двух причинах. '
+                f'Найдены повторы ({bad[0][0]}), пример ID: {example_ids}'
+            )
+            return False
+        return True
+
+    # ===== POST Handling =====
+    # ✅ Блокировка сохранения в выходной/праздничный день
+    if not is_work_day:
+        messages.error(request, 'Сегодня выходной или праздничный день. Заполнение посещаемости закрыто.')
+        return redirect('index')
+
+    row_count = int(request.POST.get('row_count', 0))
+    edit_class_post = request.POST.get('edit_class')
+    edit_class_post = int(edit_class_post) if (edit_class_post and str(edit_class_post).isdigit()) else None
+
+    # все классы формы одним запросом, а не ClassRoom.get() на каждую строку
+    posted_class_ids = {
+        int(v) for v in (request.POST.get(f'class_{i}') for i in range(row_count)) if v and str(v).isdigit()
+    }
+    class_rooms_by_id = ClassRoom.objects.in_bulk(posted_class_ids)
+
+    for i in range(row_count):
+        class_id = request.POST.get(f'class_{i}')
+        if not class_id or not str(class_id).isdigit(): continue
+        class_id = int(class_id)
+
+        if edit_class_post and class_id != edit_class_post: continue
+
+        class_room = class_rooms_by_id.get(class_id)
+        if class_room is None:
+            continue
+
+        reported_present_raw = request.POST.get(f'reported_present_{i}', '').strip()
+        unexcused_absent_raw = request.POST.get(f'unexcused_absent_{i}', '').strip()
+        orvi_raw = request.POST.get(f'orvi_{i}', '').strip()
+        other_disease_raw = request.POST.get(f'other_disease_{i}', '').strip()
+        family_raw = request.POST.get(f'family_{i}', '').strip()
+
+        unexcused_students_raw = request.POST.get(f'absent_students_{class_id}', '').strip()
+        all_absent_students_raw = request.POST.get(f'all_absent_students_{class_id}', '').strip()
+        orvi_students_raw = request.POST.get(f'orvi_students_{class_id}', '').strip()
+        other_students_raw = request.POST.get(f'other_students_{class_id}', '').strip()
+        family_students_raw = request.POST.get(f'family_students_{class_id}', '').strip()
+
+        if not any([reported_present_raw, unexcused_absent_raw, orvi_raw, other_disease_raw, family_raw,
+                    unexcused_students_raw, all_absent_students_raw, orvi_students_raw, other_students_raw,
+                    family_students_raw]):
+            continue
+
+        reported_present = parse_int(reported_present_raw)
+        orvi_count = parse_int(orvi_raw)
+        other_disease_count = parse_int(other_disease_raw)
+        family_reason_count = parse_int(family_raw)
+
+        unexcused_ids = parse_ids(unexcused_students_raw)
+        orvi_ids = parse_ids(orvi_students_raw)
+        other_ids = parse_ids(other_students_raw)
+        family_ids = parse_ids(family_students_raw)
+        all_absent_ids = parse_ids(all_absent_students_raw)
+
+        if not validate_no_duplicates_between_reasons(class_room, unexcused_ids, orvi_ids, other_ids, family_ids):
+            return redirect('index')
+
+        unexcused_absent = len(unexcused_ids)
+
+        # Валидация чисел
+        if unexcused_absent_raw and parse_int(unexcused_absent_raw) != unexcused_absent:
+            messages.error(request, f'Класс {class_room.name}: число неуважительных не совпадает со списком.')
+            return redirect('index')
+        if orvi_raw and parse_int(orvi_raw) != len(orvi_ids):
+            messages.error(request, f'Класс {class_room.name}: число ОРВИ не совпадает со списком.')
+            return redirect('index')
+        if other_disease_raw and parse_int(other_disease_raw) != len(other_ids):
+            messages.error(request, f'Класс {class_room.name}: число "Другие" не совпадает со списком.')
+            return redirect('index')
+        if family_raw and parse_int(family_raw) != len(family_ids):
+            messages.error(request, f'Класс {class_room.name}: число "Семейные" не совпадает со списком.')
+            return redirect('index')
+
+        reason_ids_union = unexcused_ids | orvi_ids | other_ids | family_ids
+        if reason_ids_union:
+            if not all_absent_ids:
+                all_absent_ids = set(reason_ids_union)
+            elif not reason_ids_union.issubset(all_absent_ids):
+                messages.error(request, f'Класс {class_room.name}: общий список должен включать все причины.')
+                return redirect('index')
+
+        if not reason_ids_union and all_absent_ids:
+            unexcused_ids = set(all_absent_ids)
+            unexcused_absent = len(unexcused_ids)
+
+        present_auto = class_room.student_count
+        total_absent_count = unexcused_absent + orvi_count + other_disease_count + family_reason_count
+
+        if present_auto and total_absent_count > present_auto:
+            messages.error(request, f'Класс {class_room.name}: отсутствующих больше, чем учеников.')
+            return redirect('index')
+
+        present_reported = max(0, present_auto - total_absent_count) if present_auto else reported_present
+
+        # Сохранение
+        existing = AttendanceSummary.objects.filter(class_room=class_room, date=today).first()
+        previous_absent_ids = set()
+        if existing:
+            if timezone.now() > (existing.created_at + day_snapshots.EDIT_WINDOW):
+                messages.error(request, f'Класс {class_room.name}: окно редактирования закрыто.')
+                return redirect('index')
+
+            existing.present_count_auto = present_auto
+            existing.present_count_reported = present_reported
+            existing.unexcused_absent_count = unexcused_absent
+            existing.orvi_count = orvi_count
+            existing.other_disease_count = other_disease_count
+            existing.family_reason_count = family_reason_count
+            existing.created_by = user
+            existing.save(update_fields=[
+                'present_count_auto',
+                'present_count_reported',
+                'unexcused_absent_count',
+                'orvi_count',
+                'other_disease_count',
+                'family_reason_count',
+                'created_by',
+                'updated_at',
+            ])
+
+            previous_absent_ids = set(
+                AbsentStudent.objects.filter(attendance=existing).values_list('student_id', flat=True)
+            )
+            AbsentStudent.objects.filter(attendance=existing).delete()
+            summary_obj = existing
+        else:
+            summary_obj = AttendanceSummary.objects.create(
+                class_room=class_room, date=today, present_count_auto=present_auto,
+                present_count_reported=present_reported, unexcused_absent_count=unexcused_absent,
+                orvi_count=orvi_count, other_disease_count=other_disease_count,
+                family_reason_count=family_reason_count, created_by=user
+            )
+
+        if not all_absent_ids:
+            all_absent_ids = reason_ids_union
+
+        # ученики проверяются одним запросом, отсутствия пишутся одним bulk_create
+        valid_ids = set(
+            Student.objects.filter(id__in=all_absent_ids, class_room=class_room).values_list('id', flat=True)
+        ) if all_absent_ids else set()
+
+        absents = []
+        for sid in sorted(valid_ids):
+            reason = AbsentStudent.Reason.UNEXCUSED
+            if sid in orvi_ids:
+                reason = AbsentStudent.Reason.ORVI
+            elif sid in other_ids:
+                reason = AbsentStudent.Reason.OTHER_DISEASE
+            elif sid in family_ids:
+                reason = AbsentStudent.Reason.FAMILY
+            absents.append(AbsentStudent(
+                attendance=summary_obj, student_id=sid, reason=reason, date=today, class_room=class_room
+            ))
+
+        if absents:
+            AbsentStudent.objects.bulk_create(absents)
+
+        # месячные счётчики истории пропусков: и новые отсутствующие, и снятые при правке
+        absence_history.recount_month(valid_ids | previous_absent_ids, today)
+        absence_state.apply_day(class_room.id, today, {a.student_id: a.reason for a in absents})
+        orvi_watch.update_for_class(class_room, today)
+
+    messages.success(request, 'Изменения сохранены.' if edit_class_post else 'Данные за сегодня сохранены.')
+    return redirect('index')
@@ -0,0 +1,9 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from ..services import db_pool
+
+
+@staff_member_required
+def db_pool_stats(request):
+    return JsonResponse(db_pool.pool_stats(), json_dumps_params={'ensure_ascii': False})
@@ -2,56 +2,50 @@ from datetime import datetime
 from io import BytesIO
 from html import escape
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.cache import cache
 from django.http import HttpResponse, HttpResponseBadRequest
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment
 
-from database.models import ClassRoom, AttendanceSummary
-from ..utils import class_sort_key
+from database.models import DaySnapshot
+from ..services import class_directory, data_version, day_snapshots
 from .auth import deny_substitute_access, is_deputy
+from .conditional import not_modified, set_validators, validators
 
 
-def _build_daily_export_rows(day):
-    classes = sorted(ClassRoom.objects.all(), key=class_sort_key)
-    summaries = AttendanceSummary.objects.filter(date=day).select_related('class_room').prefetch_related(
-        'absent_students__student')
-    summary_by_class = {s.class_room_id: s for s in summaries}
-
+def _format_daily_export_rows(data):
+    """Строки выгрузки: все классы дня, по классам без сводки — «Нет данных»."""
+    report_by_class = {report['class_id']: report for report in data['reports']}
     rows = []
-    for class_room in classes:
-        summary = summary_by_class.get(class_room.id)
-        if not summary:
+    for class_id, class_name in data['classes']:
+        report = report_by_class.get(class_id)
+        if not report:
             rows.append({
-                'class_name': class_room.name, 'present_count_reported': '-', 'unexcused_count': '-',
+                'class_name': class_name, 'present_count_reported': '-', 'unexcused_count': '-',
                 'unexcused_students': 'Нет данных', 'orvi_count': '-', 'orvi_students': 'Нет данных',
                 'other_disease_count': '-', 'other_disease_students': 'Нет данных', 'family_count': '-',
                 'family_students': 'Нет данных', 'all_absent_students': 'Нет данных', 'has_data': False,
             })
             continue
 
-        absents = list(summary.absent_students.all())
-        has_absents = bool(absents)
-        by_reason = {'unexcused': [], 'orvi': [], 'other_disease': [], 'family': []}
-        for absent in absents:
-            if absent.reason in by_reason:
-                by_reason[absent.reason].append(absent.student.full_name)
-
-        all_absent = [absent.student.full_name for absent in absents]
+        has_absents = bool(report['absent'])
+        by_reason = day_snapshots.names_by_reason(report)
+        all_absent = [full_name for _, full_name, _ in report['absent']]
 
         def format_names(names):
             return ', '.join(names) if has_absents and names else ('Нет данных' if not has_absents else '')
 
         rows.append({
-            'class_name': class_room.name,
-            'present_count_reported': summary.present_count_reported,
-            'unexcused_count': summary.unexcused_absent_count,
+            'class_name': report['class_name'],
+            'present_count_reported': report['present_count_reported'],
+            'unexcused_count': report['unexcused_absent_count'],
             'unexcused_students': format_names(by_reason['unexcused']),
-            'orvi_count': summary.orvi_count,
+            'orvi_count': report['orvi_count'],
             'orvi_students': format_names(by_reason['orvi']),
-            'other_disease_count': summary.other_disease_count,
+            'other_disease_count': report['other_disease_count'],
             'other_disease_students': format_names(by_reason['other_disease']),
-            'family_count': summary.family_reason_count,
+            'family_count': report['family_reason_count'],
             'family_students': format_names(by_reason['family']),
             'all_absent_students': format_names(all_absent),
             'has_data': True,
@@ -67,6 +61,11 @@ def _export_daily_excel(day, rows):
                  'family_students', 'all_absent_students']
     wrap_cols = {4, 6, 8, 10, 11}
 
+    # openpyxl — самая тяжёлая зависимость (~70 мс и несколько МБ на воркер), а выгрузка
+    # нужна редко: импортируется при первой выгрузке, а не при старте каждого воркера
+    from openpyxl import Workbook
+    from openpyxl.styles import PatternFill, Font, Alignment
+
     wb = Workbook()
     ws = wb.active
     ws.title = day.strftime('%d.%m.%Y')
@@ -133,7 +132,7 @@ def _export_daily_word(day, rows):
 @login_required
 @deny_substitute_access
 @user_passes_test(is_deputy)
-def export_daily_statistics(request):
+async def export_daily_statistics(request):
     date_raw = (request.GET.get('date') or '').strip()
     fmt = (request.GET.get('format') or '').strip().lower()
 
@@ -145,5 +144,40 @@ def export_daily_statistics(request):
     if not day: return HttpResponseBadRequest('Некорректная дата.')
     if fmt not in ('excel', 'word'): return HttpResponseBadRequest('Некорректный формат.')
 
-    rows = _build_daily_export_rows(day)
-    return _export_daily_excel(day, rows) if fmt == 'excel' else _export_daily_word(day, rows)
+    # закрытый день: версия — хэш снимка, а готовый файл лежит в кэше EXPORT_CACHE_SECONDS
+    # (снимок не меняется, а если его пересоберут — у него будет другой хэш);
+    # просроченные файлы удаляет prune_cache
+    # payload (сжатые данные всего дня) здесь не нужен: 304 и попадание в кэш обходятся без него
+    snapshot = await DaySnapshot.objects.filter(date=day).only('digest', 'created_at').afirst()
+    if snapshot is not None:
+        version = data_version.DataVersion(snapshot.digest, snapshot.created_at, {})
+    else:
+        # повторная выгрузка того же дня без изменений — 304 без запросов за сводками
+        version = await data_version.scope_version(day, day)
+    etag, last_modified = validators(request, await request.auser(), version, day, fmt)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    cache_key = f'export:{day.isoformat()}:{fmt}:{snapshot.digest}' if snapshot is not None else None
+    response = await cache.aget(cache_key) if cache_key else None
+    if response is None:
+        payload = None
+        if snapshot is not None:
+            payload = await DaySnapshot.objects.filter(pk=snapshot.pk).values_list('payload', flat=True).afirst()
+        if payload is not None:
+            data = day_snapshots.decode(payload)
+        else:
+            # снимка нет или его только что удалили (правка закрытого дня) — из живых таблиц, без кэша
+            cache_key = None
+            data = (await day_snapshots.alive(day, day)).get(day) or {
+                'classes': [[c.id, c.name] for c in await class_directory.aclasses()], 'reports': [],
+            }
+        rows = _format_daily_export_rows(data)
+        # генерация openpyxl/HTML — чистый CPU без обращений к БД, уводим в пул потоков,
+        # чтобы долгая выгрузка не блокировала event loop
+        build = _export_daily_excel if fmt == 'excel' else _export_daily_word
+        response = await sync_to_async(build, thread_sensitive=False)(day, rows)
+        if cache_key:
+            await cache.aset(cache_key, response, settings.EXPORT_CACHE_SECONDS)
+    return set_validators(response, etag, last_modified)
@@ -0,0 +1,93 @@
+from datetime import date
+
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from database.models import Student, AbsentStudent
+from ..services import absence_history
+from ..utils import parse_int_param
+from .auth import deny_substitute_access, is_deputy
+
+
+def _parse_month(raw, default):
+    """Месяц из параметра вида 2026-03."""
+    try:
+        year, month = (raw or '').split('-', 1)
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return default
+
+
+def _history(request, student_id):
+    """Общая часть страницы и API: проверка доступа и разбор параметров."""
+    user = request.user
+    students = Student.objects.select_related('class_room')
+    if not (user.is_superuser or is_deputy(user)):
+        # учитель видит только учеников своих классов
+        students = students.filter(class_room__staff=user)
+    student = students.filter(id=student_id).first()
+    if student is None:
+        raise Http404('Ученик не найден')
+
+    today = timezone.localdate()
+    first_month = _parse_month(request.GET.get('from'), absence_history.school_year_start(today))
+    last_month = _parse_month(request.GET.get('to'), absence_history.month_start(today))
+    if last_month < first_month:
+        last_month = first_month
+    reason = request.GET.get('reason') or None
+    if reason not in AbsentStudent.Reason.values:
+        reason = None
+
+    limit = parse_int_param(request.GET.get('limit'), 50, min_value=1, max_value=200)
+    page = absence_history.history_page(
+        student, first_month, last_month,
+        reason=reason,
+        cursor=absence_history.parse_cursor(request.GET.get('cursor')),
+        limit=limit,
+    )
+    return student, page
+
+
+@login_required
+@deny_substitute_access
+def student_history(request, student_id):
+    student, page = _history(request, student_id)
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    reason_codes = AbsentStudent.Reason.values
+    month_rows = [
+        {'month': row['month'], 'counts': [row['counts'].get(code, 0) for code in reason_codes], 'total': row['total']}
+        for row in page['months']
+    ]
+    return render(request, 'attendance/student_history.html', {
+        'student': student,
+        'page': page,
+        'reasons': AbsentStudent.Reason.choices,
+        'month_rows': month_rows,
+        'reason_totals': [page['totals'].get(code, 0) for code in reason_codes],
+        'filter_query': params.urlencode(),
+        'month_from': page['period']['from'].strftime('%Y-%m'),
+        'month_to': page['period']['to'].strftime('%Y-%m'),
+    })
+
+
+@login_required
+@deny_substitute_access
+def student_history_api(request, student_id):
+    """История пропусков ученика в JSON (для соцпедагога и внешних отчётов)."""
+    student, page = _history(request, student_id)
+    return JsonResponse({
+        'student': {'id': student.id, 'full_name': student.full_name, 'class_name': student.class_room.name},
+        'period': {key: value.isoformat() for key, value in page['period'].items()},
+        'reason': page['reason'],
+        'total': page['total'],
+        'totals': page['totals'],
+        'months': [
+            {'month': row['month'].strftime('%Y-%m'), 'counts': row['counts'], 'total': row['total']}
+            for row in page['months']
+        ],
+        'items': [{**item, 'date': item['date'].isoformat()} for item in page['items']],
+        'next_cursor': page['next_cursor'],
+    }, json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import StreamingHttpResponse
+
+from ..services import live_feed
+from .auth import deny_substitute_access, is_deputy
+
+
+@login_required
+@deny_substitute_access
+@user_passes_test(is_deputy)
+async def live_feed_stream(request):
+    """
+    Живая лента сохранений отчётов (text/event-stream). Без gzip: сжатие буферизует
+    поток; X-Accel-Buffering отключает буферизацию и на стороне nginx.
+    """
+    response = StreamingHttpResponse(
+        live_feed.stream(request.headers.get('Last-Event-ID'), max_seconds=settings.LIVE_FEED_MAX_SECONDS),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
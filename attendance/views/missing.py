@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import JsonResponse
+from django.shortcuts import render
+from django.utils import timezone
+
+from ..services import missing_reports
+from .auth import deny_substitute_access, is_deputy
+
+
+def _board(request):
+    today = timezone.localdate()
+    try:
+        day = missing_reports.clamp_day(date.fromisoformat(request.GET.get('date') or ''), today)
+    except ValueError:
+        day = today
+    return missing_reports.board(day)
+
+
+@login_required
+@deny_substitute_access
+@user_passes_test(is_deputy)
+def missing_reports_page(request):
+    """Табло «кто ещё не сдал» за день; страница сама опрашивает missing_reports_feed."""
+    today = timezone.localdate()
+    return render(request, 'attendance/missing_reports.html', {
+        'board': _board(request),
+        'min_date': today - timedelta(days=missing_reports.HISTORY_DAYS),
+        'max_date': today,
+        'poll_seconds': getattr(settings, 'MISSING_REPORTS_POLL_SECONDS', 15),
+    })
+
+
+@login_required
+@deny_substitute_access
+@user_passes_test(is_deputy)
+def missing_reports_feed(request):
+    """Классы без отчёта за день (?date=ГГГГ-ММ-ДД, по умолчанию сегодня) из кэша табло."""
+    board = _board(request)
+    return JsonResponse({
+        **board,
+        'date': board['date'].isoformat(),
+    }, json_dumps_params={'ensure_ascii': False})
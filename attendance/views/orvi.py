@@ -0,0 +1,46 @@
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import JsonResponse
+from django.utils import timezone
+
+from database.models import OrviWindowStat
+from ..services import orvi_watch
+from ..utils import class_sort_key
+from .auth import deny_substitute_access, is_deputy
+
+
+@login_required
+@deny_substitute_access
+@user_passes_test(is_deputy)
+def orvi_feed(request):
+    """
+    Скользящие окна ОРВИ по классам и параллелям (последнее состояние из таблицы).
+    ?alerts=1 — только превысившие порог карантина за последнюю неделю.
+    """
+    today = timezone.localdate()
+    if request.GET.get('alerts') == '1':
+        windows = list(orvi_watch.alerts(today))
+    else:
+        windows = list(OrviWindowStat.objects.all())
+        windows.sort(key=lambda w: (w.scope, class_sort_key(w.label), w.window_days))
+
+    limit = orvi_watch.threshold()
+    return JsonResponse({
+        'today': today.isoformat(),
+        'threshold': limit,
+        'windows': orvi_watch.window_sizes(),
+        'items': [
+            {
+                'scope': w.scope,
+                'label': w.label,
+                'window_days': w.window_days,
+                'first_day': w.first_day.isoformat(),
+                'as_of': w.as_of.isoformat(),
+                'days_reported': w.days_reported,
+                'orvi_count': w.orvi_count,
+                'enrolled_count': w.enrolled_count,
+                'ratio': round(w.ratio, 4),
+                'over_threshold': w.ratio >= limit,
+            }
+            for w in windows
+        ],
+    }, json_dumps_params={'ensure_ascii': False})
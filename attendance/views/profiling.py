@@ -0,0 +1,41 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+
+from ..services import profiling
+
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+@staff_member_required
+def profiles_list(request):
+    context = {
+        'title': 'Профили запросов',
+        'profiles': profiling.list_profiles(),
+    }
+    return render(request, 'attendance/admin/profiles.html', context)
+
+
+@staff_member_required
+def profile_detail(request, name):
+    sort = request.GET.get('sort') if request.GET.get('sort') in SORT_KEYS else 'cumulative'
+    report = profiling.load_report(name, sort=sort)
+    if report is None:
+        raise Http404('Профиль не найден.')
+
+    context = {
+        'title': f'Профиль {name}',
+        'report': report,
+        'sort': sort,
+        'sort_keys': SORT_KEYS,
+        'slow_queries': sorted(report['queries'], key=lambda q: q['ms'], reverse=True)[:20],
+    }
+    return render(request, 'attendance/admin/profile_detail.html', context)
+
+
+@staff_member_required
+def profile_download(request, name, kind):
+    path = profiling.report_path(name, '.prof' if kind == 'prof' else '.json')
+    if path is None:
+        raise Http404('Профиль не найден.')
+    return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
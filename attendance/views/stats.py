@@ -1,51 +1,68 @@
-import calendar
 import json  # <--- Вернули импорт
 from collections import defaultdict
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Sum, Count
+from django.core.cache import cache
+from django.db.models import Count
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
 from django.core.serializers.json import DjangoJSONEncoder  # <--- Вернули импорт
 
-from database.models import ClassRoom, Student, AttendanceSummary, AbsentStudent
+from database.models import Student, AbsentStudent
 from ..utils import class_sort_key, parse_int_param
-from ..services import school_calendar
+from ..services import class_directory, data_version, day_snapshots, school_calendar
 from .auth import deny_substitute_access, is_deputy
+from .conditional import not_modified, set_validators, validators
 
 
-@login_required
-@deny_substitute_access
-@user_passes_test(is_deputy)
-def statistics(request):
+# Версия данных входит в ключ, поэтому таймаут лишь ограничивает рост файлового кэша
+SECTION_CACHE_SECONDS = 600
+
+
+def _month_params(request):
     today = timezone.localdate()
     month = parse_int_param(request.GET.get('month'), today.month, min_value=1, max_value=12)
     year = parse_int_param(request.GET.get('year'), today.year, min_value=1970, max_value=2100)
+    return year, month
 
-    # 1. Базовые данные
-    monthly_qs = AttendanceSummary.objects.filter(
-        date__year=year, date__month=month
-    ).select_related('class_room')
 
-    days_map = defaultdict(list)
-    for s in monthly_qs.order_by('-date'):
-        days_map[s.date].append(s)
+@login_required
+@deny_substitute_access
+@user_passes_test(is_deputy)
+async def statistics(request):
+    """
+    Статистика за месяц. Страница — только каркас с фильтрами и заголовками секций:
+    графики и таблицы браузер подгружает из statistics_section, когда секция
+    появляется на экране, поэтому первая отрисовка не ждёт тяжёлых выборок.
+    """
+    year, month = _month_params(request)
+    context = {
+        'month': month,
+        'year': year,
+    }
+    # рендер шаблона синхронный (context processors) — выполняем в потоке
+    return await sync_to_async(render)(request, 'attendance/statistics.html', context)
+
 
-    for records in days_map.values():
-        records.sort(key=lambda r: class_sort_key(r.class_room.name))
+async def _month_days(year, month):
+    """{день: данные дня} за месяц: прошлые дни — из снимков, текущий — из сводок."""
+    return await day_snapshots.adays(*data_version.month_bounds(year, month))
 
-    ordered_days = sorted(days_map.items(), key=lambda x: x[0], reverse=True)
 
-    # 2. Подсчет итогов по дням
+def _day_totals(days):
     day_totals = {}
-    day_reported_counts = {}
-    for day, records in days_map.items():
-        day_reported_counts[day] = len(records)
-        total_present_auto = sum(r.present_count_auto for r in records)
-        total_present_reported = sum(r.present_count_reported for r in records)
-        total_unexcused = sum(r.unexcused_absent_count for r in records)
-        total_orvi = sum(r.orvi_count for r in records)
-        total_other_disease = sum(r.other_disease_count for r in records)
-        total_family = sum(r.family_reason_count for r in records)
+    for day, data in days.items():
+        records = data['reports']
+        total_present_auto = sum(r['present_count_auto'] for r in records)
+        total_present_reported = sum(r['present_count_reported'] for r in records)
+        total_unexcused = sum(r['unexcused_absent_count'] for r in records)
+        total_orvi = sum(r['orvi_count'] for r in records)
+        total_other_disease = sum(r['other_disease_count'] for r in records)
+        total_family = sum(r['family_reason_count'] for r in records)
         day_totals[day] = {
             'total_present_auto': total_present_auto,
             'total_present_reported': total_present_reported,
@@ -61,85 +78,37 @@ def statistics(request):
                 + total_family
             ),
         }
+    return day_totals
 
-    # 3. Сводка по классам
-    monthly_by_class = list(monthly_qs.values(
-        'class_room__id', 'class_room__name'
-    ).annotate(
-        total_present_auto=Sum('present_count_auto'),
-        total_present_reported=Sum('present_count_reported'),
-        total_unexcused=Sum('unexcused_absent_count'),
-        total_orvi=Sum('orvi_count'),
-        total_other_disease=Sum('other_disease_count'),
-        total_family=Sum('family_reason_count'),
-    ))
-    monthly_by_class.sort(key=lambda r: class_sort_key(r['class_room__name']))
-
-    # 4. По ученикам
-    absences_qs = AbsentStudent.objects.filter(
-        attendance__date__year=year,
-        attendance__date__month=month,
-        reason=AbsentStudent.Reason.UNEXCUSED,
-    ).select_related('student', 'attendance__class_room')
-
-    per_student = list(absences_qs.values(
-        'student__id', 'student__full_name', 'student__class_room__name'
-    ).annotate(absence_count=Count('id')))
-    per_student.sort(key=lambda r: (r['student__full_name'] or '').lower())
-    per_student.sort(key=lambda r: class_sort_key(r['student__class_room__name']))
 
-    # 5. Льготники
-    all_classes = sorted(ClassRoom.objects.all(), key=class_sort_key)
-    priv_qs = Student.objects.filter(
-        is_active=True, class_room__in=all_classes, privilege_types__isnull=False
-    ).values('class_room_id', 'class_room__name', 'privilege_types__code').annotate(cnt=Count('id', distinct=True))
+async def _render_fragment(template_name, context):
+    html = await sync_to_async(render_to_string)(template_name, context)
+    return 'text/html; charset=utf-8', html
 
-    by_class = {
-        c.id: {'class_id': c.id, 'class_name': c.name, 'svo': 0, 'multi': 0, 'low_income': 0, 'disabled': 0, 'total': 0}
-        for c in all_classes}
-    for row in priv_qs:
-        cid = row['class_room_id']
-        ptype = row['privilege_types__code']
-        if cid in by_class and ptype in ('svo', 'multi', 'low_income', 'disabled'):
-            by_class[cid][ptype] = row['cnt'] or 0
 
-    for r in by_class.values():
-        r['total'] = r['svo'] + r['multi'] + r['low_income'] + r['disabled']
+async def _visuals_section(year, month):
+    """Данные графиков: тепловая карта по классам и общая динамика (JSON)."""
+    days = await _month_days(year, month)
+    day_totals = _day_totals(days)
+    all_classes = await class_directory.aclasses()
 
-    privileged_types_by_class = list(by_class.values())
-    privileged_types_totals = {
-        'svo': sum(r['svo'] for r in privileged_types_by_class),
-        'multi': sum(r['multi'] for r in privileged_types_by_class),
-        'low_income': sum(r['low_income'] for r in privileged_types_by_class),
-        'disabled': sum(r['disabled'] for r in privileged_types_by_class),
-        'total': sum(r['total'] for r in privileged_types_by_class)
-    }
-
-    total_classes_count = ClassRoom.objects.all().count()
-    total_students_count = Student.objects.filter(is_active=True).count()
-
-    # --- ГРАФИКИ ---
     month_days = school_calendar.get_working_days_in_month(year, month)
     working_days_count = len(month_days)
+    working_days = set(month_days)
 
-    working_qs = monthly_qs.filter(date__in=month_days) if month_days else monthly_qs.none()
-    month_counts_by_class = {
-        row['class_room_id']: row['cnt']
-        for row in working_qs.values('class_room_id').annotate(cnt=Count('id'))
-    }
+    summary_map = defaultdict(dict)
+    for day, data in days.items():
+        for report in data['reports']:
+            summary_map[report['class_id']][day] = report
 
     heatmap_rows = [
         {
             'class_name': c.name,
-            'report_count': month_counts_by_class.get(c.id, 0),
+            'report_count': sum(1 for d in summary_map[c.id] if d in working_days),
         }
         for c in all_classes
     ]
 
-    summary_map = defaultdict(dict)
-    for s in monthly_qs:
-        summary_map[s.class_room_id][s.date] = s
-
     heatmap_series = []
     for c in all_classes:
         data_points = []
@@ -149,11 +118,11 @@ def statistics(request):
             counts = None  # Детализация для тултипа
 
             if s:
-                present = s.present_count_reported
-                unex = s.unexcused_absent_count
-                orvi = s.orvi_count
-                other = s.other_disease_count
-                fam = s.family_reason_count
+                present = s['present_count_reported']
+                unex = s['unexcused_absent_count']
+                orvi = s['orvi_count']
+                other = s['other_disease_count']
+                fam = s['family_reason_count']
 
                 total_absent = unex + orvi + other + fam
                 total = present + total_absent
@@ -211,25 +180,152 @@ def statistics(request):
 
     raw_chart_data = {
         'heatmap': heatmap_series,
-        'timeline': [{'name': 'Среднее по школе', 'data': timeline_series}]
+        'timeline': [{'name': 'Среднее по школе', 'data': timeline_series}],
+        'heatmap_rows': heatmap_rows,
+        'working_days_count': working_days_count,
     }
+    return 'application/json', json.dumps(raw_chart_data, cls=DjangoJSONEncoder, ensure_ascii=False)
 
-    context = {
-        'ordered_days': ordered_days,
-        'day_totals': day_totals,
-        'day_reported_counts': day_reported_counts,
-        'total_classes_count': total_classes_count,
-        'total_students_count': total_students_count,
-        'monthly_by_class': monthly_by_class,
-        'per_student': per_student,
-        'month': month,
-        'year': year,
+
+async def _privileged_types_section(year, month):
+    """Льготники по типам (не зависят от месяца, но кэшируются вместе с ним)."""
+    all_classes = await class_directory.aclasses()
+    priv_qs = Student.objects.filter(
+        is_active=True, privilege_types__isnull=False
+    ).values('class_room_id', 'privilege_types__code').annotate(cnt=Count('id', distinct=True))
+
+    by_class = {
+        c.id: {'class_id': c.id, 'class_name': c.name, 'svo': 0, 'multi': 0, 'low_income': 0, 'disabled': 0, 'total': 0}
+        for c in all_classes}
+    async for row in priv_qs.aiterator():
+        cid = row['class_room_id']
+        ptype = row['privilege_types__code']
+        if cid in by_class and ptype in ('svo', 'multi', 'low_income', 'disabled'):
+            by_class[cid][ptype] = row['cnt'] or 0
+
+    for r in by_class.values():
+        r['total'] = r['svo'] + r['multi'] + r['low_income'] + r['disabled']
+
+    privileged_types_by_class = list(by_class.values())
+    privileged_types_totals = {
+        'svo': sum(r['svo'] for r in privileged_types_by_class),
+        'multi': sum(r['multi'] for r in privileged_types_by_class),
+        'low_income': sum(r['low_income'] for r in privileged_types_by_class),
+        'disabled': sum(r['disabled'] for r in privileged_types_by_class),
+        'total': sum(r['total'] for r in privileged_types_by_class)
+    }
+    return await _render_fragment('attendance/statistics/_privileged_types.html', {
         'privileged_types_by_class': privileged_types_by_class,
         'privileged_types_totals': privileged_types_totals,
-        'heatmap_rows': heatmap_rows,
-        'working_days_count': working_days_count,
+    })
+
+
+async def _daily_section(year, month):
+    """Дневная статистика: аккордеон по дням со списками отсутствующих."""
+    days = await _month_days(year, month)
+    ordered_days = []
+    for day in sorted(days, reverse=True):
+        records = []
+        for report in days[day]['reports']:
+            names = day_snapshots.names_by_reason(report)
+            records.append({
+                **report,
+                'names': {reason: ', '.join(names[reason]) for reason in AbsentStudent.Reason.values},
+                'all_names': ', '.join(full_name for _, full_name, _ in report['absent']),
+            })
+        ordered_days.append((day, records))
 
-        # ✅ Передаем ГОТОВУЮ JSON-строку
-        'chart_data_json': json.dumps(raw_chart_data, cls=DjangoJSONEncoder),
-    }
-    return render(request, 'attendance/statistics.html', context)
+    return await _render_fragment('attendance/statistics/_daily.html', {
+        'ordered_days': ordered_days,
+        'day_totals': _day_totals(days),
+        'day_reported_counts': {day: len(data['reports']) for day, data in days.items()},
+        'total_classes_count': len(await class_directory.aclasses()),
+        'total_students_count': await Student.objects.filter(is_active=True).acount(),
+    })
+
+
+async def _by_class_section(year, month):
+    """Сводка по классам за месяц."""
+    days = await _month_days(year, month)
+    names = {c.id: c.name for c in await class_directory.aclasses()}
+    totals = {}
+    for day in sorted(days):
+        for report in days[day]['reports']:
+            row = totals.setdefault(report['class_id'], {
+                'class_room__id': report['class_id'], 'total_present_auto': 0, 'total_present_reported': 0,
+                'total_unexcused': 0, 'total_orvi': 0, 'total_other_disease': 0, 'total_family': 0,
+            })
+            # имя — текущее, а для удалённого класса — из последнего отчёта
+            row['class_room__name'] = names.get(report['class_id'], report['class_name'])
+            row['total_present_auto'] += report['present_count_auto']
+            row['total_present_reported'] += report['present_count_reported']
+            row['total_unexcused'] += report['unexcused_absent_count']
+            row['total_orvi'] += report['orvi_count']
+            row['total_other_disease'] += report['other_disease_count']
+            row['total_family'] += report['family_reason_count']
+    monthly_by_class = sorted(totals.values(), key=lambda r: class_sort_key(r['class_room__name']))
+    return await _render_fragment('attendance/statistics/_by_class.html', {'monthly_by_class': monthly_by_class})
+
+
+async def _by_student_section(year, month):
+    """Неуважительные пропуски по ученикам за месяц."""
+    days = await _month_days(year, month)
+    per_student = {}
+    for day in sorted(days):
+        for report in days[day]['reports']:
+            for student_id, full_name, reason in report['absent']:
+                if reason != AbsentStudent.Reason.UNEXCUSED:
+                    continue
+                row = per_student.setdefault(student_id, {'student__id': student_id, 'absence_count': 0})
+                # ФИО и класс — на последний день месяца с пропуском
+                row['student__full_name'] = full_name
+                row['student__class_room__name'] = report['class_name']
+                row['absence_count'] += 1
+    per_student = list(per_student.values())
+    per_student.sort(key=lambda r: (r['student__full_name'] or '').lower())
+    per_student.sort(key=lambda r: class_sort_key(r['student__class_room__name']))
+    return await _render_fragment('attendance/statistics/_by_student.html', {'per_student': per_student})
+
+
+SECTION_BUILDERS = {
+    'visuals': _visuals_section,
+    'privileged_types': _privileged_types_section,
+    'daily': _daily_section,
+    'by_class': _by_class_section,
+    'by_student': _by_student_section,
+}
+
+
+async def cached_section(name, year, month, version):
+    """(content_type, тело) секции из общего кэша по версии данных месяца."""
+    key = f'statistics:{name}:{year}-{month:02d}:{version.tag}'
+    cached = await cache.aget(key)
+    if cached is None:
+        cached = await SECTION_BUILDERS[name](year, month)
+        await cache.aset(key, cached, SECTION_CACHE_SECONDS)
+    return cached
+
+
+@gzip_page
+@login_required
+@deny_substitute_access
+@user_passes_test(is_deputy)
+async def statistics_section(request, name):
+    """
+    Одна секция статистики за месяц: JSON графиков или HTML-фрагмент таблицы.
+    Тело кэшируется отдельно для каждой секции по версии данных месяца;
+    та же версия (один запрос) даёт ETag и Last-Modified, так что повторный
+    запрос без изменений получает пустой 304.
+    """
+    if name not in SECTION_BUILDERS:
+        raise Http404('Неизвестная секция статистики')
+    year, month = _month_params(request)
+
+    version = await data_version.month_version(year, month)
+    etag, last_modified = validators(request, await request.auser(), version, name, year, month)
+
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        content_type, body = await cached_section(name, year, month, version)
+        response = set_validators(HttpResponse(body, content_type=content_type), etag, last_modified)
+    return response
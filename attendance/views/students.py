@@ -2,8 +2,12 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q, Prefetch, Case, When, IntegerField
 from django.shortcuts import render, redirect
+from django.utils import timezone
 
 from database.models import ClassRoom, Student, PrivilegeType
+from database.signals import recalc_student_counts
+from ..services import class_directory, roles
+from ..signals import roster_changed
 from ..utils import class_sort_key
 from .auth import deny_substitute_access
 
@@ -12,13 +16,15 @@ from .auth import deny_substitute_access
 @deny_substitute_access
 def manage_students(request):
     user = request.user
-    user_is_deputy = user.groups.filter(name='Завуч').exists()
-    user_is_teacher = user.groups.filter(name='Учитель').exists()
+    user_roles = roles.user_roles(user)
+    user_is_deputy = roles.DEPUTY in user_roles
+    user_is_teacher = roles.TEACHER in user_roles
 
     if user_is_deputy or user.is_superuser:
-        allowed_classes = sorted(ClassRoom.objects.all(), key=class_sort_key)
+        allowed_classes = class_directory.classes()
     else:
-        allowed_classes = sorted(ClassRoom.objects.filter(staff=user), key=class_sort_key)
+        allowed_classes = class_directory.subset(ClassRoom.objects.filter(staff=user).values_list('id', flat=True))
+    allowed_class_ids = [c.id for c in allowed_classes]
 
     q = (request.GET.get('q') or '').strip()
     class_id = (request.GET.get('class_id') or '').strip()
@@ -35,7 +41,7 @@ def manage_students(request):
     privilege_types_prefetch = Prefetch('privilege_types',
                                         queryset=PrivilegeType.objects.order_by(privilege_type_order, 'code'))
     students = Student.objects.select_related('class_room').prefetch_related(privilege_types_prefetch).filter(
-        class_room__in=allowed_classes)
+        class_room_id__in=allowed_class_ids)
 
     if not show_inactive: students = students.filter(is_active=True)
     if class_id.isdigit(): students = students.filter(class_room_id=int(class_id))
@@ -72,7 +78,7 @@ def manage_students(request):
         one_id = int(one_id) if (one_id and str(one_id).isdigit()) else None
 
         def qs_allowed(qs):
-            return qs.filter(class_room__in=allowed_classes)
+            return qs.filter(class_room_id__in=allowed_class_ids)
 
         if action == 'toggle_privileged' and one_id:
             try:
@@ -82,7 +88,7 @@ def manage_students(request):
                 return redirect(request.get_full_path())
             s.is_privileged = bool(request.POST.get('is_privileged'))
             if not s.is_privileged: s.privilege_types.clear()
-            s.save(update_fields=['is_privileged'])
+            s.save(update_fields=['is_privileged', 'updated_at'])
             messages.success(request, f'Обновлено: {s.full_name}')
             return redirect(request.get_full_path())
 
@@ -99,7 +105,7 @@ def manage_students(request):
             if not ptypes:
                 s.privilege_types.clear()
                 s.is_privileged = False
-                s.save(update_fields=['is_privileged'])
+                s.save(update_fields=['is_privileged', 'updated_at'])
                 messages.success(request, f'Льгота снята: {s.full_name}')
             else:
                 selected_types = list(PrivilegeType.objects.filter(code__in=ptypes))
@@ -108,31 +114,38 @@ def manage_students(request):
                 else:
                     s.privilege_types.set(selected_types)
                     s.is_privileged = True
-                    s.save(update_fields=['is_privileged'])
+                    s.save(update_fields=['is_privileged', 'updated_at'])
                     messages.success(request, f'Обновлено: {s.full_name}')
             return redirect(request.get_full_path())
 
         if action in ('priv_on', 'priv_off', 'priv_svo', 'priv_multi', 'priv_low_income', 'priv_disabled', 'delete',
                       'restore') and ids:
             qs = qs_allowed(Student.objects.filter(id__in=ids))
-            qs_ids = list(qs.values_list('id', flat=True))
+            rows = list(qs.values_list('id', 'class_room_id'))
+            qs_ids = [sid for sid, _ in rows]
+            class_ids = {cid for _, cid in rows}
 
             if action == 'priv_on':
-                qs.update(is_privileged=True)
+                qs.update(is_privileged=True, updated_at=timezone.now())
             elif action == 'priv_off':
                 Student.privilege_types.through.objects.filter(student_id__in=qs_ids).delete()
-                qs.update(is_privileged=False)
+                qs.update(is_privileged=False, updated_at=timezone.now())
             elif action.startswith('priv_'):
                 code = {'priv_svo': 'svo', 'priv_multi': 'multi', 'priv_low_income': 'low_income',
                         'priv_disabled': 'disabled'}[action]
                 ptype = PrivilegeType.objects.filter(code=code).first()
                 if ptype:
-                    for s in qs: s.privilege_types.add(ptype)
-                    qs.update(is_privileged=True)
-            elif action == 'delete':
-                qs.update(is_active=False)
-            elif action == 'restore':
-                qs.update(is_active=True)
+                    through = Student.privilege_types.through
+                    through.objects.bulk_create(
+                        [through(student_id=sid, privilegetype_id=ptype.id) for sid in qs_ids],
+                        ignore_conflicts=True,
+                    )
+                    qs.update(is_privileged=True, updated_at=timezone.now())
+            elif action in ('delete', 'restore'):
+                # update() идёт мимо сигналов: численность затронутых классов пересчитываем одним UPDATE
+                qs.update(is_active=(action == 'restore'), updated_at=timezone.now())
+                recalc_student_counts(class_ids)
+            roster_changed(class_ids, counts=action in ('delete', 'restore'))
 
             messages.success(request, 'Действие выполнено.')
             return redirect(request.get_full_path())
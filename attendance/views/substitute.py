@@ -1,15 +1,34 @@
+import csv
 from datetime import timedelta
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import login as auth_login
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.paginator import Paginator
+from django.http import HttpResponse
 from django.shortcuts import render, redirect
 from django.utils import timezone
 
 from database.models import ClassRoom, SubstituteAccessToken
-from ..utils import class_sort_key
+from ..services import class_directory, roles
+from ..utils import class_grade
 from .auth import deny_substitute_access, is_deputy
 
 
+TOKENS_PER_PAGE = 25
+
+# допустимая длительность токена: от 30 секунд до двух недель
+TTL_MIN = 30
+TTL_MAX = 14 * 86400
+
+# колонки строки списка: без token_hash и прочих полей связанных пользователей
+TOKEN_LIST_FIELDS = (
+    'class_room__name', 'class_room__teacher__first_name', 'class_room__teacher__last_name',
+    'class_room__teacher__username', 'issued_by__first_name', 'issued_by__last_name', 'issued_by__username',
+    'created_at', 'expires_at', 'revoked_at', 'ttl_seconds',
+)
+
+
 def substitute_login(request):
     if request.method == 'POST':
         raw = (request.POST.get('token') or '').strip()
@@ -43,11 +62,77 @@ def substitute_login(request):
     return render(request, 'attendance/substitute_login.html')
 
 
+def _ttl_seconds(post) -> int:
+    try:
+        sec, mn, hr, dy, wk = [int(post.get(k) or 0) for k in ('ttl_sec', 'ttl_min', 'ttl_hour', 'ttl_day', 'ttl_week')]
+    except ValueError:
+        return 0
+    return sec + mn * 60 + hr * 3600 + dy * 86400 + wk * 604800
+
+
+SKIPPED_REASON = 'Токен не выдан: нет активного классного руководителя'
+
+
+def _bulk_issue(request, classes):
+    """
+    Токены сразу для многих классов (отмеченных и целых параллелей): один запрос
+    на проверку классных руководителей и один INSERT. Сырые токены нигде не
+    сохраняются — они есть только в ответе: лист для печати или CSV.
+    """
+    ttl = _ttl_seconds(request.POST)
+    class_ids = {int(x) for x in request.POST.getlist('class_ids') if x.isdigit()}
+    grades = {int(x) for x in request.POST.getlist('grades') if x.isdigit()}
+    class_ids |= {c.id for c in classes if class_grade(c.name) in grades}
+    if not class_ids or not TTL_MIN <= ttl <= TTL_MAX:
+        messages.error(request, 'Выберите классы и длительность от 30 секунд до 2 недель.')
+        return redirect(request.path)
+
+    # токен выдаётся только классу с активным классным руководителем — как и поштучно
+    eligible = set(ClassRoom.objects.filter(id__in=class_ids, teacher__is_active=True).values_list('id', flat=True))
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=ttl)
+    issued, skipped, tokens = [], [], []
+    for c in classes:
+        if c.id not in class_ids:
+            continue
+        if c.id not in eligible:
+            skipped.append(c.name)
+            continue
+        raw = SubstituteAccessToken.generate_raw_token()
+        tokens.append(SubstituteAccessToken(
+            class_room_id=c.id, issued_by=request.user, token_hash=SubstituteAccessToken.hash_token(raw),
+            ttl_seconds=ttl, created_at=now, expires_at=expires_at,
+        ))
+        issued.append({'class_name': c.name, 'teacher': c.teacher_name, 'token': raw})
+    SubstituteAccessToken.objects.bulk_create(tokens)
+
+    if request.POST.get('output') == 'csv':
+        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="tokens-{timezone.localtime(now):%Y%m%d-%H%M}.csv"'
+        response.write('\ufeff')  # BOM: Excel открывает UTF-8 с кириллицей без перекодировки
+        writer = csv.writer(response, delimiter=';')
+        writer.writerow(['Класс', 'Классный руководитель', 'Токен', 'Действует до', 'Примечание'])
+        expires = f'{timezone.localtime(expires_at):%d.%m.%Y %H:%M}'
+        for item in issued:
+            writer.writerow([item['class_name'], item['teacher'], item['token'], expires, ''])
+        # пропущенные классы — тоже строками, чтобы файл совпадал с запросом
+        for class_name in skipped:
+            writer.writerow([class_name, '', '', '', SKIPPED_REASON])
+    else:
+        response = render(request, 'attendance/substitute_tokens/sheet.html', {
+            'issued': issued, 'skipped': skipped, 'skipped_reason': SKIPPED_REASON, 'expires_at': expires_at,
+            'ttl_seconds': ttl,
+        })
+    # в ответе сырые токены: ни браузер, ни прокси не должны его сохранять
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
 @login_required
 @deny_substitute_access
 @user_passes_test(is_deputy)
 def substitute_tokens(request):
-    classes = sorted(ClassRoom.objects.select_related('teacher'), key=class_sort_key)
+    classes = class_directory.classes()
 
     if request.method == 'POST':
         action = (request.POST.get('action') or '').strip()
@@ -87,11 +172,9 @@ def substitute_tokens(request):
 
         if action == 'create':
             class_id = request.POST.get('class_id')
-            sec, mn, hr, dy, wk = [int(request.POST.get(k) or 0) for k in
-                                   ('ttl_sec', 'ttl_min', 'ttl_hour', 'ttl_day', 'ttl_week')]
-            ttl = sec + mn * 60 + hr * 3600 + dy * 86400 + wk * 604800
+            ttl = _ttl_seconds(request.POST)
 
-            if class_id and str(class_id).isdigit() and 30 <= ttl <= 1209600:
+            if class_id and str(class_id).isdigit() and TTL_MIN <= ttl <= TTL_MAX:
                 class_room = ClassRoom.objects.filter(id=int(class_id)).select_related('teacher').first()
                 if class_room and class_room.teacher and class_room.teacher.is_active:
                     raw = SubstituteAccessToken.generate_raw_token()
@@ -103,15 +186,29 @@ def substitute_tokens(request):
                     messages.success(request, f'Токен создан для {class_room.name}.')
             return redirect(request.path)
 
+        if action == 'bulk_create':
+            return _bulk_issue(request, classes)
+
         return redirect(request.path)
 
     created_token = request.session.pop("created_token", None)
-    tokens = list(
-        SubstituteAccessToken.objects.select_related('class_room', 'issued_by', 'class_room__teacher').order_by(
-            '-created_at')[:200])
-    tokens.sort(key=lambda t: t.created_at, reverse=True)
-    tokens.sort(key=lambda t: class_sort_key(t.class_room))
-
-    context = {'classes': classes, 'tokens': tokens, 'created_token': created_token, 'is_deputy': True,
-               'is_teacher': request.user.groups.filter(name='Учитель').exists()}
+    # сортировка и срез страницы — в БД: действующие по сроку (скоро истекающие сверху),
+    # истёкшие и отозванные — от новых к старым
+    now = timezone.now()
+    tokens = SubstituteAccessToken.objects.select_related('class_room__teacher', 'issued_by').only(
+        *TOKEN_LIST_FIELDS)
+    active_page = Paginator(tokens.active(now).order_by('expires_at', 'id'), TOKENS_PER_PAGE).get_page(
+        request.GET.get('active_page'))
+    inactive_page = Paginator(tokens.inactive(now).order_by('-created_at', '-id'), TOKENS_PER_PAGE).get_page(
+        request.GET.get('inactive_page'))
+
+    # для массовой выдачи: классы по параллелям
+    classes_by_grade = {}
+    for c in classes:
+        classes_by_grade.setdefault(class_grade(c.name), []).append(c)
+
+    context = {'classes': classes, 'classes_by_grade': classes_by_grade,
+               'active_page': active_page, 'inactive_page': inactive_page,
+               'retention_days': settings.SUBSTITUTE_TOKEN_RETENTION_DAYS, 'created_token': created_token,
+               'is_deputy': True, 'is_teacher': roles.TEACHER in roles.user_roles(request.user)}
     return render(request, 'attendance/substitute_tokens.html', context)
@@ -33,6 +33,8 @@ class ClassRoom(models.Model):
         verbose_name='Закреплённые сотрудники (учителя / завучи)',
         help_text='Пользователи, которые видят этот класс на главной странице.'
     )
+    # версия состава для условных GET; null — строки, созданные до появления поля
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True, verbose_name='Обновлено')
 
     class Meta:
         verbose_name = 'Класс'
@@ -73,6 +75,8 @@ class Student(models.Model):
         verbose_name='Типы льгот',
         help_text='Если указаны типы льготы — ученик считается льготником.'
     )
+    # массовые .update() в управлении учениками выставляют его явно
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True, verbose_name='Обновлено')
 
     class Meta:
         verbose_name = 'Ученик'
@@ -135,6 +139,10 @@ class AttendanceSummary(models.Model):
         verbose_name_plural = 'Сводки посещаемости'
         unique_together = ('class_room', 'date')
         ordering = ['-date', 'class_room__name']
+        indexes = [
+            # версия данных за период (MAX(updated_at) по диапазону дат) читается только из индекса
+            models.Index(fields=['date', 'updated_at'], name='summary_date_updated'),
+        ]
 
     def __str__(self):
         return f'{self.class_room} — {self.date}'
@@ -166,13 +174,191 @@ class AbsentStudent(models.Model):
         verbose_name='Причина отсутствия'
     )
 
+    # Копии attendance.date / attendance.class_room: отчёты по ученикам и причинам
+    # фильтруют отсутствия по дате и классу без JOIN со сводкой.
+    # Заполняются в save() (bulk_create — вручную), старые строки — командой backfill_absences.
+    date = models.DateField(null=True, blank=True, editable=False, verbose_name='Дата')
+    class_room = models.ForeignKey(
+        ClassRoom,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='absences',
+        verbose_name='Класс'
+    )
+    updated_at = models.DateTimeField(auto_now=True, null=True, verbose_name='Обновлено')
+
     class Meta:
         verbose_name = 'Отсутствие ученика'
         verbose_name_plural = 'Отсутствия учеников'
         unique_together = ('attendance', 'student')
+        indexes = [
+            # отчёты «по причинам за период»: причина = X, дата в диапазоне, группировка по ученику
+            models.Index(fields=['reason', 'date', 'student'], name='absent_reason_date_student'),
+            # история ученика
+            models.Index(fields=['student', 'date'], name='absent_student_date'),
+            # отсутствующие по классам за день (главная страница)
+            models.Index(fields=['date', 'class_room', 'student'], name='absent_date_class_student'),
+            # версия данных за период: MAX(updated_at) по диапазону дат — из индекса
+            models.Index(fields=['date', 'updated_at'], name='absent_date_updated'),
+        ]
+
+    def __str__(self):
+        return f'{self.student} ({self.get_reason_display()}) {self.date or self.attendance.date}'
+
+    def copy_attendance_fields(self, attendance=None):
+        """Переносит дату и класс из сводки (без сохранения)."""
+        attendance = attendance or self.attendance
+        self.date = attendance.date
+        self.class_room_id = attendance.class_room_id
+
+    def save(self, *args, **kwargs):
+        if self.attendance_id:
+            self.copy_attendance_fields()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'date', 'class_room'}
+        super().save(*args, **kwargs)
+
+
+class DaySnapshot(models.Model):
+    """
+    Закрытый день: после окна редактирования сводки дня уже не меняются, поэтому
+    отчёты за прошлые дни читают один сжатый JSON (services.day_snapshots) вместо
+    сводок и отсутствий. Пишет команда close_days; правка сводки или отсутствия
+    закрытого дня (например, в админке) удаляет снимок — он пересоберётся.
+    """
+    date = models.DateField(unique=True, verbose_name='Дата')
+    payload = models.BinaryField(verbose_name='Данные дня (JSON, zlib)')
+    digest = models.CharField(max_length=16, verbose_name='Хэш данных')
+    reports_count = models.PositiveIntegerField(default=0, verbose_name='Классов с отчётом')
+    created_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name='Создан')
+
+    class Meta:
+        verbose_name = 'Снимок дня'
+        verbose_name_plural = 'Снимки дней'
+        ordering = ['-date']
+
+    def __str__(self):
+        return f'{self.date:%d.%m.%Y}: классов с отчётом {self.reports_count}'
+
+
+class StudentMonthlyAbsence(models.Model):
+    """
+    Счётчик пропусков ученика за месяц по причине.
+    Пересчитывается при сохранении посещаемости класса (services.absence_history),
+    поэтому история ученика не пересчитывает месячные итоги при каждом просмотре.
+    """
+    student = models.ForeignKey(
+        'Student',
+        on_delete=models.CASCADE,
+        related_name='monthly_absences',
+        verbose_name='Ученик'
+    )
+    month = models.DateField(verbose_name='Месяц (первое число)')
+    reason = models.CharField(max_length=20, choices=AbsentStudent.Reason.choices, verbose_name='Причина отсутствия')
+    absence_count = models.PositiveIntegerField(default=0, verbose_name='Дней пропущено')
+
+    class Meta:
+        verbose_name = 'Пропуски ученика за месяц'
+        verbose_name_plural = 'Пропуски учеников за месяц'
+        unique_together = ('student', 'month', 'reason')
+
+    def __str__(self):
+        return f'{self.student} {self.month:%m.%Y} {self.get_reason_display()}: {self.absence_count}'
+
+
+class StudentAbsenceState(models.Model):
+    """
+    Текущее состояние пропусков ученика для отчёта о хронических пропусках.
+    Обновляется инкрементально при каждом сохранении посещаемости класса
+    (services.absence_state.apply_day): серия подряд идущих учебных дней с одной
+    причиной и доля пропущенных дней в текущем месяце.
+    prev_* и day_reason хранят состояние до дня as_of, чтобы повторное сохранение
+    того же дня (окно правки) откатывало его вклад, а не накапливало.
+    """
+    student = models.OneToOneField(
+        'Student',
+        on_delete=models.CASCADE,
+        related_name='absence_state',
+        verbose_name='Ученик'
+    )
+    as_of = models.DateField(verbose_name='По состоянию на')
+    day_reason = models.CharField(max_length=20, blank=True, default='', verbose_name='Причина в день as_of')
+
+    streak_reason = models.CharField(
+        max_length=20, blank=True, default='', choices=AbsentStudent.Reason.choices, verbose_name='Причина текущей серии'
+    )
+    streak_days = models.PositiveIntegerField(default=0, verbose_name='Дней подряд')
+    streak_start = models.DateField(null=True, blank=True, verbose_name='Начало серии')
+
+    prev_streak_reason = models.CharField(max_length=20, blank=True, default='')
+    prev_streak_days = models.PositiveIntegerField(default=0)
+    prev_streak_start = models.DateField(null=True, blank=True)
+
+    last_absent_date = models.DateField(null=True, blank=True, verbose_name='Последний пропуск')
+    prev_last_absent_date = models.DateField(null=True, blank=True)
+
+    month = models.DateField(verbose_name='Месяц')
+    month_days = models.PositiveIntegerField(default=0, verbose_name='Учебных дней с отчётом')
+    month_missed = models.PositiveIntegerField(default=0, verbose_name='Пропущено дней')
+    month_missed_ratio = models.FloatField(default=0.0, verbose_name='Доля пропусков за месяц')
+
+    class Meta:
+        verbose_name = 'Состояние пропусков ученика'
+        verbose_name_plural = 'Состояния пропусков учеников'
+        indexes = [
+            models.Index(fields=['streak_reason', 'streak_days'], name='absence_state_streak'),
+            models.Index(fields=['month', 'month_missed_ratio'], name='absence_state_month_ratio'),
+        ]
 
     def __str__(self):
-        return f'{self.student} ({self.get_reason_display()}) {self.attendance.date}'
+        return f'{self.student}: {self.streak_days} дн. подряд ({self.streak_reason or "—"})'
+
+
+class OrviWindowStat(models.Model):
+    """
+    Доля отсутствующих по ОРВИ за последние N учебных дней — по классу или параллели.
+    Хранится только последнее окно: обновляется после сохранения посещаемости класса
+    (services.orvi_watch), виджет и JSON-лента читают эту таблицу без пересчёта истории.
+    """
+    class Scope(models.TextChoices):
+        CLASS = 'class', 'Класс'
+        GRADE = 'grade', 'Параллель'
+
+    scope = models.CharField(max_length=10, choices=Scope.choices, verbose_name='Уровень')
+    key = models.CharField(max_length=20, verbose_name='Ключ (class:<id> / grade:<номер>)')
+    label = models.CharField(max_length=20, verbose_name='Класс / параллель')
+    window_days = models.PositiveSmallIntegerField(verbose_name='Окно, учебных дней')
+
+    as_of = models.DateField(verbose_name='Последний день окна')
+    first_day = models.DateField(verbose_name='Первый день окна')
+    days_reported = models.PositiveSmallIntegerField(default=0, verbose_name='Дней с отчётом')
+    orvi_count = models.PositiveIntegerField(default=0, verbose_name='ОРВИ (сумма за окно)')
+    enrolled_count = models.PositiveIntegerField(default=0, verbose_name='По списку (сумма за окно)')
+    ratio = models.FloatField(default=0.0, verbose_name='Доля ОРВИ')
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Обновлено')
+
+    class Meta:
+        verbose_name = 'Окно ОРВИ'
+        verbose_name_plural = 'Окна ОРВИ'
+        unique_together = ('key', 'window_days')
+        indexes = [models.Index(fields=['as_of', 'ratio'], name='orvi_window_as_of_ratio')]
+
+    def __str__(self):
+        return f'{self.label}: {self.ratio:.0%} за {self.window_days} дн. ({self.as_of:%d.%m.%Y})'
+
+
+class SubstituteAccessTokenQuerySet(models.QuerySet):
+    """Активность токена на стороне БД (то же условие, что и свойство is_active)."""
+
+    def active(self, now=None):
+        return self.filter(revoked_at__isnull=True, expires_at__gte=now or timezone.now())
+
+    def inactive(self, now=None):
+        return self.filter(models.Q(revoked_at__isnull=False) | models.Q(expires_at__lt=now or timezone.now()))
 
 
 class SubstituteAccessToken(models.Model):
@@ -217,10 +403,23 @@ class SubstituteAccessToken(models.Model):
         verbose_name='Длительность (сек)'
     )
 
+    objects = SubstituteAccessTokenQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Токен замены'
         verbose_name_plural = 'Токены замены'
         ordering = ['-created_at']
+        indexes = [
+            # частичные индексы: действующих токенов единицы, отозванных — малая доля,
+            # поэтому оба индекса маленькие; по expires_at ищутся и истёкшие для очистки
+            models.Index(
+                fields=['expires_at'], condition=models.Q(revoked_at__isnull=True), name='subtoken_live_expires',
+            ),
+            models.Index(
+                fields=['revoked_at'], condition=models.Q(revoked_at__isnull=False), name='subtoken_revoked',
+            ),
+            models.Index(fields=['-created_at'], name='subtoken_created'),
+        ]
 
     def __str__(self):
         return f'{self.class_room} до {self.expires_at:%d.%m.%Y %H:%M}'
@@ -231,8 +430,12 @@ class SubstituteAccessToken(models.Model):
 
     @staticmethod
     def generate_raw_token() -> str:
-        # достаточно длинный, удобный для копирования
-        return secrets.token_urlsafe(24)
+        # достаточно длинный, удобный для копирования; не начинается с «-» —
+        # такую ячейку CSV Excel считает формулой и портит токен
+        while True:
+            raw = secrets.token_urlsafe(24)
+            if not raw.startswith('-'):
+                return raw
 
     @property
     def is_active(self) -> bool:
@@ -243,3 +446,53 @@ class SubstituteAccessToken(models.Model):
     def target_user(self):
         # классный руководитель
         return self.class_room.teacher
+
+
+class JobLease(models.Model):
+    """
+    Аренда периодической задачи (services.scheduler). Запуск по расписанию забирает
+    строку одним условным UPDATE: аренда свободна (locked_until прошёл) и этот запуск
+    (last_slot) ещё никто не взял — поэтому при нескольких процессах run_scheduler
+    каждый запуск выполняется ровно одним из них. Аренда истекает сама, если процесс упал.
+    """
+    name = models.CharField(max_length=64, unique=True, verbose_name='Задача')
+    holder = models.CharField(max_length=128, blank=True, default='', verbose_name='Кто выполняет')
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name='Аренда до')
+    last_slot = models.DateTimeField(null=True, blank=True, verbose_name='Последний запуск по расписанию')
+
+    class Meta:
+        verbose_name = 'Аренда задачи'
+        verbose_name_plural = 'Аренды задач'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class JobRun(models.Model):
+    """Один запуск периодической задачи: длительность, итог, вывод и ошибка."""
+    class Status(models.TextChoices):
+        RUNNING = 'running', 'Выполняется'
+        OK = 'ok', 'Успешно'
+        FAILED = 'failed', 'Ошибка'
+
+    job = models.CharField(max_length=64, verbose_name='Задача')
+    slot = models.DateTimeField(null=True, blank=True, verbose_name='Запуск по расписанию')
+    holder = models.CharField(max_length=128, blank=True, default='', verbose_name='Кто выполнял')
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.RUNNING, verbose_name='Итог'
+    )
+    started_at = models.DateTimeField(default=timezone.now, verbose_name='Начало')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Окончание')
+    duration_ms = models.PositiveIntegerField(null=True, blank=True, verbose_name='Длительность, мс')
+    output = models.TextField(blank=True, default='', verbose_name='Вывод')
+    error = models.TextField(blank=True, default='', verbose_name='Ошибка')
+
+    class Meta:
+        verbose_name = 'Запуск задачи'
+        verbose_name_plural = 'Запуски задач'
+        ordering = ['-started_at']
+        indexes = [models.Index(fields=['job', '-started_at'], name='jobrun_job_started')]
+
+    def __str__(self):
+        return f'{self.job} {self.started_at:%d.%m.%Y %H:%M}: {self.get_status_display()}'
@@ -1,7 +1,10 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 
-from .models import Student, ClassRoom
+from .models import Student, ClassRoom, AttendanceSummary, AbsentStudent
 
 
 def recalc_student_count(class_room_id: int) -> None:
@@ -13,7 +16,16 @@ def recalc_student_count(class_room_id: int) -> None:
         is_active=True,
     ).count()
 
-    ClassRoom.objects.filter(id=class_room_id).update(student_count=count)
+    ClassRoom.objects.filter(id=class_room_id).update(student_count=count, updated_at=timezone.now())
+
+
+def recalc_student_counts(class_room_ids) -> int:
+    """Пересчёт численности набора классов одним UPDATE (для массовых update() мимо сигналов)."""
+    active_count = Student.objects.filter(class_room=OuterRef('pk'), is_active=True).order_by().values(
+        'class_room').annotate(c=Count('id')).values('c')
+    return ClassRoom.objects.filter(id__in=set(class_room_ids)).update(
+        student_count=Coalesce(Subquery(active_count), 0), updated_at=timezone.now()
+    )
 
 
 @receiver(post_delete, sender=Student)
@@ -40,3 +52,13 @@ def student_saved(sender, instance: Student, created, **kwargs):
     old_id = getattr(instance, "_old_class_room_id", None)
     if old_id and old_id != instance.class_room_id:
         recalc_student_count(old_id)
+
+
+@receiver(post_save, sender=AttendanceSummary)
+def attendance_summary_saved(sender, instance: AttendanceSummary, created, update_fields=None, **kwargs):
+    # у новой сводки отсутствий ещё нет; при частичном сохранении дата и класс не менялись
+    if created or (update_fields is not None and not {'date', 'class_room'} & set(update_fields)):
+        return
+    AbsentStudent.objects.filter(attendance=instance).exclude(
+        date=instance.date, class_room_id=instance.class_room_id
+    ).update(date=instance.date, class_room_id=instance.class_room_id)
@@ -1,6 +1,10 @@
-from django.test import SimpleTestCase
+from datetime import date
+from io import StringIO
 
-from database.models import SubstituteAccessToken
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from database.models import ClassRoom, Student, AttendanceSummary, AbsentStudent, SubstituteAccessToken
 
 
 class SubstituteAccessTokenTests(SimpleTestCase):
@@ -14,3 +18,33 @@ class SubstituteAccessTokenTests(SimpleTestCase):
         raw = SubstituteAccessToken.generate_raw_token()
         self.assertTrue(raw)
         self.assertGreaterEqual(len(raw), 16)
+
+
+class AbsentStudentDenormalizationTests(TestCase):
+    def setUp(self):
+        self.class_a = ClassRoom.objects.create(name='5А')
+        self.class_b = ClassRoom.objects.create(name='5Б')
+        self.student = Student.objects.create(full_name='Иванов Иван', class_room=self.class_a)
+        self.summary = AttendanceSummary.objects.create(
+            class_room=self.class_a, date=date(2026, 3, 16), present_count_auto=1
+        )
+
+    def test_save_copies_date_and_class(self):
+        absent = AbsentStudent.objects.create(attendance=self.summary, student=self.student)
+        absent.refresh_from_db()
+        self.assertEqual(absent.date, date(2026, 3, 16))
+        self.assertEqual(absent.class_room_id, self.class_a.id)
+
+    def test_summary_change_propagates(self):
+        absent = AbsentStudent.objects.create(attendance=self.summary, student=self.student)
+        self.summary.date = date(2026, 3, 17)
+        self.summary.class_room = self.class_b
+        self.summary.save()
+        absent.refresh_from_db()
+        self.assertEqual((absent.date, absent.class_room_id), (date(2026, 3, 17), self.class_b.id))
+
+    def test_backfill_fills_missing_fields(self):
+        AbsentStudent.objects.bulk_create([AbsentStudent(attendance=self.summary, student=self.student)])
+        call_command('backfill_absences', stdout=StringIO())
+        absent = AbsentStudent.objects.get()
+        self.assertEqual((absent.date, absent.class_room_id), (date(2026, 3, 16), self.class_a.id))
@@ -12,11 +12,30 @@ echo "PostgresSQL доступен, запускаю миграции..."
 
 python manage.py makemigrations --noinput
 python manage.py migrate --noinput
+python manage.py backfill_absences
+python manage.py rebuild_absence_counters --if-empty
+python manage.py rebuild_absence_states --if-empty
+python manage.py rebuild_orvi_windows
+python manage.py close_days
 
 echo "Собираю статику..."
 
 python manage.py collectstatic --noinput || echo "collectstatic пропущен"
 
-echo "Старт Django-сервера..."
+echo "Прогреваю кэши..."
 
-python manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+python manage.py warm_caches || echo "прогрев кэшей пропущен"
+
+if [ "${DJANGO_DEV_SERVER:-0}" = "1" ]; then
+  echo "Старт Django-сервера (runserver)..."
+  exec python manage.py runserver 0.0.0.0:8000
+fi
+
+echo "Старт ASGI-сервера (uvicorn, воркеров: ${WEB_CONCURRENCY:-4})..."
+
+exec uvicorn school_attendance.asgi:application \
+  --host 0.0.0.0 \
+  --port 8000 \
+  --workers "${WEB_CONCURRENCY:-4}" \
+  --proxy-headers \
+  --timeout-keep-alive 5
\ No newline at end of file
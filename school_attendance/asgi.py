@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'school_attendance.settings')
 
 application = get_asgi_application()
+
+if settings.WARM_CACHES_ON_START:
+    from attendance.services import warmup
+
+    warmup.warm_process_in_background()
@@ -1,10 +1,13 @@
 from pathlib import Path
 import os
 
-from dotenv import load_dotenv
-from .utils import get_env_list, get_env_bool
+from .utils import get_env_list, get_env_bool, get_env_int
 
-load_dotenv(".env")
+# python-dotenv нужен только при локальном запуске с файлом .env; без файла
+# (переменные передал docker/systemd) не тратим время старта на его импорт
+if os.path.isfile(".env"):
+    from dotenv import load_dotenv
+    load_dotenv(".env")
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -26,13 +29,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'attendance.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'attendance.middleware.SubstituteTokenMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    # после MessageMiddleware: при истёкшем токене пишет сообщение пользователю
+    'attendance.middleware.SubstituteTokenMiddleware',
+    'attendance.middleware.RequestProfilerMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -56,6 +61,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'school_attendance.wsgi.application'
+ASGI_APPLICATION = 'school_attendance.asgi.application'
 
 # PostgresSQL
 DATABASES = {
@@ -69,6 +75,49 @@ DATABASES = {
     }
 }
 
+# Пул соединений psycopg 3 (по умолчанию включён): соединение берётся из пула,
+# а не открывается заново (TCP + auth) на каждый запрос. Размер пула — на один воркер.
+# Статистика пула: /admin/db-pool/
+if get_env_bool('DB_POOL', True):
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': get_env_int('DB_POOL_MIN_SIZE', 2),
+            'max_size': get_env_int('DB_POOL_MAX_SIZE', 10),
+            'timeout': get_env_int('DB_POOL_TIMEOUT', 10),
+            'max_idle': get_env_int('DB_POOL_MAX_IDLE', 600),
+        },
+    }
+else:
+    # без пула — постоянные соединения с проверкой перед переиспользованием
+    DATABASES['default']['CONN_MAX_AGE'] = get_env_int('DB_CONN_MAX_AGE', 60)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Кэш на файлах: общий для всех воркеров, не требует внешнего сервиса.
+CACHE_DIR = Path(os.environ.get('DJANGO_CACHE_DIR') or BASE_DIR / 'cache')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'default',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': get_env_int('DJANGO_SESSION_CACHE_MAX_ENTRIES', 5000)},
+    },
+}
+
+# Тесты (manage.py test) работают с кэшами в памяти, а не с этим каталогом
+TEST_RUNNER = 'school_attendance.test_runner.LocmemCacheTestRunner'
+
+# Сессии читаются из кэша, запись идёт и в кэш, и в БД (write-through).
+# Таймаут записи в кэше = сроку жизни сессии, поэтому set_expiry() у входа по токену соблюдается.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Сообщения храним в cookie, чтобы показ сообщения не требовал записи сессии
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -92,10 +141,70 @@ STATICFILES_DIRS = [
     BASE_DIR / 'attendance' / 'static',
 ]
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# Имена статики с хэшем содержимого + заранее сжатые .br/.gz (см. attendance/storage.py):
+# вместо ручных ?v=... в шаблонах, браузер кэширует файлы навсегда (immutable)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'attendance.storage.HashedStaticFilesStorage'},
+}
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Профилирование запросов по ?_profile=1 (только is_staff), см. /admin/profiles/
+PROFILING_DIR = os.environ.get('DJANGO_PROFILING_DIR') or BASE_DIR / 'profiles'
+PROFILING_MAX_REPORTS = get_env_int('DJANGO_PROFILING_MAX_REPORTS', 50)
+
+# Отчёт о хронических пропусках: N учебных дней подряд без уважительной причины
+# или больше X% пропущенных дней за текущий месяц
+CHRONIC_ABSENCE_STREAK_DAYS = get_env_int('CHRONIC_ABSENCE_STREAK_DAYS', 3)
+CHRONIC_ABSENCE_MONTH_PERCENT = get_env_int('CHRONIC_ABSENCE_MONTH_PERCENT', 30)
+# серия считается текущей, если последний пропуск был не раньше стольких календарных дней назад
+# (выходные и короткие каникулы); более старая серия уже закончилась, даже если отчёта о приходе нет
+CHRONIC_ABSENCE_GRACE_DAYS = get_env_int('CHRONIC_ABSENCE_GRACE_DAYS', 7)
+
+# Раннее предупреждение о вспышке ОРВИ: окна в учебных днях и порог карантина
+# (доля отсутствующих по ОРВИ от списочного состава класса / параллели)
+ORVI_WINDOW_DAYS = [3, 5]
+ORVI_QUARANTINE_PERCENT = get_env_int('ORVI_QUARANTINE_PERCENT', 20)
+
+# Табло несданных отчётов: как часто страница опрашивает JSON (ответ берётся из кэша)
+MISSING_REPORTS_POLL_SECONDS = get_env_int('MISSING_REPORTS_POLL_SECONDS', 15)
+
+# Живая лента сохранений (SSE): общий для всех воркеров каталог с файлами событий дня
+# и срок одного соединения (браузер затем переподключается сам, с Last-Event-ID)
+LIVE_FEED_DIR = CACHE_DIR / 'live'
+LIVE_FEED_MAX_SECONDS = get_env_int('LIVE_FEED_MAX_SECONDS', 600)
+
+# Прогрев воркера при старте (соединение с БД, шаблоны, справочник классов) в фоновом потоке;
+# общие кэши прогревает manage.py warm_caches
+WARM_CACHES_ON_START = get_env_bool('WARM_CACHES_ON_START', True)
+
+# Истёкшие и отозванные токены замены хранятся столько дней, затем их удаляет sweep_substitute_tokens
+SUBSTITUTE_TOKEN_RETENTION_DAYS = get_env_int('SUBSTITUTE_TOKEN_RETENTION_DAYS', 30)
+
+# Готовая выгрузка закрытого дня хранится в кэше столько секунд; просроченные файлы удаляет prune_cache
+EXPORT_CACHE_SECONDS = get_env_int('EXPORT_CACHE_SECONDS', 7 * 24 * 3600)
+
+# Периодические задачи для manage.py run_scheduler: имя -> расписание cron по TIME_ZONE
+# (минута час день месяц день_недели) и команда manage.py с аргументами. Пустое расписание
+# отключает задачу; lease_seconds — срок аренды задачи, если она может идти дольше
+# SCHEDULER_LEASE_SECONDS (по истечении аренды запуск может взять другой процесс).
+SCHEDULER_JOBS = {
+    'close_days': {'schedule': '10 0 * * *', 'command': ['close_days']},
+    'sweep_sessions': {'schedule': '20 2 * * *', 'command': ['sweep_sessions']},
+    'sweep_substitute_tokens': {'schedule': '30 2 * * *', 'command': ['sweep_substitute_tokens']},
+    'prune_cache': {'schedule': '40 2 * * *', 'command': ['prune_cache']},
+    'rebuild_orvi_windows': {'schedule': '0 3 * * *', 'command': ['rebuild_orvi_windows']},
+    'rebuild_absence_counters': {'schedule': '0 4 * * 0', 'command': ['rebuild_absence_counters']},
+    'rebuild_absence_states': {'schedule': '30 4 * * 0', 'command': ['rebuild_absence_states']},
+    # после ночных и воскресных пересчётов: расхождения отмечают запуск как неудачный
+    'verify_aggregates': {'schedule': '0 5 * * *', 'command': ['verify_aggregates']},
+    'warm_caches': {'schedule': '30 7 * * 1-5', 'command': ['warm_caches']},
+}
+SCHEDULER_LEASE_SECONDS = get_env_int('SCHEDULER_LEASE_SECONDS', 3600)
+# записи о запусках старше этого числа дней удаляются после очередного запуска задачи
+SCHEDULER_RUNS_KEEP_DAYS = get_env_int('SCHEDULER_RUNS_KEEP_DAYS', 60)
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'index'
 LOGOUT_REDIRECT_URL = 'login'
@@ -0,0 +1,27 @@
+import tempfile
+from pathlib import Path
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+# Кэши в памяти процесса вместо файловых и временный каталог живой ленты: тесты не читают
+# и не пишут cache/ разработчика (тот же каталог использует локальный сервер)
+# и не переносят состояние между прогонами
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sessions'},
+}
+
+
+class LocmemCacheTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._live_feed_dir = tempfile.TemporaryDirectory()
+        self._override = override_settings(CACHES=LOCMEM_CACHES, LIVE_FEED_DIR=Path(self._live_feed_dir.name))
+        self._override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._override.disable()
+        self._live_feed_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -1,8 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
 from attendance.views import UserLoginView, UserLogoutView, substitute_login
+from attendance.views.diagnostics import db_pool_stats
+from attendance.views.profiling import profiles_list, profile_detail, profile_download
 
 urlpatterns = [
+    path('admin/db-pool/', db_pool_stats, name='db_pool_stats'),
+    path('admin/profiles/', profiles_list, name='profiles_list'),
+    path('admin/profiles/<str:name>/', profile_detail, name='profile_detail'),
+    path('admin/profiles/<str:name>/<str:kind>/', profile_download, name='profile_download'),
     path('admin/', admin.site.urls),
     path('login/', UserLoginView.as_view(), name='login'),
     path('login/substitute/', substitute_login, name='substitute_login'),